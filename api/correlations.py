@@ -0,0 +1,24 @@
+from __future__ import annotations
+
+from backend.http import REVALIDATE, ApiHandler, etag_matches, send_error_json, send_json, send_not_modified
+from backend.portfolio_refresh import fetch_correlations_payload
+
+
+class handler(ApiHandler):
+    allowed_methods = ("GET", "OPTIONS")
+
+    def do_GET(self) -> None:  # noqa: N802
+        try:
+            payload, _meta = fetch_correlations_payload()
+        except FileNotFoundError:
+            send_error_json(self, 404, "Todavía no existe un snapshot para calcular correlaciones.")
+            return
+        except Exception as error:  # pragma: no cover - depende del entorno
+            send_error_json(self, 500, f"No se pudo leer la matriz de correlaciones: {error}")
+            return
+
+        etag = f'"{payload.get("content_hash", "")}"'
+        if etag_matches(self, etag):
+            send_not_modified(self, etag)
+            return
+        send_json(self, 200, payload, extra_headers={"ETag": etag}, cache_control=REVALIDATE)
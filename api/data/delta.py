@@ -0,0 +1,30 @@
+from __future__ import annotations
+
+from backend.http import ApiHandler, first_param, get_query_params, send_error_json, send_json
+from backend.portfolio_refresh import fetch_latest_delta
+
+
+class handler(ApiHandler):
+    allowed_methods = ("GET", "OPTIONS")
+
+    def do_GET(self) -> None:  # noqa: N802
+        since = first_param(get_query_params(self), "since")
+        if not since:
+            send_error_json(self, 400, "Falta el parámetro 'since' con el generated_at de la versión del cliente.")
+            return
+
+        try:
+            payload, meta = fetch_latest_delta(since)
+        except Exception as error:  # pragma: no cover - depende del entorno
+            send_error_json(self, 500, f"No se pudo calcular el delta del dataset principal: {error}")
+            return
+
+        send_json(
+            self,
+            200,
+            payload,
+            extra_headers={
+                "X-Portfolio-Storage": meta.source,
+                "X-Portfolio-Pathname": meta.pathname or "",
+            },
+        )
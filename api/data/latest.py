@@ -1,15 +1,34 @@
 from __future__ import annotations
 
-from backend.http import ApiHandler, send_error_json, send_json
+from backend.http import ApiHandler, first_param, get_query_params, send_error_json, send_json
 from backend.portfolio_refresh import fetch_latest_payload
+from backend.series_views import MIN_VIEW_POINTS, VIEW_RESOLUTIONS, build_downsampled_view, build_resolution_view
 
 
 class handler(ApiHandler):
     allowed_methods = ("GET", "OPTIONS")
 
     def do_GET(self) -> None:  # noqa: N802
+        query = get_query_params(self)
+        resolution = (first_param(query, "resolution") or "daily").lower()
+        if resolution not in VIEW_RESOLUTIONS:
+            send_error_json(self, 400, f"Resolución inválida: {resolution}. Usa {', '.join(VIEW_RESOLUTIONS)}.")
+            return
+
+        raw_points = first_param(query, "points")
+        try:
+            points = int(raw_points) if raw_points else None
+        except ValueError:
+            points = 0
+        if points is not None and points < MIN_VIEW_POINTS:
+            send_error_json(self, 400, f"El parámetro 'points' debe ser un entero mayor o igual a {MIN_VIEW_POINTS}.")
+            return
+
         try:
             payload, meta = fetch_latest_payload()
+            payload = build_resolution_view(payload, resolution)
+            if points is not None:
+                payload = build_downsampled_view(payload, points)
         except Exception as error:  # pragma: no cover - depende del entorno
             send_error_json(self, 500, f"No se pudo cargar el dataset principal: {error}")
             return
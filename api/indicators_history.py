@@ -0,0 +1,28 @@
+from __future__ import annotations
+
+from backend.http import ApiHandler, first_param, get_query_params, send_error_json, send_json
+from backend.portfolio_refresh import fetch_indicators_history
+
+
+class handler(ApiHandler):
+    allowed_methods = ("GET", "OPTIONS")
+
+    def do_GET(self) -> None:  # noqa: N802
+        query = get_query_params(self)
+        keys = [
+            key.strip()
+            for raw_value in query.get("keys", []) + query.get("key", [])
+            for key in raw_value.split(",")
+            if key.strip()
+        ]
+
+        try:
+            payload, meta = fetch_indicators_history(keys, start=first_param(query, "start"), end=first_param(query, "end"))
+        except ValueError as error:
+            send_error_json(self, 400, str(error))
+            return
+        except Exception as error:  # pragma: no cover - depende del entorno
+            send_error_json(self, 500, f"No se pudo leer el histórico de indicadores: {error}")
+            return
+
+        send_json(self, 200, payload, extra_headers={"X-Portfolio-Storage": meta.source})
@@ -0,0 +1,40 @@
+from __future__ import annotations
+
+from backend.http import ApiHandler, first_param, get_query_params, send_error_json, send_json
+from backend.projections import get_platform_projection
+
+
+class handler(ApiHandler):
+    allowed_methods = ("GET", "OPTIONS")
+
+    def do_GET(self) -> None:  # noqa: N802
+        query = get_query_params(self)
+        platform_id = first_param(query, "platform")
+        if not platform_id:
+            send_error_json(self, 400, "Falta el parámetro 'platform'.")
+            return
+
+        options = {}
+        for name in ("paths", "years"):
+            value = first_param(query, name)
+            if value is None:
+                continue
+            try:
+                options[name] = int(value)
+            except ValueError:
+                send_error_json(self, 400, f"El parámetro '{name}' debe ser un entero.")
+                return
+        method = first_param(query, "method")
+        if method:
+            options["method"] = method.lower()
+
+        try:
+            payload = get_platform_projection(platform_id, **options)
+        except ValueError as error:
+            send_error_json(self, 400, str(error))
+            return
+        except Exception as error:  # pragma: no cover - depende del entorno
+            send_error_json(self, 500, f"No se pudo calcular la proyección: {error}")
+            return
+
+        send_json(self, 200, payload)
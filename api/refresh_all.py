@@ -42,7 +42,7 @@ class handler(ApiHandler):
 
         statuses = {result.status for result in (latest_result, indicators_result) if result is not None}
         payload = {
-            "status": "updated" if "updated" in statuses else "skipped",
+            "status": _combine_statuses(statuses),
             "message": "Actualización completa finalizada." if not errors else "Actualización parcial finalizada.",
             "results": {
                 "latest": latest_result.to_dict() if latest_result else None,
@@ -52,10 +52,17 @@ class handler(ApiHandler):
         if errors:
             payload["errors"] = errors
 
-        status_code = 200 if payload["status"] == "updated" else 202
+        status_code = 202 if payload["status"] == "skipped" else 200
         send_json(self, status_code, payload)
 
 
+def _combine_statuses(statuses: set[str]) -> str:
+    for status in ("updated", "unchanged"):
+        if status in statuses:
+            return status
+    return "skipped"
+
+
 def _should_refresh_indicators(query: dict[str, list[str]], body: dict[str, object]) -> bool:
     requested = first_param(query, "includeIndicators")
     if requested is None and "includeIndicators" in body:
@@ -1,7 +1,10 @@
 from __future__ import annotations
 
+from typing import Any, Dict
+
 from backend.http import ApiHandler, first_param, get_query_params, is_truthy, read_json_body, send_error_json, send_json
 from backend.portfolio_refresh import refresh_latest_dataset
+from scripts.fetch_data import SelectionError
 
 
 class handler(ApiHandler):
@@ -17,12 +20,24 @@ class handler(ApiHandler):
 
         mode = first_param(query, "mode") or str(body.get("mode", "online")).strip().lower() or "online"
         force = is_truthy(first_param(query, "force")) or is_truthy(body.get("force"))
+        tickers = _selector(query, body, "tickers")
+        platforms = _selector(query, body, "platforms")
 
         try:
-            result = refresh_latest_dataset(force=force, mode=mode)
+            result = refresh_latest_dataset(force=force, mode=mode, tickers=tickers, platforms=platforms)
+        except SelectionError as error:
+            send_error_json(self, 400, str(error))
+            return
         except Exception as error:  # pragma: no cover - depende de APIs externas
             send_error_json(self, 500, f"No se pudo actualizar latest.json: {error}")
             return
 
-        status_code = 200 if result.status == "updated" else 202
+        status_code = 202 if result.status == "skipped" else 200
         send_json(self, status_code, result.to_dict())
+
+
+def _selector(query: Dict[str, list[str]], body: Dict[str, Any], name: str) -> list[str]:
+    """Acepta `?name=a,b`, el parámetro repetido o en el body un string separado por comas o una lista."""
+    raw_body = body.get(name) or []
+    values = query.get(name, []) + [str(item) for item in (raw_body if isinstance(raw_body, list) else [raw_body])]
+    return list(dict.fromkeys(item.strip() for value in values for item in value.split(",") if item.strip()))
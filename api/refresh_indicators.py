@@ -23,5 +23,5 @@ class handler(ApiHandler):
             send_error_json(self, 500, f"No se pudo actualizar indicators/latest.json: {error}")
             return
 
-        status_code = 200 if result.status == "updated" else 202
+        status_code = 202 if result.status == "skipped" else 200
         send_json(self, status_code, result.to_dict())
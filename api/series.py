@@ -0,0 +1,33 @@
+from __future__ import annotations
+
+from backend.http import ApiHandler, first_param, get_query_params, send_error_json, send_json
+from backend.series_index import query_series
+
+
+class handler(ApiHandler):
+    allowed_methods = ("GET", "OPTIONS")
+
+    def do_GET(self) -> None:  # noqa: N802
+        query = get_query_params(self)
+        tickers = [
+            ticker.strip()
+            for raw_value in query.get("tickers", []) + query.get("ticker", [])
+            for ticker in raw_value.split(",")
+            if ticker.strip()
+        ]
+
+        try:
+            payload = query_series(
+                tickers,
+                start=first_param(query, "start"),
+                end=first_param(query, "end"),
+                resolution=(first_param(query, "resolution") or "daily").lower(),
+            )
+        except ValueError as error:
+            send_error_json(self, 400, str(error))
+            return
+        except Exception as error:  # pragma: no cover - depende del entorno
+            send_error_json(self, 500, f"No se pudo consultar las series: {error}")
+            return
+
+        send_json(self, 200, payload)
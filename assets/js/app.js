@@ -159,6 +159,10 @@ const buildRefreshMessage = (result) => {
     return "La web pidió una actualización real y ya está mostrando la versión más reciente.";
   }
 
+  if (latestStatus === "unchanged" || indicatorsStatus === "unchanged") {
+    return "El backend consultó las fuentes y los datos no cambiaron, así que no generó una versión nueva.";
+  }
+
   if (latestStatus === "skipped" && indicatorsStatus === "skipped") {
     return "El backend respondió que ambos datasets ya estaban frescos, por eso no regeneró nada.";
   }
@@ -170,6 +174,9 @@ const buildBannerRefreshMessage = (result) => {
   if (result?.status === "updated") {
     return "El banner de indicadores se actualizó con un refresh real del backend.";
   }
+  if (result?.status === "unchanged") {
+    return "Los indicadores se consultaron de nuevo y no cambiaron desde la última versión.";
+  }
   if (result?.status === "skipped") {
     return "Los indicadores ya estaban frescos, así que el backend evitó repetir la consulta.";
   }
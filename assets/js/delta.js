@@ -0,0 +1,135 @@
+// Aplica las respuestas de /api/data/delta sobre una copia local del dataset.
+
+const roundTo = (value, decimals) => {
+  const factor = 10 ** decimals;
+  return Math.round(value * factor) / factor;
+};
+
+const applySeriesDelta = (previousPoints, change) => {
+  if (!change) {
+    return previousPoints;
+  }
+  if (Array.isArray(change.full)) {
+    return change.full;
+  }
+  const appended = change.append ?? [];
+  const firstAppended = appended[0]?.date;
+  const kept = (previousPoints ?? []).filter(
+    (point) => point.date >= change.start && (firstAppended === undefined || point.date < firstAppended)
+  );
+  if (change.head && kept[0]?.date === change.head.date) {
+    kept[0] = change.head;
+  }
+  return kept.concat(appended);
+};
+
+const withoutKeys = (object, keys) => {
+  const copy = { ...object };
+  (keys ?? []).forEach((key) => {
+    delete copy[key];
+  });
+  return copy;
+};
+
+const applySeriesChanges = (series, seriesChanges) => {
+  const nextSeries = { ...(series ?? {}) };
+  Object.entries(seriesChanges ?? {}).forEach(([name, seriesChange]) => {
+    nextSeries[name] = applySeriesDelta(nextSeries[name], seriesChange);
+  });
+  return nextSeries;
+};
+
+const applyHoldingDelta = (holding, change) => {
+  const { ticker, series: seriesChanges, removed, ...fields } = change;
+  const series = applySeriesChanges(holding.series, seriesChanges);
+  return { ...withoutKeys(holding, removed), ...fields, ticker: ticker ?? holding.ticker, series };
+};
+
+const computeNormalizedSeries = (priceHistory) => {
+  if (!priceHistory?.length) {
+    return [];
+  }
+  const basePrice = priceHistory[0].close || 1;
+  return priceHistory.map((point) => ({
+    date: point.date,
+    value: roundTo(100 * (point.close / basePrice), 2),
+  }));
+};
+
+const rebuildTimeseries = (platforms, previousTimeseries) => {
+  const previousDatasets = new Map(
+    (previousTimeseries?.datasets ?? []).map((dataset) => [`${dataset.platform_id}:${dataset.id}`, dataset])
+  );
+  const labelsSet = new Set();
+  const dataMaps = [];
+
+  platforms.forEach((platform) => {
+    (platform.holdings ?? []).forEach((holding) => {
+      const normalized = holding.series?.normalized_5y ?? [];
+      if (!normalized.length) {
+        return;
+      }
+      const dataMap = new Map(normalized.map((point) => [point.date, point.value]));
+      dataMap.forEach((_, label) => labelsSet.add(label));
+      dataMaps.push({ platform, holding, dataMap });
+    });
+  });
+
+  const labels = [...labelsSet].sort();
+  const datasets = dataMaps.map(({ platform, holding, dataMap }) => {
+    const previous = previousDatasets.get(`${platform.id}:${holding.ticker}`) ?? {};
+    return {
+      id: holding.ticker,
+      label: previous.label ?? `${holding.ticker} · ${platform.name}`,
+      platform_id: platform.id,
+      borderColor: previous.borderColor ?? platform.color,
+      backgroundColor: previous.backgroundColor ?? platform.color,
+      data: labels.map((label) => (dataMap.has(label) ? dataMap.get(label) : null)),
+      weight: holding.weight,
+    };
+  });
+
+  return { labels, datasets };
+};
+
+export const applyDatasetDelta = (previous, delta) => {
+  const recomputeSeries = new Set(delta.recompute?.series ?? []);
+  const recomputeCharts = new Set(delta.recompute?.charts ?? []);
+  const previousPlatforms = new Map((previous.platforms ?? []).map((platform) => [platform.id, platform]));
+
+  const platforms = (delta.platforms ?? []).map((platformChange) => {
+    const platform = previousPlatforms.get(platformChange.id) ?? {};
+    const { holdings: holdingChanges, series: seriesChanges, removed, ...fields } = platformChange;
+    const holdings = (platform.holdings ?? []).map((holding, index) => {
+      const nextHolding = applyHoldingDelta(holding, holdingChanges?.[index] ?? {});
+      if (recomputeSeries.has("normalized_5y")) {
+        nextHolding.series = {
+          ...nextHolding.series,
+          normalized_5y: computeNormalizedSeries(nextHolding.series?.price_history),
+        };
+      }
+      return nextHolding;
+    });
+    const nextPlatform = { ...withoutKeys(platform, removed), ...fields, holdings };
+    if (platform.series || seriesChanges) {
+      nextPlatform.series = applySeriesChanges(platform.series, seriesChanges);
+    }
+    return nextPlatform;
+  });
+
+  const charts = { ...(previous.charts ?? {}), ...(delta.charts ?? {}) };
+  if (recomputeCharts.has("timeseries_5y")) {
+    charts.timeseries_5y = rebuildTimeseries(platforms, previous.charts?.timeseries_5y);
+  }
+
+  return {
+    ...previous,
+    generated_at: delta.generated_at,
+    content_hash: delta.content_hash,
+    currency: delta.currency ?? previous.currency,
+    source: delta.source ?? previous.source,
+    fx: delta.fx ?? previous.fx,
+    platforms,
+    charts,
+  };
+};
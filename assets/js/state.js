@@ -1,6 +1,11 @@
+import { applyDatasetDelta } from "./delta.js";
+
 const DATA_ENDPOINT = "/api/data/latest";
+const DELTA_ENDPOINT = "/api/data/delta";
 const REFRESH_ENDPOINT = "/api/refresh-all";
 const STORAGE_KEY = "portfolioTracker:lastGeneratedAt";
+const DATASET_CACHE_NAME = "portfolioTracker:dataset";
+const DATASET_CACHE_KEY = "/cache/portfolio-latest.json";
 
 const safeReadLocalStorage = (key) => {
   if (typeof window === "undefined" || !window.localStorage) {
@@ -44,8 +49,70 @@ const fetchFromEndpoint = async (endpoint) => {
   return response.json();
 };
 
+const hasDatasetCache = () => typeof window !== "undefined" && "caches" in window;
+
+const readCachedDataset = async () => {
+  if (!hasDatasetCache()) {
+    return null;
+  }
+  try {
+    const cache = await window.caches.open(DATASET_CACHE_NAME);
+    const response = await cache.match(DATASET_CACHE_KEY);
+    return response ? await response.json() : null;
+  } catch (error) {
+    console.warn("No se pudo leer la copia local del dataset:", error);
+    return null;
+  }
+};
+
+const writeCachedDataset = async (data) => {
+  if (!hasDatasetCache() || !data?.generated_at) {
+    return;
+  }
+  try {
+    const cache = await window.caches.open(DATASET_CACHE_NAME);
+    await cache.put(
+      DATASET_CACHE_KEY,
+      new Response(JSON.stringify(data), { headers: { "Content-Type": "application/json" } })
+    );
+  } catch (error) {
+    console.warn("No se pudo guardar la copia local del dataset:", error);
+  }
+};
+
+const fetchDeltaOnto = async (cached) => {
+  const requestUrl = new URL(DELTA_ENDPOINT, window.location.origin);
+  requestUrl.searchParams.set("since", cached.generated_at);
+  const delta = await fetchFromEndpoint(requestUrl.toString());
+
+  if (delta?.status === "unchanged") {
+    return cached;
+  }
+  if (delta?.status === "delta") {
+    return applyDatasetDelta(cached, delta);
+  }
+  return null;
+};
+
 const fetchPortfolioData = async () => {
+  const cached = await readCachedDataset();
+  if (cached?.generated_at) {
+    try {
+      const data = await fetchDeltaOnto(cached);
+      if (data) {
+        if (data !== cached) {
+          await writeCachedDataset(data);
+        }
+        console.info(`Datos de portafolio actualizados con ${DELTA_ENDPOINT}`);
+        return { data, endpoint: DELTA_ENDPOINT };
+      }
+    } catch (error) {
+      console.warn("No se pudo aplicar el delta; se descargará el dataset completo:", error);
+    }
+  }
+
   const data = await fetchFromEndpoint(DATA_ENDPOINT);
+  await writeCachedDataset(data);
   console.info(`Datos de portafolio cargados desde ${DATA_ENDPOINT}`);
   return { data, endpoint: DATA_ENDPOINT };
 };
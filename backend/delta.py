@@ -0,0 +1,140 @@
+"""Diferencias entre dos snapshots de latest.json para clientes que ya tienen una versión."""
+
+from __future__ import annotations
+
+from bisect import bisect_left
+from typing import Any, Dict, List
+
+# Series que el cliente recalcula a partir de price_history en vez de recibirlas.
+RECOMPUTED_SERIES = ("normalized_5y",)
+RECOMPUTED_CHARTS = ("timeseries_5y",)
+TOP_LEVEL_FIELDS = ("generated_at", "content_hash", "currency", "source", "fx")
+
+
+def build_delta(previous: Dict[str, Any] | None, current: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Devuelve `unchanged`, `delta` o `full_reload`.
+
+    Un `delta` trae, por plataforma y holding, los campos que cambiaron y, por serie fechada, la fecha
+    desde la que empieza la ventana (`start`) más los puntos nuevos (`append`). En series
+    agregadas, `head` reemplaza el primer punto y el primer punto de `append` puede reemplazar
+    al último que tenía el cliente. Si una serie no se puede expresar así (se corrigieron
+    puntos viejos), viaja completa.
+    """
+    header = {field: current.get(field) for field in TOP_LEVEL_FIELDS if field in current}
+    if previous is None:
+        return {"status": "full_reload", **header}
+
+    if previous.get("generated_at") == current.get("generated_at"):
+        return {"status": "unchanged", **header}
+    if previous.get("content_hash") and previous.get("content_hash") == current.get("content_hash"):
+        return {"status": "unchanged", **header}
+
+    if _shape(previous) != _shape(current):
+        return {"status": "full_reload", **header}
+
+    platforms = [
+        _platform_delta(previous_platform, current_platform)
+        for previous_platform, current_platform in zip(previous.get("platforms", []), current.get("platforms", []))
+    ]
+
+    charts: Dict[str, Any] = {}
+    previous_charts = previous.get("charts") or {}
+    for key, value in (current.get("charts") or {}).items():
+        if key in RECOMPUTED_CHARTS:
+            continue
+        if previous_charts.get(key) != value:
+            charts[key] = value
+
+    return {
+        "status": "delta",
+        "base_generated_at": previous.get("generated_at"),
+        **header,
+        "platforms": platforms,
+        "charts": charts,
+        "recompute": {"series": list(RECOMPUTED_SERIES), "charts": list(RECOMPUTED_CHARTS)},
+    }
+
+
+def _shape(payload: Dict[str, Any]) -> List[Any]:
+    return [
+        (platform.get("id"), [holding.get("ticker") for holding in platform.get("holdings", [])])
+        for platform in payload.get("platforms", [])
+    ]
+
+
+def _platform_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    delta: Dict[str, Any] = {"id": current.get("id")}
+    _diff_fields(previous, current, delta, skip=("id", "holdings", "series"))
+    _diff_series(previous, current, delta)
+    delta["holdings"] = [
+        _holding_delta(previous_holding, current_holding)
+        for previous_holding, current_holding in zip(previous.get("holdings", []), current.get("holdings", []))
+    ]
+    return delta
+
+
+def _holding_delta(previous: Dict[str, Any], current: Dict[str, Any]) -> Dict[str, Any]:
+    delta: Dict[str, Any] = {"ticker": current.get("ticker")}
+    _diff_fields(previous, current, delta, skip=("ticker", "series"))
+    _diff_series(previous, current, delta)
+    return delta
+
+
+def _diff_series(previous: Dict[str, Any], current: Dict[str, Any], delta: Dict[str, Any]) -> None:
+    previous_series = previous.get("series") or {}
+    series_delta: Dict[str, Any] = {}
+    for name, points in (current.get("series") or {}).items():
+        if name in RECOMPUTED_SERIES:
+            continue
+        before = previous_series.get(name)
+        if before == points:
+            continue
+        window = _window_delta(before, points)
+        series_delta[name] = window if window is not None else {"full": points}
+    if series_delta:
+        delta["series"] = series_delta
+
+
+def _diff_fields(previous: Dict[str, Any], current: Dict[str, Any], delta: Dict[str, Any], *, skip: tuple) -> None:
+    for key, value in current.items():
+        if key not in skip and previous.get(key) != value:
+            delta[key] = value
+    removed = [key for key in previous if key not in current and key not in skip]
+    if removed:
+        delta["removed"] = removed
+
+
+def _window_delta(previous: Any, current: Any) -> Dict[str, Any] | None:
+    if not _is_dated(previous) or not _is_dated(current) or not previous or not current:
+        return None
+
+    previous_dates = [point["date"] for point in previous]
+    last_previous_date = previous_dates[-1]
+    kept = previous[bisect_left(previous_dates, current[0]["date"]) :]
+    body = current
+    window: Dict[str, Any] = {"start": current[0]["date"]}
+
+    # En una ventana móvil, el primer agregado (semana o mes parcial) cambia en cada refresh.
+    if kept and kept[0]["date"] == body[0]["date"] and kept[0] != body[0]:
+        window["head"] = body[0]
+        kept, body = kept[1:], body[1:]
+
+    split = bisect_left([point["date"] for point in body], last_previous_date)
+    if split < len(body) and body[split]["date"] == last_previous_date:
+        split += 1
+
+    if kept == body[:split]:
+        window["append"] = body[split:]
+        return window
+
+    # Agregado del período en curso (semana o mes abierto): sólo cambió el último punto.
+    reopened = split - 1
+    if reopened >= 0 and body[reopened]["date"] == last_previous_date and kept[:-1] == body[:reopened]:
+        window["append"] = body[reopened:]
+        return window
+    return None
+
+
+def _is_dated(value: Any) -> bool:
+    return isinstance(value, list) and all(isinstance(point, dict) and "date" in point for point in value)
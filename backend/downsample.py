@@ -0,0 +1,62 @@
+"""Largest-Triangle-Three-Buckets sobre una o varias series que comparten el eje x."""
+
+from __future__ import annotations
+
+import numpy as np
+
+
+def lttb_indices(x: np.ndarray, y: np.ndarray, threshold: int) -> np.ndarray:
+    """
+    Devuelve los índices que conservan la forma de `y` usando `threshold` puntos.
+
+    `y` puede ser 1D o 2D (una columna por serie); con varias columnas el área del triángulo
+    se suma entre series, así todas quedan con los mismos índices (etiquetas compartidas).
+    Los `NaN` se rellenan hacia adelante sólo para medir áreas.
+    """
+    size = x.shape[0]
+    if threshold < 3 or threshold >= size:
+        return np.arange(size)
+
+    x = x.astype(float)
+    y = _fill_gaps(y.astype(float).reshape(size, -1))
+
+    # threshold - 2 buckets entre el primer y el último punto, que siempre se conservan.
+    edges = np.linspace(1, size - 1, threshold - 1).astype(np.int64)
+    cumulative_x = np.concatenate(([0.0], np.cumsum(x)))
+    cumulative_y = np.vstack((np.zeros((1, y.shape[1])), np.cumsum(y, axis=0)))
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, size - 1
+    previous = 0
+    for bucket in range(threshold - 2):
+        lower, upper = edges[bucket], edges[bucket + 1]
+        if bucket + 2 < edges.size:
+            next_lower, next_upper = upper, edges[bucket + 2]
+            count = next_upper - next_lower
+            average_x = (cumulative_x[next_upper] - cumulative_x[next_lower]) / count
+            average_y = (cumulative_y[next_upper] - cumulative_y[next_lower]) / count
+        else:
+            average_x, average_y = x[-1], y[-1]
+
+        anchor_x, anchor_y = x[previous], y[previous]
+        areas = np.abs(
+            (anchor_x - average_x) * (y[lower:upper] - anchor_y)
+            - (anchor_x - x[lower:upper, None]) * (average_y - anchor_y)
+        ).sum(axis=1)
+        previous = lower + int(np.argmax(areas))
+        selected[bucket + 1] = previous
+    return selected
+
+
+def _fill_gaps(values: np.ndarray) -> np.ndarray:
+    if not np.isnan(values).any():
+        return values
+    # Hacia adelante y luego hacia atrás para cubrir lo que queda vacío al inicio.
+    filled = _forward_fill(_forward_fill(values)[::-1])[::-1]
+    return np.nan_to_num(filled, nan=0.0)
+
+
+def _forward_fill(values: np.ndarray) -> np.ndarray:
+    rows = np.where(np.isnan(values), 0, np.arange(values.shape[0])[:, None])
+    np.maximum.accumulate(rows, axis=0, out=rows)
+    return values[rows, np.arange(values.shape[1])]
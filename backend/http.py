@@ -7,6 +7,10 @@ from http.server import BaseHTTPRequestHandler
 from typing import Any, Dict, Iterable
 from urllib.parse import parse_qs, urlparse
 
+NO_STORE = "no-store, max-age=0"
+# Para respuestas versionadas por ETag: el navegador guarda la copia pero revalida siempre.
+REVALIDATE = "public, max-age=0, must-revalidate"
+
 
 class ApiHandler(BaseHTTPRequestHandler):
     """Base pequeña para reducir repetición en las funciones."""
@@ -33,10 +37,11 @@ def send_json(
     payload: Any,
     *,
     extra_headers: Dict[str, str] | None = None,
+    cache_control: str = NO_STORE,
 ) -> None:
     body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
     handler.send_response(status_code)
-    _send_common_headers(handler, content_length=len(body))
+    _send_common_headers(handler, content_length=len(body), cache_control=cache_control)
     if extra_headers:
         for key, value in extra_headers.items():
             handler.send_header(key, value)
@@ -44,6 +49,19 @@ def send_json(
     handler.wfile.write(body)
 
 
+def send_not_modified(handler: BaseHTTPRequestHandler, etag: str, *, cache_control: str = REVALIDATE) -> None:
+    handler.send_response(304)
+    _send_common_headers(handler, cache_control=cache_control)
+    handler.send_header("ETag", etag)
+    handler.end_headers()
+
+
+def etag_matches(handler: BaseHTTPRequestHandler, etag: str) -> bool:
+    header = handler.headers.get("If-None-Match") or ""
+    candidates = {value.strip().removeprefix("W/") for value in header.split(",")}
+    return etag in candidates or "*" in candidates
+
+
 def send_error_json(handler: BaseHTTPRequestHandler, status_code: int, message: str) -> None:
     send_json(handler, status_code, {"message": message})
 
@@ -97,9 +115,10 @@ def _send_common_headers(
     *,
     content_length: int | None = None,
     allowed_methods: Iterable[str] = ("GET", "POST", "OPTIONS"),
+    cache_control: str = NO_STORE,
 ) -> None:
     handler.send_header("Content-Type", "application/json; charset=utf-8")
-    handler.send_header("Cache-Control", "no-store, max-age=0")
+    handler.send_header("Cache-Control", cache_control)
     handler.send_header("Access-Control-Allow-Origin", "*")
     handler.send_header("Access-Control-Allow-Methods", ", ".join(allowed_methods))
     handler.send_header("Access-Control-Allow-Headers", "Content-Type, Authorization")
@@ -0,0 +1,148 @@
+"""
+Cliente HTTP con conexiones keep-alive reutilizables por host.
+
+El pool vive a nivel de módulo, así que una función tibia de Vercel reutiliza las conexiones TCP+TLS
+entre invocaciones. Es seguro entre threads: cada conexión la usa un solo thread a la vez y la
+cantidad abierta por host está acotada.
+"""
+
+from __future__ import annotations
+
+import http.client
+import time
+from dataclasses import dataclass
+from email.message import Message
+from threading import BoundedSemaphore, Lock
+from typing import Dict, List, Mapping, Tuple
+from urllib.error import URLError
+from urllib.parse import urljoin, urlsplit
+
+MAX_CONNECTIONS_PER_HOST = 8
+# Conexiones ociosas por más tiempo que esto se descartan; los servidores suelen cortarlas antes.
+IDLE_TIMEOUT_SECONDS = 45.0
+MAX_REDIRECTS = 3
+
+_HostKey = Tuple[str, str]
+
+
+@dataclass(frozen=True)
+class PooledResponse:
+    url: str
+    status: int
+    headers: Message
+    body: bytes
+
+
+class ConnectionPool:
+    def __init__(self, max_per_host: int = MAX_CONNECTIONS_PER_HOST) -> None:
+        self.max_per_host = max_per_host
+        self._idle: Dict[_HostKey, List[Tuple[http.client.HTTPConnection, float]]] = {}
+        self._slots: Dict[_HostKey, BoundedSemaphore] = {}
+        self._lock = Lock()
+
+    def request(
+        self,
+        method: str,
+        url: str,
+        *,
+        headers: Mapping[str, str] | None = None,
+        body: bytes | None = None,
+        timeout: float = 20.0,
+    ) -> PooledResponse:
+        """Ejecuta la petición siguiendo redirecciones; los errores de red se levantan como `URLError`."""
+        for _ in range(MAX_REDIRECTS + 1):
+            response = self._send(method, url, headers or {}, body, timeout)
+            location = response.headers.get("Location")
+            if response.status not in (301, 302, 303, 307, 308) or not location:
+                return response
+            url = urljoin(url, location)
+        return response
+
+    def clear(self) -> None:
+        with self._lock:
+            keys = list(self._idle)
+        for key in keys:
+            self._discard_idle(key)
+
+    def _send(self, method: str, url: str, headers: Mapping[str, str], body: bytes | None, timeout: float) -> PooledResponse:
+        parts = urlsplit(url)
+        if parts.scheme not in ("http", "https") or not parts.netloc:
+            raise URLError(f"URL no soportada: {url}")
+        key = (parts.scheme, parts.netloc)
+        target = (parts.path or "/") + (f"?{parts.query}" if parts.query else "")
+
+        slot = self._slot(key)
+        slot.acquire()
+        try:
+            # Una conexión reutilizada puede haber sido cerrada por el servidor (y probablemente las demás
+            # ociosas del host también): se descartan y se reintenta una vez con una conexión nueva.
+            for attempt in range(2):
+                connection, reused = self._checkout(key, timeout, reuse=attempt == 0)
+                try:
+                    connection.request(method, target, body=body, headers=dict(headers))
+                    response = connection.getresponse()
+                    payload = response.read()
+                except (http.client.HTTPException, OSError) as error:
+                    connection.close()
+                    if reused:
+                        self._discard_idle(key)
+                        continue
+                    raise URLError(error) from error
+                if response.will_close:
+                    connection.close()
+                else:
+                    self._checkin(key, connection)
+                return PooledResponse(url=url, status=response.status, headers=response.headers, body=payload)
+        finally:
+            slot.release()
+        raise URLError(f"No se pudo completar la petición a {url}.")
+
+    def _slot(self, key: _HostKey) -> BoundedSemaphore:
+        with self._lock:
+            return self._slots.setdefault(key, BoundedSemaphore(self.max_per_host))
+
+    def _checkout(self, key: _HostKey, timeout: float, *, reuse: bool = True) -> Tuple[http.client.HTTPConnection, bool]:
+        now = time.monotonic()
+        with self._lock:
+            idle = self._idle.get(key, []) if reuse else []
+            while idle:
+                connection, released_at = idle.pop()
+                if now - released_at < IDLE_TIMEOUT_SECONDS and connection.sock is not None:
+                    connection.sock.settimeout(timeout)
+                    return connection, True
+                connection.close()
+        scheme, netloc = key
+        factory = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+        return factory(netloc, timeout=timeout), False
+
+    def _discard_idle(self, key: _HostKey) -> None:
+        with self._lock:
+            idle = self._idle.pop(key, [])
+        for connection, _ in idle:
+            connection.close()
+
+    def _checkin(self, key: _HostKey, connection: http.client.HTTPConnection) -> None:
+        with self._lock:
+            idle = self._idle.setdefault(key, [])
+            if len(idle) < self.max_per_host:
+                idle.append((connection, time.monotonic()))
+                return
+        connection.close()
+
+
+_pool = ConnectionPool()
+
+
+def request(
+    method: str,
+    url: str,
+    *,
+    headers: Mapping[str, str] | None = None,
+    body: bytes | None = None,
+    timeout: float = 20.0,
+) -> PooledResponse:
+    return _pool.request(method, url, headers=headers, body=body, timeout=timeout)
+
+
+def get(url: str, *, headers: Mapping[str, str] | None = None, timeout: float = 20.0) -> PooledResponse:
+    return request("GET", url, headers=headers, timeout=timeout)
@@ -0,0 +1,104 @@
+"""Histórico compacto (fecha → valor) de los indicadores económicos, sólo con agregados al final."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from datetime import date
+from typing import Any, Dict, Iterable
+
+import numpy as np
+
+HISTORY_KEYS = ("uf", "utm", "dollar_observed", "ipc")
+# Derivadas del histórico guardado; se calculan al consultar.
+DERIVED_KEYS = ("ipc_annual",)
+IPC_WINDOW_MONTHS = 12
+
+
+def load_history(payload: Dict[str, Any] | None) -> Dict[str, Dict[str, list]]:
+    """Copia editable de las series guardadas (una por clave, aunque esté vacía)."""
+    stored = (payload or {}).get("series") or {}
+    return {
+        key: {
+            "dates": list((stored.get(key) or {}).get("dates") or []),
+            "values": list((stored.get(key) or {}).get("values") or []),
+        }
+        for key in HISTORY_KEYS
+    }
+
+
+def last_observed(history: Dict[str, Dict[str, list]], key: str) -> str | None:
+    dates = history[key]["dates"]
+    return dates[-1] if dates else None
+
+
+def append_observations(history: Dict[str, Dict[str, list]], key: str, points: Iterable[tuple[str, float]]) -> int:
+    """Agrega sólo las observaciones posteriores a la última guardada; devuelve cuántas entraron."""
+    series = history[key]
+    last = last_observed(history, key)
+    added = 0
+    for observed_at, value in sorted(dict(points).items()):
+        if last is None or observed_at > last:
+            series["dates"].append(observed_at)
+            series["values"].append(value)
+            last = observed_at
+            added += 1
+    return added
+
+
+def rolling_annual_ipc(history: Dict[str, Dict[str, list]]) -> tuple[list[str], list[float]]:
+    """IPC acumulado en 12 meses (%) para cada mes precedido por 11 meses consecutivos."""
+    dates, values = _annual_ipc_windows(history)
+    return dates, np.round(values, 2).tolist()
+
+
+def latest_annual_ipc(history: Dict[str, Dict[str, list]]) -> tuple[float, str]:
+    dates, values = _annual_ipc_windows(history)
+    if not dates:
+        raise RuntimeError("No hay 12 observaciones mensuales consecutivas para calcular IPC anual.")
+    return round(float(values[-1]), 1), dates[-1]
+
+
+def _annual_ipc_windows(history: Dict[str, Dict[str, list]]) -> tuple[list[str], np.ndarray]:
+    """Producto móvil sin redondear; se descartan las ventanas con meses faltantes en el histórico."""
+    dates = history["ipc"]["dates"]
+    if len(dates) < IPC_WINDOW_MONTHS:
+        return [], np.array([], dtype=float)
+    growth = np.cumsum(np.log1p(np.asarray(history["ipc"]["values"], dtype=float) / 100))
+    window = growth[IPC_WINDOW_MONTHS - 1 :] - np.concatenate(([0.0], growth[:-IPC_WINDOW_MONTHS]))
+    months = np.array([int(value[:4]) * 12 + int(value[5:7]) for value in dates])
+    consecutive = months[IPC_WINDOW_MONTHS - 1 :] - months[: len(months) - IPC_WINDOW_MONTHS + 1] == IPC_WINDOW_MONTHS - 1
+    window_dates = dates[IPC_WINDOW_MONTHS - 1 :]
+    return [day for day, keep in zip(window_dates, consecutive) if keep], np.expm1(window[consecutive]) * 100
+
+
+def query_history(
+    history: Dict[str, Dict[str, list]],
+    keys: Iterable[str],
+    *,
+    start: str | None = None,
+    end: str | None = None,
+) -> Dict[str, Dict[str, list]]:
+    """Rango `[start, end]` de cada serie pedida, en formato columnar."""
+    for label, value in (("start", start), ("end", end)):
+        if value is not None:
+            try:
+                date.fromisoformat(value)
+            except ValueError as error:
+                raise ValueError(f"El parámetro '{label}' debe tener formato YYYY-MM-DD.") from error
+
+    available = HISTORY_KEYS + DERIVED_KEYS
+    requested = list(dict.fromkeys(keys)) or list(available)
+    unknown = [key for key in requested if key not in available]
+    if unknown:
+        raise ValueError(f"Indicadores desconocidos: {', '.join(unknown)}. Usa {', '.join(available)}.")
+
+    output = {}
+    for key in requested:
+        if key == "ipc_annual":
+            dates, values = rolling_annual_ipc(history)
+        else:
+            dates, values = history[key]["dates"], history[key]["values"]
+        lower = bisect_left(dates, start) if start else 0
+        upper = bisect_right(dates, end) if end else len(dates)
+        output[key] = {"dates": dates[lower:upper], "values": values[lower:upper]}
+    return output
@@ -6,17 +6,54 @@ import json
 import os
 from dataclasses import asdict, dataclass
 from datetime import UTC, datetime
-from math import prod
-from typing import Any, Dict
-from urllib.error import HTTPError, URLError
-from urllib.request import Request, urlopen
-
-from backend.storage import INDICATORS_DATASET, LATEST_DATASET, StorageMeta, read_dataset, write_dataset
-from scripts.fetch_data import generate_offline_payload, generate_online_payload
-from scripts.validate_json import ValidationError, validate_payload
+from typing import Any, Dict, Sequence
+from urllib.error import URLError
+from urllib.parse import urlparse
+
+from backend import http_pool
+from backend.delta import build_delta
+from backend.indicator_history import append_observations, last_observed, latest_annual_ipc, load_history, query_history
+from backend.storage import (
+    CONTENT_HASH_FIELD,
+    CORRELATIONS_DATASET,
+    FX_HISTORY_DATASET,
+    INDICATOR_HISTORY_DATASET,
+    INDICATORS_DATASET,
+    LATEST_DATASET,
+    StorageMeta,
+    compute_content_hash,
+    read_dataset,
+    read_dataset_version,
+    read_freshness,
+    write_dataset,
+)
+from backend.upstream_cache import get_cached_response, store_response
+from scripts.async_fetch import FetchPolicy, RetryableError, raise_first_error, run_calls
+from scripts.correlations import build_correlation_payload
+from scripts.fetch_data import (
+    generate_offline_payload,
+    generate_online_payload,
+    generate_partial_payload,
+    select_symbols,
+)
+from scripts.fx import FX_PAIR
+from scripts.portfolio_config import load_platform_config
+from scripts.validate_json import (
+    ValidationError,
+    validate_correlations_payload,
+    validate_indicators_payload,
+    validate_payload,
+)
 
 
 DEFAULT_COOLDOWN_SECONDS = 600
+# Un refresh parcial sólo vuelve a descargar unos pocos holdings: espera menos que uno completo.
+DEFAULT_PARTIAL_COOLDOWN_SECONDS = 60
+# Las fuentes públicas son gratuitas: pocas conexiones por host y reintentos cortos. El tope total
+# deja lugar, dentro de los 60 s de la función, para el fallback o para la descarga de precios.
+UPSTREAM_FETCH_POLICY = FetchPolicy(concurrency=6, per_host_interval=0.1, timeout=10.0, retries=2, deadline=20.0)
+# Años de dólar observado a descargar la primera vez (cubre la ventana de 5 años de precios).
+FX_HISTORY_YEARS = 6
 MINDICADOR_API_URL = "https://mindicador.cl/api"
 FINDIC_API_URL = "https://findic.cl/api"
 
@@ -58,53 +95,193 @@ class RefreshResult:
         return asdict(self)
 
 
-def refresh_latest_dataset(*, force: bool = False, mode: str = "online") -> RefreshResult:
-    existing_payload = _safe_read_payload(LATEST_DATASET)
-    if not force and _is_recent(existing_payload, LATEST_DATASET.timestamp_field):
+def refresh_latest_dataset(
+    *,
+    force: bool = False,
+    mode: str = "online",
+    tickers: Sequence[str] = (),
+    platforms: Sequence[str] = (),
+) -> RefreshResult:
+    """
+    Regenera latest.json. Con `tickers`/`platforms` sólo se vuelven a descargar esos holdings y el
+    resto se toma del snapshot vigente; si todavía no hay snapshot, el refresh es completo.
+
+    Un refresh parcial tiene su propio enfriamiento (`PARTIAL_REFRESH_COOLDOWN_SECONDS`), más corto
+    que el del completo. Una selección con tickers o plataformas desconocidas levanta `SelectionError`.
+    """
+    selected = select_symbols(load_platform_config(), tickers, platforms) if tickers or platforms else []
+    existing_payload, existing_meta = _safe_read_dataset(LATEST_DATASET)
+    partial = bool(selected) and existing_payload is not None
+    cooldown = (
+        _read_cooldown_seconds("PARTIAL_REFRESH_COOLDOWN_SECONDS", DEFAULT_PARTIAL_COOLDOWN_SECONDS)
+        if partial
+        else _read_cooldown_seconds()
+    )
+    if not force and _is_fresh(LATEST_DATASET, existing_payload, cooldown):
         return _build_skipped_result(LATEST_DATASET.key, existing_payload, "El dataset principal ya fue actualizado hace poco.")
 
-    if mode == "offline":
+    fx_history = None if mode == "offline" else _load_fx_history()
+    if partial:
+        payload = generate_partial_payload(
+            existing_payload,
+            tickers=tickers,
+            platforms=platforms,
+            offline=mode == "offline",
+            fx_history=fx_history,
+        )
+    elif mode == "offline":
         payload = generate_offline_payload()
     else:
-        payload = generate_online_payload()
+        payload = generate_online_payload(fx_history=fx_history)
 
     try:
         validate_payload(payload)
     except ValidationError as error:
         raise RuntimeError(f"El JSON generado para latest.json no pasó validación: {error}") from error
 
-    storage = write_dataset(LATEST_DATASET, payload)
-    return _build_updated_result(LATEST_DATASET.key, payload, storage, "Datos principales actualizados correctamente.")
+    # `write_dataset` deja el `content_hash` en el payload; las correlaciones se asocian a ese hash.
+    storage = write_dataset(LATEST_DATASET, payload, current=(existing_payload, existing_meta))
+    correlations_error = _refresh_correlations(payload)
+    if storage.unchanged:
+        message = "Los datos principales no cambiaron; sólo se registró el chequeo."
+    elif partial:
+        message = f"Se refrescaron {', '.join(selected)} y se combinaron con el snapshot vigente."
+    else:
+        message = "Datos principales actualizados correctamente."
+    if correlations_error:
+        message = f"{message} {correlations_error}"
+    return _build_updated_result(LATEST_DATASET.key, payload, storage, message)
+
+
+def _refresh_correlations(payload: Dict[str, Any]) -> str | None:
+    """
+    Recalcula el artefacto de correlaciones sin poner en riesgo el snapshot principal, que ya quedó
+    guardado. Si falla, el artefacto anterior se mantiene y se devuelve el motivo.
+    """
+    try:
+        correlations = build_correlation_payload(payload)
+        validate_correlations_payload(correlations)
+        write_dataset(CORRELATIONS_DATASET, correlations)
+    except (ValueError, ValidationError, RuntimeError, OSError) as error:
+        return f"La matriz de correlaciones no se actualizó: {error}"
+    return None
 
 
 def refresh_indicators_dataset(*, force: bool = False) -> RefreshResult:
-    existing_payload = _safe_read_payload(INDICATORS_DATASET)
-    if not force and _is_recent(existing_payload, INDICATORS_DATASET.timestamp_field):
+    existing_payload, existing_meta = _safe_read_dataset(INDICATORS_DATASET)
+    if not force and _is_fresh(INDICATORS_DATASET, existing_payload):
         return _build_skipped_result(
             INDICATORS_DATASET.key,
             existing_payload,
             "Los indicadores públicos ya fueron actualizados hace poco.",
         )
 
-    payload = fetch_public_indicators_payload()
-    storage = write_dataset(INDICATORS_DATASET, payload)
+    stored_history, history_meta = _safe_read_dataset(INDICATOR_HISTORY_DATASET)
+    history = load_history(stored_history)
+    payload = fetch_public_indicators_payload(history)
+
+    try:
+        validate_indicators_payload(payload)
+    except ValidationError as error:
+        raise RuntimeError(f"El JSON generado para indicators/latest.json no pasó validación: {error}") from error
+
+    storage = write_dataset(INDICATORS_DATASET, payload, current=(existing_payload, existing_meta))
+    write_dataset(
+        INDICATOR_HISTORY_DATASET,
+        {"updated_at": payload["fetched_at"], "series": history},
+        current=(stored_history, history_meta),
+    )
     return _build_updated_result(
         INDICATORS_DATASET.key,
         payload,
         storage,
-        "Indicadores públicos actualizados correctamente.",
+        "Los indicadores públicos no cambiaron; sólo se registró el chequeo."
+        if storage.unchanged
+        else "Indicadores públicos actualizados correctamente.",
     )
 
 
+def refresh_fx_history() -> list[Dict[str, Any]]:
+    """
+    Completa el histórico del dólar observado consultando sólo desde el año de la última observación
+    guardada (o los últimos `FX_HISTORY_YEARS` años la primera vez).
+    """
+    existing, existing_meta = _safe_read_dataset(FX_HISTORY_DATASET)
+    observations = {point["date"]: point["value"] for point in (existing or {}).get("observations", [])}
+    current_year = datetime.now(UTC).year
+    first_year = int(max(observations)[:4]) if observations else current_year - FX_HISTORY_YEARS + 1
+
+    years = range(first_year, current_year + 1)
+    pages = _request_json_many([f"{MINDICADOR_API_URL}/dolar/{year}" for year in years])
+    # El año en curso llega vacío el 1 de enero y hasta que se publica su primera observación.
+    for year, page in zip(years, pages):
+        for item in _read_series(page, allow_empty=year == current_year):
+            value = item.get("valor")
+            if isinstance(value, (int, float)):
+                observations[_normalize_public_date(item.get("fecha"))] = float(value)
+
+    payload = {
+        "pair": FX_PAIR,
+        "source": "mindicador",
+        "fetched_at": _iso_now(),
+        "observations": [{"date": day, "value": observations[day]} for day in sorted(observations)],
+    }
+    write_dataset(FX_HISTORY_DATASET, payload, current=(existing, existing_meta))
+    return payload["observations"]
+
+
 def fetch_latest_payload() -> tuple[Dict[str, Any], StorageMeta]:
     return read_dataset(LATEST_DATASET)
 
 
+def fetch_latest_delta(since: str) -> tuple[Dict[str, Any], StorageMeta]:
+    current, meta = read_dataset(LATEST_DATASET)
+    if current.get(LATEST_DATASET.timestamp_field) == since:
+        return build_delta(current, current), meta
+    previous, _ = read_dataset_version(LATEST_DATASET, since)
+    return build_delta(previous, current), meta
+
+
+def fetch_correlations_payload() -> tuple[Dict[str, Any], StorageMeta]:
+    """Lee el artefacto guardado; si todavía no existe, lo calcula desde el snapshot vigente sin guardarlo."""
+    try:
+        return read_dataset(CORRELATIONS_DATASET)
+    except FileNotFoundError:
+        latest, meta = read_dataset(LATEST_DATASET)
+        correlations = build_correlation_payload(latest)
+        correlations[CONTENT_HASH_FIELD] = compute_content_hash(CORRELATIONS_DATASET, correlations)
+        return correlations, StorageMeta(source=f"computed-from-{meta.source}", pathname=meta.pathname)
+
+
 def fetch_indicators_payload() -> tuple[Dict[str, Any], StorageMeta]:
     return read_dataset(INDICATORS_DATASET)
 
 
-def fetch_public_indicators_payload() -> Dict[str, Any]:
+def fetch_indicators_history(
+    keys: list[str],
+    *,
+    start: str | None = None,
+    end: str | None = None,
+) -> tuple[Dict[str, Any], StorageMeta]:
+    try:
+        stored, meta = read_dataset(INDICATOR_HISTORY_DATASET)
+    except FileNotFoundError:
+        stored, meta = None, StorageMeta(source="empty")
+    payload = {
+        "updated_at": (stored or {}).get("updated_at"),
+        "start": start,
+        "end": end,
+        "series": query_history(load_history(stored), keys, start=start, end=end),
+    }
+    return payload, meta
+
+
+def fetch_public_indicators_payload(history: Dict[str, Dict[str, list]] | None = None) -> Dict[str, Any]:
+    """
+    Consulta las fuentes públicas en orden y agrega las observaciones nuevas a `history`.
+
+    Sin `history` se parte de un histórico vacío (sólo sirve para el valor vigente).
+    """
     sources = (
         _fetch_from_mindicador,
         _fetch_from_findic,
@@ -112,8 +289,12 @@ def fetch_public_indicators_payload() -> Dict[str, Any]:
     errors: list[str] = []
 
     for fetcher in sources:
+        # Cada fuente trabaja sobre una copia: si falla a mitad no deja observaciones a medias.
+        candidate = load_history({"series": history})
         try:
-            items = fetcher()
+            items = fetcher(candidate)
+            if history is not None:
+                history.update(candidate)
             return {
                 "items": items,
                 "fetched_at": _iso_now(),
@@ -127,8 +308,17 @@ def fetch_public_indicators_payload() -> Dict[str, Any]:
     raise RuntimeError(f"No se pudo obtener indicadores desde ninguna fuente pública. {details}")
 
 
-def _fetch_from_mindicador() -> list[Dict[str, Any]]:
-    summary = _request_json(MINDICADOR_API_URL)
+def _fetch_from_mindicador(history: Dict[str, Dict[str, list]]) -> list[Dict[str, Any]]:
+    # Con histórico guardado basta pedir desde el año de la última variación mensual conocida.
+    last_ipc = last_observed(history, "ipc")
+    current_year = datetime.now(UTC).year
+    if last_ipc:
+        ipc_years = list(range(int(last_ipc[:4]), current_year + 1))
+        ipc_urls = [f"{MINDICADOR_API_URL}/ipc/{year}" for year in ipc_years]
+    else:
+        ipc_years = [None]
+        ipc_urls = [f"{MINDICADOR_API_URL}/ipc"]
+    summary, *ipc_pages = _request_json_many([MINDICADOR_API_URL, *ipc_urls])
 
     uf = _build_indicator_item(
         key="uf",
@@ -146,19 +336,15 @@ def _fetch_from_mindicador() -> list[Dict[str, Any]]:
         observed_at=_read_top_level_date(summary, "dolar"),
     )
 
-    ipc_history = _request_json(f"{MINDICADOR_API_URL}/ipc")
-    ipc_annual_value, ipc_observed_at = _compute_annual_ipc_from_series(_read_series(ipc_history))
-    ipc = _build_indicator_item(
-        key="ipc_annual",
-        value=ipc_annual_value,
-        observed_at=ipc_observed_at,
-    )
+    # En enero la página del año en curso llega vacía hasta que se publica el IPC de diciembre.
+    for year, page in zip(ipc_years, ipc_pages):
+        _append_series(history, "ipc", _read_series(page, allow_empty=year == current_year))
 
-    return [uf, utm, dollar, ipc]
+    return _finish_items(history, [uf, utm, dollar])
 
 
-def _fetch_from_findic() -> list[Dict[str, Any]]:
-    summary = _request_json(FINDIC_API_URL)
+def _fetch_from_findic(history: Dict[str, Dict[str, list]]) -> list[Dict[str, Any]]:
+    summary, ipc_page = _request_json_many([FINDIC_API_URL, f"{FINDIC_API_URL}/ipc"])
 
     uf = _build_indicator_item(
         key="uf",
@@ -176,43 +362,48 @@ def _fetch_from_findic() -> list[Dict[str, Any]]:
         observed_at=_read_top_level_date(summary, "dolar"),
     )
 
-    ipc_history = _request_json(f"{FINDIC_API_URL}/ipc")
-    ipc_annual_value, ipc_observed_at = _compute_annual_ipc_from_series(_read_series(ipc_history))
-    ipc = _build_indicator_item(
-        key="ipc_annual",
-        value=ipc_annual_value,
-        observed_at=ipc_observed_at,
-    )
+    _append_series(history, "ipc", _read_series(ipc_page))
+
+    return _finish_items(history, [uf, utm, dollar])
 
-    return [uf, utm, dollar, ipc]
+
+def _request_json_many(urls: list[str]) -> list[Dict[str, Any]]:
+    """Consulta las URLs en paralelo sobre la capa asyncio; falla con el primer error en orden."""
+    calls = [(urlparse(url).netloc, _request_json, (url,)) for url in urls]
+    return raise_first_error(run_calls(calls, UPSTREAM_FETCH_POLICY))
 
 
 def _request_json(url: str) -> Dict[str, Any]:
-    request = Request(
-        url,
-        headers={
-            "Accept": "application/json",
-            "Cache-Control": "no-cache",
-            "Pragma": "no-cache",
-            "User-Agent": "portafolio-tracker/1.0",
-        },
-        method="GET",
-    )
+    # Consulta condicional: si la fuente no publicó nada nuevo responde 304 y se reutiliza el cuerpo guardado.
+    cached = get_cached_response(url)
+    headers = {
+        "Accept": "application/json",
+        "Cache-Control": "no-cache",
+        "User-Agent": "portafolio-tracker/1.0",
+        **(cached.conditional_headers() if cached else {}),
+    }
 
     try:
-        with urlopen(request, timeout=30) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except HTTPError as error:
-        details = _read_http_error_details(error)
-        raise RuntimeError(f"La fuente pública {url} respondió HTTP {error.code}: {details}.") from error
+        response = http_pool.get(url, headers=headers, timeout=UPSTREAM_FETCH_POLICY.timeout)
     except (URLError, TimeoutError) as error:
-        raise RuntimeError(f"No se pudo conectar con la fuente pública {url}.") from error
-    except json.JSONDecodeError as error:
+        raise RetryableError(f"No se pudo conectar con la fuente pública {url}.") from error
+
+    if response.status == 304 and cached is not None:
+        return cached.body
+    if response.status != 200:
+        details = _read_http_error_details(response.body)
+        error_type = RetryableError if response.status == 429 or response.status >= 500 else RuntimeError
+        raise error_type(f"La fuente pública {url} respondió HTTP {response.status}: {details}.")
+
+    try:
+        payload = json.loads(response.body.decode("utf-8"))
+    except (UnicodeDecodeError, json.JSONDecodeError) as error:
         raise RuntimeError(f"La fuente pública {url} devolvió JSON inválido.") from error
 
     if not isinstance(payload, dict):
         raise RuntimeError(f"La fuente pública {url} no devolvió un objeto JSON válido.")
 
+    store_response(url, payload, etag=response.headers.get("ETag"), last_modified=response.headers.get("Last-Modified"))
     return payload
 
 
@@ -249,8 +440,14 @@ def _read_top_level_date(payload: Dict[str, Any], code: str) -> str:
     return _normalize_public_date(raw_date)
 
 
-def _read_series(payload: Dict[str, Any]) -> list[Dict[str, Any]]:
+def _read_series(payload: Dict[str, Any], *, allow_empty: bool = False) -> list[Dict[str, Any]]:
+    """
+    Observaciones de una página histórica. `allow_empty` acepta una `serie` vacía, como la del año
+    en curso antes de que se publique su primer dato; una respuesta malformada siempre es error.
+    """
     series = payload.get("serie")
+    if allow_empty and isinstance(series, list) and not series:
+        return []
     if not isinstance(series, list) or not series:
         raise RuntimeError("La respuesta histórica no contiene serie.")
     filtered = [item for item in series if isinstance(item, dict)]
@@ -259,25 +456,29 @@ def _read_series(payload: Dict[str, Any]) -> list[Dict[str, Any]]:
     return filtered
 
 
-def _compute_annual_ipc_from_series(series: list[Dict[str, Any]]) -> tuple[float, str]:
-    monthly_points = []
-    for item in series:
-        value = item.get("valor")
-        raw_date = item.get("fecha")
-        if not isinstance(value, (int, float)):
-            continue
-        normalized_date = _normalize_public_date(raw_date)
-        monthly_points.append((normalized_date, float(value)))
+def _append_series(history: Dict[str, Dict[str, list]], key: str, series: list[Dict[str, Any]]) -> None:
+    append_observations(
+        history,
+        key,
+        (
+            (_normalize_public_date(item.get("fecha")), float(item["valor"]))
+            for item in series
+            if isinstance(item.get("valor"), (int, float))
+        ),
+    )
 
-    if len(monthly_points) < 12:
-        raise RuntimeError("No hay suficientes observaciones mensuales para calcular IPC anual.")
 
-    monthly_points.sort(key=lambda item: item[0], reverse=True)
-    latest_twelve = monthly_points[:12]
-    annual_factor = prod((1 + (value / 100)) for _, value in latest_twelve)
-    annual_value = (annual_factor - 1) * 100
-    observed_at = latest_twelve[0][0]
-    return round(annual_value, 1), observed_at
+def _finish_items(history: Dict[str, Dict[str, list]], items: list[Dict[str, Any]]) -> list[Dict[str, Any]]:
+    """Registra los valores vigentes en el histórico y agrega el IPC anual calculado desde él."""
+    for item in items:
+        append_observations(history, item["key"], [(item["observed_at"], item["value"])])
+    ipc_annual_value, ipc_observed_at = latest_annual_ipc(history)
+    ipc = _build_indicator_item(
+        key="ipc_annual",
+        value=ipc_annual_value,
+        observed_at=ipc_observed_at,
+    )
+    return [*items, ipc]
 
 
 def _normalize_public_date(raw_value: Any) -> str:
@@ -304,15 +505,35 @@ def _source_url_for(fetcher_name: str) -> str:
     return ""
 
 
-def _safe_read_payload(dataset) -> Dict[str, Any] | None:
+def _load_fx_history() -> list[Dict[str, Any]] | None:
+    """Dólar observado para las series por moneda; si la fuente falla se usa lo ya guardado."""
+    try:
+        return refresh_fx_history()
+    except RuntimeError:
+        stored, _ = _safe_read_dataset(FX_HISTORY_DATASET)
+        return (stored or {}).get("observations") or None
+
+
+def _safe_read_dataset(dataset) -> tuple[Dict[str, Any] | None, StorageMeta | None]:
     try:
-        payload, _ = read_dataset(dataset)
-        return payload
+        return read_dataset(dataset)
     except (FileNotFoundError, RuntimeError, json.JSONDecodeError):
-        return None
+        return None, None
 
 
-def _is_recent(payload: Dict[str, Any] | None, timestamp_field: str) -> bool:
+def _is_fresh(dataset, payload: Dict[str, Any] | None, cooldown_seconds: int | None = None) -> bool:
+    cooldown_seconds = _read_cooldown_seconds() if cooldown_seconds is None else cooldown_seconds
+    if _is_recent(payload, dataset.timestamp_field, cooldown_seconds):
+        return True
+    # Un refresh sin cambios no crea snapshot nuevo, pero sí deja registrado cuándo se chequeó.
+    try:
+        freshness = read_freshness(dataset)
+    except RuntimeError:
+        return False
+    return _is_recent(freshness, "checked_at", cooldown_seconds)
+
+
+def _is_recent(payload: Dict[str, Any] | None, timestamp_field: str, cooldown_seconds: int) -> bool:
     if not payload:
         return False
 
@@ -326,28 +547,24 @@ def _is_recent(payload: Dict[str, Any] | None, timestamp_field: str) -> bool:
         return False
 
     delta = datetime.now(UTC) - parsed.astimezone(UTC)
-    return delta.total_seconds() < _read_cooldown_seconds()
+    return delta.total_seconds() < cooldown_seconds
 
 
-def _read_cooldown_seconds() -> int:
-    raw_value = os.getenv("REFRESH_COOLDOWN_SECONDS", str(DEFAULT_COOLDOWN_SECONDS)).strip()
+def _read_cooldown_seconds(name: str = "REFRESH_COOLDOWN_SECONDS", default: int = DEFAULT_COOLDOWN_SECONDS) -> int:
+    raw_value = os.getenv(name, str(default)).strip()
     try:
         value = int(raw_value)
     except ValueError:
-        return DEFAULT_COOLDOWN_SECONDS
+        return default
     return max(0, value)
 
 
-def _read_http_error_details(error: HTTPError) -> str:
-    try:
-        body = error.read().decode("utf-8", errors="replace").strip()
-    except Exception:
-        return "sin cuerpo"
-
-    if not body:
+def _read_http_error_details(body: bytes) -> str:
+    text = body.decode("utf-8", errors="replace").strip()
+    if not text:
         return "sin cuerpo"
 
-    compact = " ".join(body.split())
+    compact = " ".join(text.split())
     return compact[:240]
 
 
@@ -380,7 +597,7 @@ def _build_updated_result(
     timestamp = payload.get(timestamp_field)
     return RefreshResult(
         dataset=dataset,
-        status="updated",
+        status="unchanged" if storage.unchanged else "updated",
         message=message,
         timestamp=timestamp if isinstance(timestamp, str) else None,
         storage=storage.source,
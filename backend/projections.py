@@ -0,0 +1,105 @@
+"""Proyecciones Monte Carlo servidas por la API, cacheadas por snapshot."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import tempfile
+from collections import OrderedDict
+from dataclasses import asdict
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict
+
+from backend.portfolio_refresh import fetch_latest_payload
+from scripts.atomic_file import write_atomic
+from scripts.backtest import platform_histories
+from scripts.platform_nav import DEFAULT_REBALANCE
+from scripts.projections import PROJECTION_METHODS, ProjectionConfig, project_platform
+
+PROJECTION_CACHE_DIR = Path(tempfile.gettempdir()) / "portfolio-projections"
+MAX_CACHED_PROJECTIONS = 16
+# El endpoint es público: estos topes acotan el tiempo y la memoria de una proyección no cacheada.
+MAX_PROJECTION_PATHS = 5000
+MAX_PROJECTION_YEARS = 10
+
+_projections: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+_projections_lock = Lock()
+
+
+def get_platform_projection(
+    platform_id: str,
+    *,
+    paths: int = ProjectionConfig.paths,
+    years: int = ProjectionConfig.years,
+    method: str = ProjectionConfig.method,
+) -> Dict[str, Any]:
+    """
+    Calcula (o recupera) la proyección de una plataforma sobre el snapshot vigente.
+
+    La clave combina el `content_hash` del snapshot con los parámetros; como la semilla es fija,
+    el mismo snapshot siempre produce la misma proyección y se puede cachear en memoria y en `/tmp`.
+    """
+    if method not in PROJECTION_METHODS:
+        raise ValueError(f"Método inválido: {method}. Usa {', '.join(PROJECTION_METHODS)}.")
+    if not 1 <= paths <= MAX_PROJECTION_PATHS:
+        raise ValueError(f"El parámetro 'paths' debe estar entre 1 y {MAX_PROJECTION_PATHS}.")
+    if not 1 <= years <= MAX_PROJECTION_YEARS:
+        raise ValueError(f"El parámetro 'years' debe estar entre 1 y {MAX_PROJECTION_YEARS}.")
+
+    payload, _ = fetch_latest_payload()
+    platform = next((item for item in payload.get("platforms", []) if item.get("id") == platform_id), None)
+    if platform is None:
+        raise ValueError(f"No existe la plataforma {platform_id}.")
+
+    config = ProjectionConfig(
+        paths=paths,
+        years=years,
+        method=method,
+        rebalance=platform.get("nav_rebalance", DEFAULT_REBALANCE),
+    )
+    snapshot = payload.get("content_hash") or payload.get("generated_at")
+    key = hashlib.sha256(json.dumps([snapshot, platform_id, asdict(config)], sort_keys=True).encode("utf-8")).hexdigest()
+
+    cached = _cached_projection(key)
+    if cached is not None:
+        return cached
+
+    histories, weights = platform_histories(payload, platform_id)
+    projection = {
+        "platform_id": platform_id,
+        "generated_at": payload.get("generated_at"),
+        "content_hash": payload.get("content_hash"),
+        **project_platform(histories, weights, config),
+    }
+    _remember_projection(key, projection)
+    return projection
+
+
+def _cached_projection(key: str) -> Dict[str, Any] | None:
+    with _projections_lock:
+        cached = _projections.get(key)
+        if cached is not None:
+            _projections.move_to_end(key)
+            return cached
+
+    cache_path = PROJECTION_CACHE_DIR / f"{key}.json"
+    try:
+        cached = json.loads(cache_path.read_text(encoding="utf-8"))
+    except (OSError, ValueError):
+        return None
+    _remember_projection(key, cached, persist=False)
+    return cached
+
+
+def _remember_projection(key: str, projection: Dict[str, Any], *, persist: bool = True) -> None:
+    with _projections_lock:
+        _projections[key] = projection
+        while len(_projections) > MAX_CACHED_PROJECTIONS:
+            _projections.popitem(last=False)
+    if not persist:
+        return
+    try:
+        write_atomic(PROJECTION_CACHE_DIR / f"{key}.json", json.dumps(projection, separators=(",", ":")))
+    except OSError:
+        pass
@@ -0,0 +1,176 @@
+"""Índice en memoria por ticker y fecha para responder rangos de series sin recorrer todo el snapshot."""
+
+from __future__ import annotations
+
+from bisect import bisect_left, bisect_right
+from dataclasses import dataclass
+from datetime import date, timedelta
+from threading import Lock
+from typing import Any, Dict, Iterable, List, Tuple
+
+from backend.storage import (
+    CONTENT_HASH_FIELD,
+    LATEST_DATASET,
+    StorageMeta,
+    load_series,
+    read_dataset,
+    read_freshness,
+    should_use_blob_storage,
+)
+
+RESOLUTIONS = ("daily", "weekly", "monthly")
+
+
+@dataclass(frozen=True)
+class TickerSeries:
+    dates: List[str]
+    closes: List[float]
+
+
+class SeriesIndex:
+    """
+    Índice de un snapshot: cada ticker se carga y ordena la primera vez que se consulta.
+
+    Si el snapshot es un manifiesto por chunks, sólo se descargan los chunks del ticker pedido.
+    """
+
+    def __init__(self, payload: Dict[str, Any], meta: StorageMeta):
+        self.meta = meta
+        self.generated_at = payload.get("generated_at")
+        self._refs: Dict[str, Any] = {}
+        self._info: Dict[str, Dict[str, Any]] = {}
+        for platform in payload.get("platforms", []):
+            for holding in platform.get("holdings", []):
+                ticker = holding.get("ticker")
+                if not isinstance(ticker, str) or ticker in self._refs:
+                    continue
+                self._refs[ticker] = (holding.get("series") or {}).get("price_history", [])
+                self._info[ticker] = {"currency": holding.get("currency"), "display_name": holding.get("display_name")}
+        self._series: Dict[str, TickerSeries] = {}
+        self._lock = Lock()
+
+    @property
+    def tickers(self) -> List[str]:
+        return list(self._refs)
+
+    def get(self, ticker: str) -> TickerSeries:
+        series = self._series.get(ticker)
+        if series is not None:
+            return series
+        if ticker not in self._refs:
+            raise KeyError(ticker)
+        with self._lock:
+            if ticker not in self._series:
+                points = sorted(load_series(self._refs[ticker], self.meta), key=lambda point: point["date"])
+                self._series[ticker] = TickerSeries(
+                    dates=[point["date"] for point in points],
+                    closes=[point["close"] for point in points],
+                )
+        return self._series[ticker]
+
+    def query(self, ticker: str, *, start: str | None, end: str | None, resolution: str) -> Dict[str, Any]:
+        series = self.get(ticker)
+        lower = bisect_left(series.dates, start) if start else 0
+        upper = bisect_right(series.dates, end) if end else len(series.dates)
+        dates, closes = series.dates[lower:upper], series.closes[lower:upper]
+        if resolution != "daily":
+            dates, closes = resample_last(dates, closes, resolution)
+        return {**self._info[ticker], "resolution": resolution, "dates": dates, "closes": closes}
+
+
+_index_lock = Lock()
+_current_index: Tuple[str, SeriesIndex] | None = None
+
+
+def get_series_index() -> SeriesIndex:
+    """
+    Devuelve el índice del snapshot vigente. El manifiesto sólo se vuelve a leer cuando cambia la
+    firma del snapshot (registro de frescura en Blob, `mtime` y tamaño del archivo en local).
+    """
+    global _current_index
+    signature = _snapshot_signature()
+    with _index_lock:
+        if signature is not None and _current_index is not None and _current_index[0] == signature:
+            return _current_index[1]
+
+    manifest, meta = read_dataset(LATEST_DATASET, assemble=False)
+    key = signature or f"{meta.source}:{meta.pathname}:{manifest.get(CONTENT_HASH_FIELD) or manifest.get('generated_at')}"
+    with _index_lock:
+        if _current_index is None or _current_index[0] != key:
+            _current_index = (key, SeriesIndex(manifest, meta))
+        return _current_index[1]
+
+
+def _snapshot_signature() -> str | None:
+    """Identifica el snapshot vigente sin leer el manifiesto; None si no hay cómo saberlo barato."""
+    if should_use_blob_storage():
+        try:
+            record = read_freshness(LATEST_DATASET)
+        except RuntimeError:
+            return None
+        if not record or not record.get(CONTENT_HASH_FIELD) or not record.get("pathname"):
+            return None
+        return f"blob:{record['pathname']}:{record[CONTENT_HASH_FIELD]}"
+    try:
+        stat = LATEST_DATASET.local_path.stat()
+    except OSError:
+        return None
+    return f"local:{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def query_series(
+    tickers: Iterable[str],
+    *,
+    start: str | None = None,
+    end: str | None = None,
+    resolution: str = "daily",
+) -> Dict[str, Any]:
+    if resolution not in RESOLUTIONS:
+        raise ValueError(f"Resolución inválida: {resolution}. Usa {', '.join(RESOLUTIONS)}.")
+    for label, value in (("start", start), ("end", end)):
+        if value is not None:
+            try:
+                date.fromisoformat(value)
+            except ValueError as error:
+                raise ValueError(f"El parámetro '{label}' debe tener formato YYYY-MM-DD.") from error
+
+    index = get_series_index()
+    requested = list(dict.fromkeys(tickers)) or index.tickers
+    unknown = [ticker for ticker in requested if ticker not in index.tickers]
+    if unknown:
+        raise ValueError(f"Tickers desconocidos: {', '.join(unknown)}.")
+
+    return {
+        "generated_at": index.generated_at,
+        "start": start,
+        "end": end,
+        "resolution": resolution,
+        "series": {ticker: index.query(ticker, start=start, end=end, resolution=resolution) for ticker in requested},
+    }
+
+
+def resample_last(dates: List[str], closes: List[float], resolution: str) -> Tuple[List[str], List[float]]:
+    """
+    Último cierre de cada semana ISO o de cada mes, etiquetado con el inicio del período (lunes o
+    día 1), igual que los niveles de `scripts/series_pyramid.py`.
+    """
+    period_start = _week_start if resolution == "weekly" else _month_start
+    sampled_dates: List[str] = []
+    sampled_closes: List[float] = []
+    for current_date, close in zip(dates, closes):
+        label = period_start(current_date)
+        if sampled_dates and sampled_dates[-1] == label:
+            sampled_closes[-1] = close
+        else:
+            sampled_dates.append(label)
+            sampled_closes.append(close)
+    return sampled_dates, sampled_closes
+
+
+def _week_start(value: str) -> str:
+    day = date.fromisoformat(value)
+    return (day - timedelta(days=day.weekday())).isoformat()
+
+
+def _month_start(value: str) -> str:
+    return f"{value[:7]}-01"
@@ -0,0 +1,184 @@
+"""Vistas livianas de `latest.json`: resolución semanal/mensual (pirámides) y downsampling LTTB."""
+
+from __future__ import annotations
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Dict, List
+
+import numpy as np
+
+from backend.downsample import lttb_indices
+from backend.series_index import resample_last
+from scripts.fx import CURRENCY_SERIES
+from scripts.series_pyramid import PYRAMID_LEVELS, PYRAMID_SERIES
+
+VIEW_RESOLUTIONS = ("daily",) + PYRAMID_LEVELS
+MIN_VIEW_POINTS = 3
+MAX_CACHED_VIEWS = 8
+
+_views: "OrderedDict[tuple, Dict[str, Any]]" = OrderedDict()
+_views_lock = Lock()
+
+
+def build_resolution_view(payload: Dict[str, Any], resolution: str) -> Dict[str, Any]:
+    """
+    Devuelve el payload con cada serie a la resolución pedida más la cola diaria reciente.
+
+    `daily` devuelve el payload tal cual. Las vistas quedan cacheadas por `content_hash`.
+    """
+    if resolution not in VIEW_RESOLUTIONS:
+        raise ValueError(f"Resolución inválida: {resolution}. Usa {', '.join(VIEW_RESOLUTIONS)}.")
+    if resolution == "daily":
+        return payload
+    return _cached_view(payload, (resolution,), lambda: _build_view(payload, resolution))
+
+
+def build_downsampled_view(payload: Dict[str, Any], points: int) -> Dict[str, Any]:
+    """
+    Reduce `timeseries_5y`, cada `normalized_5y` (junto con su `price_history`), las series por
+    moneda y el NAV de cada plataforma a `points` puntos con LTTB.
+
+    Los datasets del gráfico comparten buckets para seguir usando un único arreglo de etiquetas.
+    Las pirámides no viajan en esta vista.
+    """
+    if points < MIN_VIEW_POINTS:
+        raise ValueError(f"El parámetro 'points' debe ser al menos {MIN_VIEW_POINTS}.")
+    return _cached_view(payload, ("points", points), lambda: _build_downsampled_view(payload, points))
+
+
+def _cached_view(payload: Dict[str, Any], variant: tuple, build: Callable[[], Dict[str, Any]]) -> Dict[str, Any]:
+    key = (payload.get("content_hash") or payload.get("generated_at"), payload.get("resolution"), *variant)
+    with _views_lock:
+        cached = _views.get(key)
+        if cached is not None:
+            _views.move_to_end(key)
+            return cached
+
+    view = build()
+    with _views_lock:
+        _views[key] = view
+        while len(_views) > MAX_CACHED_VIEWS:
+            _views.popitem(last=False)
+    return view
+
+
+def _build_downsampled_view(payload: Dict[str, Any], points: int) -> Dict[str, Any]:
+    platforms = []
+    for platform in payload.get("platforms", []):
+        holdings = []
+        for holding in platform.get("holdings", []):
+            series = {
+                name: value
+                for name, value in (holding.get("series") or {}).items()
+                if name not in PYRAMID_SERIES
+            }
+            normalized = series.get("normalized_5y") or []
+            if len(normalized) > points:
+                keep = _lttb_keep(normalized, points)
+                series["normalized_5y"] = [normalized[index] for index in keep]
+                # normalized_5y es proporcional a price_history: los mismos índices conservan su forma.
+                history = series.get("price_history") or []
+                if len(history) == len(normalized):
+                    series["price_history"] = [history[index] for index in keep]
+            for name in CURRENCY_SERIES.values():
+                converted = series.get(name) or []
+                if len(converted) > points:
+                    series[name] = [converted[index] for index in _lttb_keep(converted, points)]
+            holdings.append({**holding, "series": series})
+        platform_series = dict(platform.get("series") or {})
+        nav = platform_series.get("nav") or []
+        if len(nav) > points:
+            platform_series["nav"] = [nav[index] for index in _lttb_keep(nav, points)]
+        platforms.append({**platform, "series": platform_series, "holdings": holdings})
+
+    charts = dict(payload.get("charts") or {})
+    timeseries = charts.get("timeseries_5y") or {}
+    labels = timeseries.get("labels") or []
+    datasets = timeseries.get("datasets") or []
+    if len(labels) > points and datasets:
+        days = np.array(labels, dtype="datetime64[D]").astype(np.int64)
+        values = np.array(
+            [[np.nan if value is None else value for value in dataset.get("data", [])] for dataset in datasets],
+            dtype=float,
+        ).T
+        keep = lttb_indices(days, values, points).tolist()
+        charts["timeseries_5y"] = {
+            **timeseries,
+            "labels": [labels[index] for index in keep],
+            "datasets": [{**dataset, "data": [dataset["data"][index] for index in keep]} for dataset in datasets],
+        }
+    return {**payload, "points": points, "platforms": platforms, "charts": charts}
+
+
+def _lttb_keep(points: List[Dict[str, Any]], threshold: int) -> List[int]:
+    days = np.array([point["date"] for point in points], dtype="datetime64[D]").astype(np.int64)
+    values = np.array([point["value"] for point in points], dtype=float)
+    return lttb_indices(days, values, threshold).tolist()
+
+
+def _build_view(payload: Dict[str, Any], resolution: str) -> Dict[str, Any]:
+    platforms = []
+    for platform in payload.get("platforms", []):
+        holdings = []
+        for holding in platform.get("holdings", []):
+            series = holding.get("series") or {}
+            if resolution in series:
+                series = _resample_series(series, resolution)
+            holdings.append({**holding, "series": series})
+        platforms.append({**platform, "holdings": holdings})
+
+    charts = dict(payload.get("charts") or {})
+    if "timeseries_5y" in charts:
+        charts["timeseries_5y"] = _rebuild_timeseries(platforms, charts["timeseries_5y"])
+    return {**payload, "resolution": resolution, "platforms": platforms, "charts": charts}
+
+
+def _resample_series(series: Dict[str, Any], resolution: str) -> Dict[str, Any]:
+    level = series.get(resolution) or []
+    tail = series.get("daily_tail") or []
+    cutoff = tail[0]["date"] if tail else None
+    points: List[Dict[str, Any]] = [
+        {"date": point["date"], "close": point["close"]}
+        for point in level
+        if cutoff is None or point["date"] < cutoff
+    ]
+    points.extend(tail)
+
+    # La base es la apertura del primer período, que coincide con el primer cierre diario.
+    base = (level[0]["open"] if level else points[0]["close"] if points else 0) or 1.0
+    normalized = [{"date": point["date"], "value": round(100 * point["close"] / base, 2)} for point in points]
+
+    resampled = {name: value for name, value in series.items() if name not in PYRAMID_SERIES}
+    resampled.update({"price_history": points, "normalized_5y": normalized, resolution: level})
+    for name in CURRENCY_SERIES.values():
+        if name in series:
+            resampled[name] = _resample_values(series[name], resolution, cutoff)
+    return resampled
+
+
+def _resample_values(points: List[Dict[str, Any]], resolution: str, cutoff: str | None) -> List[Dict[str, Any]]:
+    """Último valor de cada período antes de `cutoff` y, desde ahí, los puntos diarios."""
+    older = [point for point in points if cutoff is None or point["date"] < cutoff]
+    dates, values = resample_last([point["date"] for point in older], [point["value"] for point in older], resolution)
+    sampled = [{"date": day, "value": value} for day, value in zip(dates, values)]
+    return sampled + points[len(older) :]
+
+
+def _rebuild_timeseries(platforms: List[Dict[str, Any]], previous: Dict[str, Any]) -> Dict[str, Any]:
+    previous_datasets = {(dataset.get("platform_id"), dataset.get("id")): dataset for dataset in previous.get("datasets", [])}
+    labels_set = set()
+    data_maps = []
+    for platform in platforms:
+        for holding in platform.get("holdings", []):
+            dataset = previous_datasets.get((platform.get("id"), holding.get("ticker")))
+            normalized = (holding.get("series") or {}).get("normalized_5y") or []
+            if dataset is None or not normalized:
+                continue
+            data_map = {point["date"]: point["value"] for point in normalized}
+            labels_set.update(data_map)
+            data_maps.append((dataset, data_map))
+
+    labels = sorted(labels_set)
+    datasets = [{**dataset, "data": [data_map.get(label) for label in labels]} for dataset, data_map in data_maps]
+    return {"labels": labels, "datasets": datasets}
@@ -0,0 +1,126 @@
+"""Partición de snapshots en chunks direccionados por contenido (un chunk por ticker, serie y año)."""
+
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+CHUNKED_LAYOUT = "chunked/v1"
+LAYOUT_FIELD = "storage_layout"
+CHUNK_REF_FIELD = "chunks"
+
+
+def split_snapshot(payload: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, bytes]]:
+    """
+    Devuelve el manifiesto y los chunks nuevos del snapshot.
+
+    Cada serie `series.<nombre>` de cada plataforma y holding (listas de puntos con `date`) se corta por año;
+    en el manifiesto la serie queda como `{"chunks": ["sha256:...", ...]}` en orden cronológico.
+    Chunks con el mismo contenido (mismo ticker en dos plataformas, años cerrados) comparten hash.
+    """
+    chunks: Dict[str, bytes] = {}
+    manifest = dict(payload)
+    manifest[LAYOUT_FIELD] = CHUNKED_LAYOUT
+    platforms = []
+    for platform in payload.get("platforms", []):
+        platform_copy = _with_series(platform, lambda points: _chunk_ref(points, chunks))
+        platform_copy["holdings"] = [
+            _with_series(holding, lambda points: _chunk_ref(points, chunks)) for holding in platform.get("holdings", [])
+        ]
+        platforms.append(platform_copy)
+    manifest["platforms"] = platforms
+    return manifest, chunks
+
+
+def is_manifest(payload: Dict[str, Any]) -> bool:
+    return payload.get(LAYOUT_FIELD) == CHUNKED_LAYOUT
+
+
+def is_chunk_ref(value: Any) -> bool:
+    return isinstance(value, dict) and isinstance(value.get(CHUNK_REF_FIELD), list)
+
+
+def iter_chunk_hashes(manifest: Dict[str, Any]) -> Iterable[str]:
+    for platform in manifest.get("platforms", []):
+        for owner in [platform, *platform.get("holdings", [])]:
+            for value in (owner.get("series") or {}).values():
+                if is_chunk_ref(value):
+                    yield from value[CHUNK_REF_FIELD]
+
+
+def assemble_snapshot(manifest: Dict[str, Any], load_chunk: Callable[[str], List[Dict[str, Any]]]) -> Dict[str, Any]:
+    """Reconstruye el payload completo reemplazando cada referencia por sus puntos."""
+
+    def resolve(value: Any) -> Any:
+        return resolve_chunk_ref(value, load_chunk) if is_chunk_ref(value) else value
+
+    payload = {key: value for key, value in manifest.items() if key != LAYOUT_FIELD}
+    platforms = []
+    for platform in manifest.get("platforms", []):
+        platform_copy = _with_series(platform, resolve)
+        platform_copy["holdings"] = [_with_series(holding, resolve) for holding in platform.get("holdings", [])]
+        platforms.append(platform_copy)
+    payload["platforms"] = platforms
+    return payload
+
+
+def resolve_chunk_ref(value: Dict[str, Any], load_chunk: Callable[[str], List[Dict[str, Any]]]) -> List[Dict[str, Any]]:
+    points: List[Dict[str, Any]] = []
+    for chunk_hash in value[CHUNK_REF_FIELD]:
+        points.extend(load_chunk(chunk_hash))
+    return points
+
+
+def encode_chunk(points: List[Dict[str, Any]]) -> bytes:
+    # Formato columnar: evita repetir los nombres de campo en cada punto.
+    fields = list(points[0].keys()) if points else []
+    body = {"fields": fields, "rows": [[point.get(field) for field in fields] for point in points]}
+    return json.dumps(body, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+
+
+def decode_chunk(raw: bytes) -> List[Dict[str, Any]]:
+    body = json.loads(raw.decode("utf-8"))
+    fields = body["fields"]
+    return [dict(zip(fields, row)) for row in body["rows"]]
+
+
+def chunk_hash(raw: bytes) -> str:
+    return f"sha256:{hashlib.sha256(raw).hexdigest()}"
+
+
+def _with_series(owner: Dict[str, Any], transform: Callable[[Any], Any]) -> Dict[str, Any]:
+    # Copia del holding o plataforma con `transform` aplicado a cada entrada de `series`.
+    copy = dict(owner)
+    series = owner.get("series")
+    if isinstance(series, dict):
+        copy["series"] = {name: transform(value) for name, value in series.items()}
+    return copy
+
+
+def _chunk_ref(points: Any, chunks: Dict[str, bytes]) -> Any:
+    if not _is_dated_series(points):
+        return points
+    return {CHUNK_REF_FIELD: _chunk_series(points, chunks)}
+
+
+def _chunk_series(points: List[Dict[str, Any]], chunks: Dict[str, bytes]) -> List[str]:
+    hashes: List[str] = []
+    start = 0
+    for index in range(1, len(points) + 1):
+        if index < len(points) and points[index]["date"][:4] == points[start]["date"][:4]:
+            continue
+        raw = encode_chunk(points[start:index])
+        digest = chunk_hash(raw)
+        chunks.setdefault(digest, raw)
+        hashes.append(digest)
+        start = index
+    return hashes
+
+
+def _is_dated_series(value: Any) -> bool:
+    return (
+        isinstance(value, list)
+        and bool(value)
+        and all(isinstance(point, dict) and isinstance(point.get("date"), str) for point in value)
+    )
@@ -2,16 +2,33 @@
 
 from __future__ import annotations
 
+import hashlib
+import io
 import json
 import os
+import tempfile
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass
 from datetime import UTC, datetime
 from pathlib import Path
-from typing import Any, Dict, Tuple
-from urllib.error import HTTPError, URLError
-from urllib.request import urlopen
+from typing import Any, Dict, Iterable, List, Tuple
+from urllib.error import URLError
+from urllib.parse import urlencode
 
+from backend import http_pool
 from backend.seed_payloads import INDICATORS_SEED
+from backend.snapshot_chunks import (
+    assemble_snapshot,
+    chunk_hash,
+    decode_chunk,
+    is_chunk_ref,
+    is_manifest,
+    iter_chunk_hashes,
+    resolve_chunk_ref,
+    split_snapshot,
+)
+from scripts.atomic_file import atomic_write, write_atomic
+from scripts.json_stream import JsonStreamWriter
 
 try:
     from vercel.blob import BlobClient, list_objects
@@ -21,6 +38,17 @@ except ImportError:  # pragma: no cover - depende del entorno
 
 
 BASE_DIR = Path(__file__).resolve().parents[1]
+LOCAL_FRESHNESS_DIR = BASE_DIR / ".cache" / "freshness"
+FRESHNESS_BLOB_PREFIX = "portfolio/freshness"
+CONTENT_HASH_FIELD = "content_hash"
+CHUNKS_BLOB_PREFIX = "portfolio/chunks"
+CHUNK_CACHE_DIR = Path(tempfile.gettempdir()) / "portfolio-chunks"
+CHUNK_FETCH_WORKERS = 8
+MAX_CACHED_CHUNKS = 4096
+
+# Los chunks son inmutables (su nombre es su hash), así que se pueden cachear sin invalidación.
+_chunk_cache: Dict[str, bytes] = {}
+_known_chunks: set[str] = set()
 
 
 @dataclass(frozen=True)
@@ -29,6 +57,10 @@ class DatasetConfig:
     local_path: Path
     blob_prefix: str
     timestamp_field: str
+    # Rutas (como tuplas de claves) que cambian en cada refresh aunque los datos sean iguales.
+    volatile_fields: Tuple[Tuple[str, ...], ...] = ()
+    # En Blob, guarda las series de cada holding como chunks por año y un manifiesto liviano.
+    chunked: bool = False
 
 
 @dataclass(frozen=True)
@@ -36,6 +68,7 @@ class StorageMeta:
     source: str
     pathname: str | None = None
     url: str | None = None
+    unchanged: bool = False
 
 
 LATEST_DATASET = DatasetConfig(
@@ -43,6 +76,8 @@ LATEST_DATASET = DatasetConfig(
     local_path=BASE_DIR / "data" / "latest.json",
     blob_prefix="portfolio/latest",
     timestamp_field="generated_at",
+    volatile_fields=(("generated_at",), ("source", "retrieved_at")),
+    chunked=True,
 )
 
 INDICATORS_DATASET = DatasetConfig(
@@ -50,13 +85,49 @@ INDICATORS_DATASET = DatasetConfig(
     local_path=BASE_DIR / "public" / "indicators" / "latest.json",
     blob_prefix="portfolio/indicators",
     timestamp_field="fetched_at",
+    volatile_fields=(("fetched_at",),),
+)
+
+# Histórico de UF, UTM, dólar e IPC mensual; sólo crece con observaciones posteriores a la última guardada.
+INDICATOR_HISTORY_DATASET = DatasetConfig(
+    key="indicator_history",
+    local_path=BASE_DIR / "data" / "indicators_history.json",
+    blob_prefix="portfolio/indicators-history",
+    timestamp_field="updated_at",
+    volatile_fields=(("updated_at",),),
 )
 
+# Dólar observado diario (CLP por USD); crece por año consultado y alimenta las series por moneda.
+FX_HISTORY_DATASET = DatasetConfig(
+    key="fx_usdclp",
+    local_path=BASE_DIR / "data" / "fx_usdclp.json",
+    blob_prefix="portfolio/fx-usdclp",
+    timestamp_field="fetched_at",
+    volatile_fields=(("fetched_at",),),
+)
+
+# Artefacto derivado de latest.json: se regenera en cada refresh del dataset principal.
+CORRELATIONS_DATASET = DatasetConfig(
+    key="correlations",
+    local_path=BASE_DIR / "data" / "correlations.json",
+    blob_prefix="portfolio/correlations",
+    timestamp_field="generated_at",
+    volatile_fields=(("generated_at",),),
+)
+
+
+def read_dataset(config: DatasetConfig, *, assemble: bool = True) -> Tuple[Dict[str, Any], StorageMeta]:
+    """
+    Lee el snapshot vigente.
 
-def read_dataset(config: DatasetConfig) -> Tuple[Dict[str, Any], StorageMeta]:
+    Con `assemble=False` un snapshot por chunks se entrega como manifiesto: cada serie queda
+    como referencia y se puede cargar bajo demanda con `load_series`.
+    """
     if should_use_blob_storage():
         payload, meta = _read_from_blob(config)
         if payload is not None:
+            if is_manifest(payload) and assemble:
+                payload = _assemble_manifest(payload, meta)
             return payload, meta
 
     if config.local_path.exists():
@@ -69,17 +140,102 @@ def read_dataset(config: DatasetConfig) -> Tuple[Dict[str, Any], StorageMeta]:
     raise FileNotFoundError(f"No existe {config.local_path}")
 
 
-def write_dataset(config: DatasetConfig, payload: Dict[str, Any]) -> StorageMeta:
-    if should_use_blob_storage():
-        return _write_to_blob(config, payload)
-
-    if is_running_on_vercel():
+def write_dataset(
+    config: DatasetConfig,
+    payload: Dict[str, Any],
+    *,
+    current: Tuple[Dict[str, Any] | None, StorageMeta | None] | None = None,
+) -> StorageMeta:
+    """
+    Guarda una nueva versión del dataset salvo que su contenido sea idéntico al snapshot vigente.
+
+    `payload` recibe el campo `content_hash`. Si coincide con el del snapshot vigente
+    (`current`, o el que se lea si no se entrega), no se sube nada y sólo se actualiza
+    el registro de frescura del dataset.
+    """
+    use_blob = should_use_blob_storage()
+    if not use_blob and is_running_on_vercel():
         raise RuntimeError(
             "Falta BLOB_READ_WRITE_TOKEN en Vercel. No es seguro depender del filesystem local porque es de solo lectura."
         )
 
-    _write_to_local_file(config.local_path, payload)
-    return StorageMeta(source="local", pathname=_display_path(config.local_path))
+    content_hash = compute_content_hash(config, payload)
+    payload[CONTENT_HASH_FIELD] = content_hash
+
+    # Para comparar basta el manifiesto: trae el `content_hash` sin reensamblar los chunks.
+    current_payload, current_meta = current if current is not None else _safe_read(config, assemble=False)
+    same_backend = current_meta is not None and current_meta.source == ("blob" if use_blob else "local")
+    if current_payload is not None and same_backend and _stored_hash(config, current_payload) == content_hash:
+        _write_freshness(config, content_hash, payload.get(config.timestamp_field), current_meta.pathname)
+        return StorageMeta(
+            source=current_meta.source,
+            pathname=current_meta.pathname,
+            url=current_meta.url,
+            unchanged=True,
+        )
+
+    if use_blob:
+        meta = _write_to_blob(config, payload)
+    else:
+        _write_to_local_file(config.local_path, payload)
+        meta = StorageMeta(source="local", pathname=_display_path(config.local_path))
+    _write_freshness(config, content_hash, payload.get(config.timestamp_field), meta.pathname)
+    return meta
+
+
+def read_dataset_version(config: DatasetConfig, timestamp: str) -> Tuple[Dict[str, Any] | None, StorageMeta | None]:
+    """Busca el snapshot cuyo `timestamp_field` coincide con `timestamp` (None si ya no existe)."""
+    if should_use_blob_storage():
+        stamp = _timestamp_stamp(timestamp)
+        if stamp is None or list_objects is None:
+            return None, None
+        page = list_objects(prefix=f"{config.blob_prefix}/{stamp}", limit=100)
+        for blob in sorted(page.blobs, key=lambda item: item.uploaded_at, reverse=True):
+            payload = _read_blob_json(blob.pathname)
+            if payload is None or payload.get(config.timestamp_field) != timestamp:
+                continue
+            meta = StorageMeta(source="blob", pathname=blob.pathname, url=blob.url)
+            if is_manifest(payload):
+                payload = _assemble_manifest(payload, meta)
+            return payload, meta
+        return None, None
+
+    payload, meta = _safe_read(config)
+    if payload is not None and payload.get(config.timestamp_field) == timestamp:
+        return payload, meta
+    return None, None
+
+
+def load_series(value: Any, meta: StorageMeta) -> List[Dict[str, Any]]:
+    """Devuelve la serie tal cual o, si es una referencia a chunks, sólo los chunks que la componen."""
+    if not is_chunk_ref(value):
+        return value if isinstance(value, list) else []
+    base_url = _blob_base_url(meta)
+    _prefetch_chunks(value["chunks"], base_url)
+    return resolve_chunk_ref(value, lambda digest: _load_chunk(digest, base_url))
+
+
+def read_freshness(config: DatasetConfig) -> Dict[str, Any] | None:
+    """Último chequeo registrado del dataset, aunque no haya generado un snapshot nuevo."""
+    if should_use_blob_storage():
+        return _read_blob_json(_freshness_blob_path(config))
+    path = LOCAL_FRESHNESS_DIR / f"{config.key}.json"
+    if not path.exists():
+        return None
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except json.JSONDecodeError:
+        return None
+
+
+def compute_content_hash(config: DatasetConfig, payload: Dict[str, Any]) -> str:
+    """SHA-256 de la serialización canónica del payload, sin timestamps volátiles ni el propio hash."""
+    stable = _without_paths(payload, (*config.volatile_fields, (CONTENT_HASH_FIELD,)))
+    encoder = json.JSONEncoder(ensure_ascii=False, sort_keys=True, separators=(",", ":"))
+    digest = hashlib.sha256()
+    for chunk in encoder.iterencode(stable):
+        digest.update(chunk.encode("utf-8"))
+    return f"sha256:{digest.hexdigest()}"
 
 
 def should_use_blob_storage() -> bool:
@@ -99,6 +255,64 @@ def is_running_on_vercel() -> bool:
     return bool(os.getenv("VERCEL"))
 
 
+def _safe_read(config: DatasetConfig, *, assemble: bool = True) -> Tuple[Dict[str, Any] | None, StorageMeta | None]:
+    try:
+        return read_dataset(config, assemble=assemble)
+    except (FileNotFoundError, RuntimeError, json.JSONDecodeError):
+        return None, None
+
+
+def read_shared_record(pathname: str) -> Dict[str, Any] | None:
+    """Registro JSON pequeño compartido entre instancias (sólo con Blob; en local no hay nada que compartir)."""
+    if not should_use_blob_storage():
+        return None
+    return _read_blob_json(pathname)
+
+
+def write_shared_record(pathname: str, record: Dict[str, Any]) -> None:
+    if should_use_blob_storage():
+        _put_blob(pathname, json.dumps(record, ensure_ascii=False, separators=(",", ":")).encode("utf-8"), overwrite=True)
+
+
+def _stored_hash(config: DatasetConfig, payload: Dict[str, Any]) -> str:
+    stored = payload.get(CONTENT_HASH_FIELD)
+    if isinstance(stored, str) and stored:
+        return stored
+    return compute_content_hash(config, payload)
+
+
+def _without_paths(payload: Dict[str, Any], paths: Iterable[Tuple[str, ...]]) -> Dict[str, Any]:
+    # Copia superficial sólo a lo largo de las rutas excluidas; el resto se comparte.
+    stripped = dict(payload)
+    for path in paths:
+        node = stripped
+        for key in path[:-1]:
+            child = node.get(key)
+            if not isinstance(child, dict):
+                break
+            node[key] = node = dict(child)
+        else:
+            node.pop(path[-1], None)
+    return stripped
+
+
+def _write_freshness(config: DatasetConfig, content_hash: str, checked_at: Any, pathname: str | None) -> None:
+    record = {
+        "dataset": config.key,
+        CONTENT_HASH_FIELD: content_hash,
+        "checked_at": checked_at if isinstance(checked_at, str) else None,
+        "pathname": pathname,
+    }
+    if should_use_blob_storage():
+        _put_blob(_freshness_blob_path(config), json.dumps(record).encode("utf-8"), overwrite=True)
+        return
+    write_atomic(LOCAL_FRESHNESS_DIR / f"{config.key}.json", json.dumps(record, indent=2))
+
+
+def _freshness_blob_path(config: DatasetConfig) -> str:
+    return f"{FRESHNESS_BLOB_PREFIX}/{config.key}.json"
+
+
 def _read_from_local_file(path: Path) -> Dict[str, Any]:
     if not path.exists():
         raise FileNotFoundError(f"No existe {path}")
@@ -106,9 +320,9 @@ def _read_from_local_file(path: Path) -> Dict[str, Any]:
 
 
 def _write_to_local_file(path: Path, payload: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    serialized = json.dumps(payload, ensure_ascii=False, indent=2)
-    path.write_text(f"{serialized}\n", encoding="utf-8")
+    with atomic_write(path) as fh:
+        JsonStreamWriter(fh.write, indent=2).dump(payload)
+        fh.write("\n")
 
 
 def _read_from_blob(config: DatasetConfig) -> Tuple[Dict[str, Any] | None, StorageMeta]:
@@ -122,45 +336,180 @@ def _read_from_blob(config: DatasetConfig) -> Tuple[Dict[str, Any] | None, Stora
 
     latest_blob = max(blobs, key=lambda item: item.uploaded_at)
     try:
-        with urlopen(latest_blob.url, timeout=20) as response:
-            payload = json.loads(response.read().decode("utf-8"))
-    except (URLError, HTTPError, TimeoutError, json.JSONDecodeError) as error:
+        payload = json.loads(_get_blob_bytes(latest_blob.url).decode("utf-8"))
+    except (URLError, TimeoutError, json.JSONDecodeError) as error:
         raise RuntimeError(f"No se pudo leer el blob {latest_blob.pathname}.") from error
 
     return payload, StorageMeta(source="blob", pathname=latest_blob.pathname, url=latest_blob.url)
 
 
 def _write_to_blob(config: DatasetConfig, payload: Dict[str, Any]) -> StorageMeta:
+    if config.chunked:
+        payload, chunks = split_snapshot(payload)
+        _upload_missing_chunks(chunks)
+    buffer = io.BytesIO()
+    JsonStreamWriter(lambda text: buffer.write(text.encode("utf-8")), separators=(",", ":")).dump(payload)
+    serialized = buffer.getvalue()
+    version_stamp = _build_version_stamp(payload.get(config.timestamp_field))
+    pathname = f"{config.blob_prefix}/{version_stamp}.json"
+    blob = _put_blob(pathname, serialized, overwrite=False)
+    return StorageMeta(source="blob", pathname=blob.pathname, url=blob.url)
+
+
+def _put_blob(pathname: str, body: bytes, *, overwrite: bool) -> Any:
     if BlobClient is None:
         raise RuntimeError("El SDK de Vercel Blob no está disponible en este entorno.")
 
     client = BlobClient()
-    serialized = json.dumps(payload, ensure_ascii=False, indent=2).encode("utf-8")
-    version_stamp = _build_version_stamp(payload.get(config.timestamp_field))
-    pathname = f"{config.blob_prefix}/{version_stamp}.json"
-    blob = client.put(
+    return client.put(
         pathname,
-        serialized,
+        body,
         access="public",
         content_type="application/json; charset=utf-8",
         add_random_suffix=False,
-        overwrite=False,
+        overwrite=overwrite,
     )
-    return StorageMeta(source="blob", pathname=blob.pathname, url=blob.url)
 
 
-def _build_version_stamp(value: Any) -> str:
-    unique_suffix = datetime.now(UTC).strftime("%f")
-    if isinstance(value, str):
+def _read_blob_json(pathname: str) -> Dict[str, Any] | None:
+    if list_objects is None:
+        return None
+
+    page = list_objects(prefix=pathname, limit=1)
+    blob = next((item for item in page.blobs if item.pathname == pathname), None)
+    if blob is None:
+        return None
+    # Estos blobs se sobrescriben; el query evita recibir una copia vieja desde la CDN.
+    url = f"{blob.url}?{urlencode({'v': str(blob.uploaded_at)})}"
+    try:
+        return json.loads(_get_blob_bytes(url).decode("utf-8"))
+    except (URLError, TimeoutError, json.JSONDecodeError):
+        return None
+
+
+def _upload_missing_chunks(chunks: Dict[str, bytes]) -> None:
+    missing = [(digest, raw) for digest, raw in chunks.items() if digest not in _known_chunks]
+    if not missing:
+        return
+
+    def upload(item: Tuple[str, bytes]) -> str:
+        digest, raw = item
+        # Sobrescribir es seguro: mismo nombre implica mismo contenido.
+        _put_blob(_chunk_pathname(digest), raw, overwrite=True)
+        return digest
+
+    with ThreadPoolExecutor(max_workers=CHUNK_FETCH_WORKERS) as pool:
+        _known_chunks.update(pool.map(upload, missing))
+
+
+def _assemble_manifest(manifest: Dict[str, Any], meta: StorageMeta) -> Dict[str, Any]:
+    base_url = _blob_base_url(meta)
+    hashes = list(dict.fromkeys(iter_chunk_hashes(manifest)))
+    _known_chunks.update(hashes)
+    _prefetch_chunks(hashes, base_url)
+    return assemble_snapshot(manifest, lambda digest: _load_chunk(digest, base_url))
+
+
+def _prefetch_chunks(hashes: Iterable[str], base_url: str) -> None:
+    missing = [digest for digest in hashes if digest not in _chunk_cache and not _chunk_cache_path(digest).exists()]
+    if not missing:
+        return
+    with ThreadPoolExecutor(max_workers=CHUNK_FETCH_WORKERS) as pool:
+        for digest, raw in zip(missing, pool.map(lambda digest: _fetch_chunk(digest, base_url), missing)):
+            _remember_chunk(digest, raw)
+
+
+def _load_chunk(digest: str, base_url: str) -> List[Dict[str, Any]]:
+    raw = _chunk_cache.get(digest)
+    if raw is None:
+        raw = _read_cached_chunk(digest)
+        if raw is None:
+            raw = _fetch_chunk(digest, base_url)
+        _remember_chunk(digest, raw)
+    return decode_chunk(raw)
+
+
+def _read_cached_chunk(digest: str) -> bytes | None:
+    """Chunk guardado en `/tmp`; si no calza con su hash (escritura cortada, disco corrupto) se descarta."""
+    cache_path = _chunk_cache_path(digest)
+    try:
+        raw = cache_path.read_bytes()
+    except OSError:
+        return None
+    if chunk_hash(raw) == digest:
+        return raw
+    try:
+        cache_path.unlink(missing_ok=True)
+    except OSError:
+        pass
+    return None
+
+
+def _fetch_chunk(digest: str, base_url: str) -> bytes:
+    url = f"{base_url}/{_chunk_pathname(digest)}"
+    try:
+        raw = _get_blob_bytes(url)
+    except (URLError, TimeoutError) as error:
+        raise RuntimeError(f"No se pudo leer el chunk {digest}.") from error
+    if chunk_hash(raw) != digest:
+        raise RuntimeError(f"El chunk {digest} leído desde Blob no coincide con su hash.")
+    return raw
+
+
+def _get_blob_bytes(url: str) -> bytes:
+    response = http_pool.get(url, timeout=20)
+    if response.status != 200:
+        raise URLError(f"HTTP {response.status} al leer {url}")
+    return response.body
+
+
+def _remember_chunk(digest: str, raw: bytes) -> None:
+    if len(_chunk_cache) >= MAX_CACHED_CHUNKS:
+        _chunk_cache.clear()
+    _chunk_cache[digest] = raw
+    cache_path = _chunk_cache_path(digest)
+    if not cache_path.exists():
         try:
-            normalized = value.replace("Z", "+00:00")
-            parsed = datetime.fromisoformat(normalized)
-            return f"{parsed.astimezone(UTC).strftime('%Y%m%dT%H%M%SZ')}-{unique_suffix}"
-        except ValueError:
+            write_atomic(cache_path, raw)
+        except OSError:
             pass
+
+
+def _chunk_pathname(digest: str) -> str:
+    return f"{CHUNKS_BLOB_PREFIX}/{digest.removeprefix('sha256:')}.json"
+
+
+def _chunk_cache_path(digest: str) -> Path:
+    return CHUNK_CACHE_DIR / f"{digest.removeprefix('sha256:')}.json"
+
+
+def _blob_base_url(meta: StorageMeta) -> str:
+    # Todas las URLs públicas de un store comparten origen: https://<store>.public.blob.vercel-storage.com/<pathname>
+    if not meta.url or not meta.pathname or not meta.url.endswith(meta.pathname):
+        raise RuntimeError("No se pudo deducir la URL base del Blob store para leer chunks.")
+    return meta.url[: -len(meta.pathname)].rstrip("/")
+
+
+def _build_version_stamp(value: Any) -> str:
+    unique_suffix = datetime.now(UTC).strftime("%f")
+    stamp = _timestamp_stamp(value)
+    if stamp is not None:
+        return f"{stamp}-{unique_suffix}"
     return datetime.now(UTC).strftime(f"%Y%m%dT%H%M%SZ-{unique_suffix}")
 
 
+def _timestamp_stamp(value: Any) -> str | None:
+    if not isinstance(value, str):
+        return None
+    try:
+        parsed = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=UTC)
+    return parsed.astimezone(UTC).strftime("%Y%m%dT%H%M%SZ")
+
+
 def _display_path(path: Path) -> str:
     try:
         return str(path.relative_to(BASE_DIR))
@@ -0,0 +1,109 @@
+"""
+Caché HTTP de las fuentes públicas: validadores (`ETag`, `Last-Modified`) y cuerpo por URL.
+
+Se guarda en memoria, en `/tmp` (sobrevive mientras la instancia esté tibia) y en Blob
+(compartido entre instancias). Con esto cada consulta puede ser condicional y un 304 reutiliza
+el cuerpo guardado.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import tempfile
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from threading import Lock
+from typing import Any, Dict
+
+from backend.storage import read_shared_record, write_shared_record
+from scripts.atomic_file import write_atomic
+
+UPSTREAM_CACHE_DIR = Path(tempfile.gettempdir()) / "portfolio-upstream"
+UPSTREAM_BLOB_PREFIX = "portfolio/upstream-cache"
+
+_entries: Dict[str, "CachedResponse"] = {}
+_entries_lock = Lock()
+
+
+@dataclass(frozen=True)
+class CachedResponse:
+    url: str
+    body: Dict[str, Any]
+    etag: str | None = None
+    last_modified: str | None = None
+
+    def conditional_headers(self) -> Dict[str, str]:
+        headers = {}
+        if self.etag:
+            headers["If-None-Match"] = self.etag
+        if self.last_modified:
+            headers["If-Modified-Since"] = self.last_modified
+        return headers
+
+
+def get_cached_response(url: str) -> CachedResponse | None:
+    key = _cache_key(url)
+    with _entries_lock:
+        cached = _entries.get(key)
+    if cached is not None:
+        return cached
+
+    record = _read_local(key)
+    if record is None:
+        try:
+            record = read_shared_record(_blob_pathname(key))
+        except RuntimeError:
+            record = None
+    if not record or record.get("url") != url or not isinstance(record.get("body"), dict):
+        return None
+
+    cached = CachedResponse(
+        url=url,
+        body=record["body"],
+        etag=record.get("etag"),
+        last_modified=record.get("last_modified"),
+    )
+    with _entries_lock:
+        _entries[key] = cached
+    return cached
+
+
+def store_response(url: str, body: Dict[str, Any], *, etag: str | None, last_modified: str | None) -> None:
+    """Guarda la respuesta si trae algún validador; sin ellos no se puede consultar de forma condicional."""
+    if not etag and not last_modified:
+        return
+    key = _cache_key(url)
+    entry = CachedResponse(url=url, body=body, etag=etag, last_modified=last_modified)
+    with _entries_lock:
+        previous = _entries.get(key)
+        _entries[key] = entry
+    if previous is not None and (previous.etag, previous.last_modified) == (etag, last_modified):
+        return
+
+    record = asdict(entry)
+    try:
+        write_atomic(UPSTREAM_CACHE_DIR / f"{key}.json", json.dumps(record, ensure_ascii=False))
+    except OSError:
+        pass
+    try:
+        write_shared_record(_blob_pathname(key), record)
+    except RuntimeError:
+        # La caché es una optimización: si Blob falla, la próxima consulta simplemente baja todo.
+        pass
+
+
+def _read_local(key: str) -> Dict[str, Any] | None:
+    path = UPSTREAM_CACHE_DIR / f"{key}.json"
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, json.JSONDecodeError):
+        return None
+
+
+def _cache_key(url: str) -> str:
+    return hashlib.sha256(url.encode("utf-8")).hexdigest()[:40]
+
+
+def _blob_pathname(key: str) -> str:
+    return f"{UPSTREAM_BLOB_PREFIX}/{key}.json"
@@ -0,0 +1 @@
+"""Benchmarks reproducibles del pipeline de datos del portafolio."""
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Mide tiempo y memoria de las etapas principales del pipeline con universos sintéticos.
+
+Ejemplos:
+    python -m benchmarks.run --holdings 10 100 --years 5 20 --output bench.json
+    python -m benchmarks.run --compare benchmarks/baseline.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import io
+import itertools
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterable, List, Optional
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+if str(BASE_DIR) not in sys.path:
+    sys.path.insert(0, str(BASE_DIR))
+
+from backend.http import send_json  # noqa: E402
+from backend.snapshot_chunks import split_snapshot  # noqa: E402
+from backend.storage import DatasetConfig, read_dataset, write_dataset  # noqa: E402
+from benchmarks.synthetic import build_platform_config, build_price_histories  # noqa: E402
+from scripts.fetch_data import build_payload, compute_returns  # noqa: E402
+from scripts.validate_json import validate_payload  # noqa: E402
+
+DEFAULT_BASELINE = BASE_DIR / "benchmarks" / "baseline.json"
+DEFAULT_THRESHOLD = 0.20
+
+
+class _ResponseSink:
+    """Imita lo mínimo de BaseHTTPRequestHandler que usa `send_json`."""
+
+    def __init__(self) -> None:
+        self.wfile = io.BytesIO()
+        self.status_code: int | None = None
+
+    def send_response(self, code: int) -> None:
+        self.status_code = code
+
+    def send_header(self, key: str, value: str) -> None:
+        return
+
+    def end_headers(self) -> None:
+        return
+
+
+def measure(func: Callable[[], Any], *, repeat: int) -> Dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - started)
+
+    tracemalloc.start()
+    try:
+        func()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "seconds_min": round(min(timings), 6),
+        "seconds_median": round(statistics.median(timings), 6),
+        "peak_bytes": peak,
+    }
+
+
+def run_case(holdings: int, years: int, *, platforms: int, repeat: int, workdir: Path) -> Dict[str, Any]:
+    platform_config = build_platform_config(holdings, platforms)
+    histories = build_price_histories(platform_config, years=years)
+
+    def provider(holding):
+        return histories[holding.fetch_symbol]
+
+    def run_build_payload() -> Dict:
+        return build_payload(
+            provider,
+            provider_name="synthetic",
+            platform_config=platform_config,
+        )
+
+    payload = run_build_payload()
+    storage_config = DatasetConfig(
+        key=f"bench-{holdings}-{years}",
+        local_path=workdir / f"latest-{holdings}-{years}.json",
+        blob_prefix="benchmarks/latest",
+        timestamp_field="generated_at",
+    )
+    write_dataset(storage_config, payload)
+
+    # La configuración del benchmark no declara campos volátiles: cambiar `generated_at` cambia el
+    # `content_hash`, así que cada escritura medida recorre el camino completo y no el de "sin cambios".
+    write_counter = itertools.count()
+
+    def run_storage_write() -> None:
+        write_dataset(storage_config, {**payload, "generated_at": f"{payload['generated_at']}#{next(write_counter)}"})
+
+    def run_compute_returns() -> None:
+        for history in histories.values():
+            compute_returns(history)
+
+    def run_serving_path() -> int:
+        served_payload, _ = read_dataset(storage_config)
+        sink = _ResponseSink()
+        send_json(sink, 200, served_payload)
+        return sink.wfile.tell()
+
+    benchmarks = {
+        "build_payload": measure(run_build_payload, repeat=repeat),
+        "compute_returns": measure(run_compute_returns, repeat=repeat),
+        "validate_payload": measure(lambda: validate_payload(payload), repeat=repeat),
+        "storage_write": measure(run_storage_write, repeat=repeat),
+        "api_data_latest": measure(run_serving_path, repeat=repeat),
+    }
+
+    # En Blob el snapshot se guarda como manifiesto más chunks; se informan por separado.
+    manifest, chunks = split_snapshot(payload)
+    return {
+        "case": f"h{holdings}-y{years}",
+        "holdings": holdings,
+        "years": years,
+        "price_points": sum(len(history) for history in histories.values()),
+        "stored_bytes": storage_config.local_path.stat().st_size,
+        "manifest_bytes": len(json.dumps(manifest, ensure_ascii=False, separators=(",", ":")).encode("utf-8")),
+        "chunk_bytes": sum(len(raw) for raw in chunks.values()),
+        "chunk_count": len(chunks),
+        "response_bytes": run_serving_path(),
+        "benchmarks": benchmarks,
+    }
+
+
+def run_suite(
+    holdings_values: Iterable[int],
+    years_values: Iterable[int],
+    *,
+    platforms: int,
+    repeat: int,
+) -> Dict[str, Any]:
+    previous_storage_mode = os.environ.get("PORTFOLIO_STORAGE")
+    os.environ["PORTFOLIO_STORAGE"] = "local"
+    results = []
+    try:
+        with tempfile.TemporaryDirectory(prefix="portfolio-bench-") as tmp:
+            for holdings in holdings_values:
+                for years in years_values:
+                    print(f"· {holdings} holdings × {years} años...", file=sys.stderr)
+                    results.append(run_case(holdings, years, platforms=platforms, repeat=repeat, workdir=Path(tmp)))
+    finally:
+        if previous_storage_mode is None:
+            os.environ.pop("PORTFOLIO_STORAGE", None)
+        else:
+            os.environ["PORTFOLIO_STORAGE"] = previous_storage_mode
+
+    return {
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare_reports(current: Dict[str, Any], baseline: Dict[str, Any], *, threshold: float) -> List[str]:
+    baseline_cases = {result["case"]: result for result in baseline.get("results", [])}
+    regressions: List[str] = []
+
+    for result in current.get("results", []):
+        reference = baseline_cases.get(result["case"])
+        if reference is None:
+            continue
+        for name, stats in result["benchmarks"].items():
+            reference_stats = reference.get("benchmarks", {}).get(name)
+            if not reference_stats:
+                continue
+            for metric in ("seconds_median", "peak_bytes"):
+                before = reference_stats.get(metric)
+                after = stats.get(metric)
+                if not before or after is None:
+                    continue
+                ratio = after / before
+                if ratio > 1 + threshold:
+                    regressions.append(
+                        f"{result['case']} · {name}.{metric}: {before} → {after} (+{(ratio - 1) * 100:.1f}%)"
+                    )
+    return regressions
+
+
+def parse_args(argv: Optional[Iterable[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks del pipeline de datos del portafolio")
+    parser.add_argument("--holdings", type=int, nargs="+", default=[10, 100], help="Tamaños de universo a medir.")
+    parser.add_argument("--years", type=int, nargs="+", default=[5, 20], help="Años de historia por ticker.")
+    parser.add_argument("--platforms", type=int, default=2, help="Cantidad de plataformas sintéticas.")
+    parser.add_argument("--repeat", type=int, default=3, help="Repeticiones por medición de tiempo.")
+    parser.add_argument("--output", type=Path, help="Ruta donde guardar el reporte JSON.")
+    parser.add_argument(
+        "--save-baseline",
+        action="store_true",
+        help=f"Guarda el reporte como línea base en {DEFAULT_BASELINE.relative_to(BASE_DIR)}.",
+    )
+    parser.add_argument(
+        "--compare",
+        type=Path,
+        nargs="?",
+        const=DEFAULT_BASELINE,
+        help="Compara contra una línea base y termina con código 1 si hay regresiones (si no existe, sólo avisa).",
+    )
+    parser.add_argument(
+        "--threshold",
+        type=float,
+        default=DEFAULT_THRESHOLD,
+        help="Tolerancia relativa antes de marcar una regresión (0.2 = 20%%).",
+    )
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Iterable[str]] = None) -> None:
+    args = parse_args(argv)
+    report = run_suite(args.holdings, args.years, platforms=args.platforms, repeat=max(1, args.repeat))
+    serialized = json.dumps(report, indent=2, ensure_ascii=False)
+
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(f"{serialized}\n", encoding="utf-8")
+    if args.save_baseline:
+        DEFAULT_BASELINE.write_text(f"{serialized}\n", encoding="utf-8")
+    if not args.output and not args.save_baseline:
+        print(serialized)
+
+    if args.compare:
+        if not args.compare.exists():
+            # Los tiempos dependen de la máquina, así que la línea base no se versiona: sin ella no hay con qué comparar.
+            print(
+                f"No existe la línea base {args.compare}; se omite la comparación. Créala con --save-baseline.",
+                file=sys.stderr,
+            )
+            return
+        baseline = json.loads(args.compare.read_text(encoding="utf-8"))
+        regressions = compare_reports(report, baseline, threshold=args.threshold)
+        if regressions:
+            details = "\n".join(regressions)
+            raise SystemExit(f"Regresiones detectadas:\n{details}")
+        print(f"Sin regresiones respecto de {args.compare} ✅", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,34 @@
+"""Universos sintéticos y deterministas para medir el pipeline a escala."""
+
+from __future__ import annotations
+
+from datetime import date
+from typing import Dict
+
+from scripts.portfolio_config import unique_holdings
+from scripts.price_series import PriceSeries
+from scripts.synthetic_market import MarketSpec, build_market_config, generate_market
+
+# Fecha fija para que los reportes sean comparables entre ejecuciones.
+BENCHMARK_END_DATE = date(2026, 1, 2)
+
+
+def build_platform_config(holdings: int, platforms: int = 2) -> Dict[str, Dict]:
+    return build_market_config(MarketSpec(tickers=holdings), platforms)
+
+
+def build_price_histories(
+    platform_config: Dict[str, Dict],
+    *,
+    years: int,
+    seed: int = 7,
+    end_date: date | None = None,
+) -> Dict[str, PriceSeries]:
+    """Genera un histórico diario de días hábiles por ticker, estable entre ejecuciones."""
+    spec = MarketSpec(
+        tickers=len(unique_holdings(platform_config)),
+        years=years,
+        seed=seed,
+        end_date=end_date or BENCHMARK_END_DATE,
+    )
+    return generate_market(spec)
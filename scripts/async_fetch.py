@@ -0,0 +1,132 @@
+"""
+Capa asyncio para consultas a fuentes externas: límite de concurrencia compartido, espaciado
+mínimo por host, timeout y reintentos con backoff exponencial con jitter.
+
+Los clientes existentes (urllib, yfinance) son bloqueantes, así que cada llamada corre en un
+thread del executor; asyncio sólo coordina cuándo se lanza cada una. Un thread no se puede
+interrumpir: una llamada que vence sigue hasta que su cliente corte por su propio timeout, pero
+su resultado se descarta y las llamadas que aún no empezaban se cancelan al cerrar.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from functools import partial
+from typing import Any, Callable, Dict, List, Sequence, Tuple, Type
+
+
+class RetryableError(RuntimeError):
+    """Falla transitoria (red, timeout, 429 o 5xx): vale la pena reintentar."""
+
+
+@dataclass(frozen=True)
+class FetchPolicy:
+    concurrency: int = 8
+    # Segundos mínimos entre el inicio de dos llamadas al mismo host.
+    per_host_interval: float = 0.2
+    timeout: float = 30.0
+    retries: int = 2
+    backoff_base: float = 0.5
+    backoff_max: float = 8.0
+    # Tope para todo el lote (intentos, esperas y reintentos incluidos); debe caber en el `maxDuration`
+    # de la función que lo usa.
+    deadline: float = 45.0
+    retry_on: Tuple[Type[BaseException], ...] = (RetryableError, TimeoutError)
+
+
+# (host, función bloqueante, argumentos)
+Call = Tuple[str, Callable[..., Any], Tuple[Any, ...]]
+
+
+class AsyncFetcher:
+    def __init__(self, policy: FetchPolicy = FetchPolicy()) -> None:
+        self.policy = policy
+        self._executor = ThreadPoolExecutor(max_workers=max(1, policy.concurrency))
+        self._semaphore = asyncio.Semaphore(max(1, policy.concurrency))
+        self._host_locks: Dict[str, asyncio.Lock] = {}
+        self._next_slot: Dict[str, float] = {}
+        self._deadline = time.monotonic() + policy.deadline
+
+    async def call(self, host: str, func: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta `func(*args)` respetando los límites; relanza el último error si se agotan los reintentos.
+
+        Un timeout (por llamada, del cliente o del lote completo) se levanta como `RetryableError`, así
+        que quien capture `RuntimeError` también cubre las fuentes que no responden.
+        """
+        policy = self.policy
+        attempt = 0
+        while True:
+            try:
+                async with self._semaphore:
+                    await self._wait_for_host(host)
+                    timeout = min(policy.timeout, self._remaining())
+                    if timeout <= 0:
+                        raise TimeoutError
+                    loop = asyncio.get_running_loop()
+                    return await asyncio.wait_for(
+                        loop.run_in_executor(self._executor, partial(func, *args)),
+                        timeout=timeout,
+                    )
+            # Cubre tanto el vencimiento de `wait_for` como el timeout propio del cliente.
+            except TimeoutError as error:
+                if attempt >= policy.retries or self._remaining() <= 0:
+                    raise RetryableError(f"{host} no respondió dentro del tiempo disponible.") from error
+            except policy.retry_on:
+                if attempt >= policy.retries or self._remaining() <= 0:
+                    raise
+            delay = random.uniform(0, min(policy.backoff_max, policy.backoff_base * 2**attempt))
+            if delay >= self._remaining():
+                raise RetryableError(f"No queda tiempo para reintentar la consulta a {host}.")
+            await asyncio.sleep(delay)
+            attempt += 1
+
+    def _remaining(self) -> float:
+        return self._deadline - time.monotonic()
+
+    async def _wait_for_host(self, host: str) -> None:
+        if self.policy.per_host_interval <= 0:
+            return
+        lock = self._host_locks.setdefault(host, asyncio.Lock())
+        async with lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.policy.per_host_interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+
+
+def run_calls(calls: Sequence[Call], policy: FetchPolicy = FetchPolicy()) -> List[Any]:
+    """
+    Corre todas las llamadas en un event loop propio y devuelve sus resultados en orden.
+
+    Un error no cancela las demás: queda como la excepción en su posición de la lista.
+    """
+    if not calls:
+        return []
+
+    async def gather() -> List[Any]:
+        fetcher = AsyncFetcher(policy)
+        try:
+            return await asyncio.gather(
+                *(fetcher.call(host, func, *args) for host, func, args in calls),
+                return_exceptions=True,
+            )
+        finally:
+            fetcher.close()
+
+    return asyncio.run(gather())
+
+
+def raise_first_error(results: Sequence[Any]) -> List[Any]:
+    for result in results:
+        if isinstance(result, BaseException):
+            raise result
+    return list(results)
@@ -0,0 +1,35 @@
+"""Escritura atómica de archivos: quien lea ve el contenido anterior o el nuevo completo, nunca uno a medias."""
+
+from __future__ import annotations
+
+import os
+import tempfile
+from contextlib import contextmanager, suppress
+from pathlib import Path
+from typing import IO, Iterator, Union
+
+
+@contextmanager
+def atomic_write(path: Path, mode: str = "w", *, encoding: str = "utf-8") -> Iterator[IO]:
+    """
+    Entrega un archivo temporal en el mismo directorio y lo renombra sobre `path` al salir sin error.
+
+    Si el bloque falla, el temporal se borra y `path` queda intacto.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    fd, temp_name = tempfile.mkstemp(prefix=f".{path.name}.", suffix=".tmp", dir=path.parent)
+    try:
+        with os.fdopen(fd, mode, encoding=None if "b" in mode else encoding) as fh:
+            yield fh
+        # mkstemp crea el archivo sólo legible por el dueño; se deja con los permisos habituales.
+        os.chmod(temp_name, 0o644)
+        os.replace(temp_name, path)
+    except BaseException:
+        with suppress(OSError):
+            os.unlink(temp_name)
+        raise
+
+
+def write_atomic(path: Path, data: Union[str, bytes], *, encoding: str = "utf-8") -> None:
+    with atomic_write(path, "wb" if isinstance(data, bytes) else "w", encoding=encoding) as fh:
+        fh.write(data)
@@ -0,0 +1,272 @@
+#!/usr/bin/env python3
+"""
+Backtest de asignaciones sobre los históricos guardados en latest.json.
+
+Simula muchos vectores de pesos a la vez: rebalanceo periódico, aportes programados y
+costos de transacción. Entre eventos (rebalanceo o aporte) las unidades quedan fijas, así que
+cada tramo se resuelve con un producto matricial y el único bucle en Python es por evento.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.platform_nav import REBALANCE_POLICIES, rebalance_starts
+from scripts.price_matrix import PriceMatrix, build_price_matrix
+from scripts.risk_metrics import compute_risk_metrics
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_INPUT = BASE_DIR / "data" / "latest.json"
+# Por debajo de esta cantidad de escenarios no conviene levantar procesos.
+MIN_SCENARIOS_PER_WORKER = 256
+
+
+@dataclass(frozen=True)
+class BacktestConfig:
+    rebalance: str = "monthly"
+    initial_value: float = 100.0
+    contribution: float = 0.0
+    contribution_frequency: str = "monthly"
+    # Fracción del monto transado que se pierde en cada compra o venta.
+    transaction_cost: float = 0.0
+
+
+@dataclass
+class BacktestResult:
+    tickers: List[str]
+    weights: np.ndarray
+    dates: np.ndarray
+    values: np.ndarray
+    invested: np.ndarray
+    twr_index: np.ndarray
+    costs: np.ndarray
+    turnover: np.ndarray
+    metrics: List[Dict[str, Optional[float]]] = field(default_factory=list)
+
+    def summary(self, scenario: int) -> Dict[str, object]:
+        final_value = float(self.values[-1, scenario])
+        invested = float(self.invested[-1])
+        return {
+            "weights": {ticker: round(float(weight), 4) for ticker, weight in zip(self.tickers, self.weights[scenario])},
+            "final_value": round(final_value, 2),
+            "invested": round(invested, 2),
+            "total_return": round(final_value / invested - 1.0, 4) if invested else None,
+            "costs": round(float(self.costs[scenario]), 2),
+            "turnover": round(float(self.turnover[scenario]), 4),
+            **self.metrics[scenario],
+        }
+
+
+def run_backtest(
+    matrix: PriceMatrix,
+    tickers: Sequence[str],
+    weights: np.ndarray,
+    config: BacktestConfig = BacktestConfig(),
+) -> BacktestResult:
+    """
+    `weights` es una matriz (escenarios × tickers); cada fila se normaliza a 1.
+
+    El backtest parte en la primera fecha con precio para todos los tickers. Los valores de cada
+    evento se registran después de aplicar el aporte y el rebalanceo de ese día.
+    """
+    for label, policy in (("rebalance", config.rebalance), ("contribution_frequency", config.contribution_frequency)):
+        if policy not in REBALANCE_POLICIES:
+            raise ValueError(f"Valor inválido para {label}: {policy}. Usa {', '.join(REBALANCE_POLICIES)}.")
+
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    if weights.shape[1] != len(tickers):
+        raise ValueError("Cada escenario debe traer un peso por ticker.")
+    weights = weights / weights.sum(axis=1, keepdims=True)
+
+    prices = matrix.prices[:, [matrix.column(ticker) for ticker in tickers]]
+    ready = ~np.isnan(prices).any(axis=1)
+    if not ready.any():
+        raise ValueError("No hay fechas con precio para todos los tickers pedidos.")
+    start = int(np.argmax(ready))
+    prices = prices[start:]
+    dates = matrix.dates[start:]
+    size = dates.size
+    scenarios = weights.shape[0]
+
+    rebalance_rows = set(rebalance_starts(dates, config.rebalance)[1:].tolist()) if config.rebalance != "none" else set()
+    contribution_rows = (
+        set(rebalance_starts(dates, config.contribution_frequency)[1:].tolist())
+        if config.contribution and config.contribution_frequency != "none"
+        else set()
+    )
+    events = sorted(rebalance_rows | contribution_rows)
+    boundaries = [0, *events, size]
+
+    cost_rate = config.transaction_cost
+    units = (config.initial_value * (1.0 - cost_rate)) * weights / prices[0]
+    costs = np.full(scenarios, config.initial_value * cost_rate)
+    turnover = np.zeros(scenarios)
+    values = np.empty((size, scenarios))
+    twr_index = np.empty((size, scenarios))
+    invested = np.full(size, config.initial_value)
+    twr_level = np.ones(scenarios)
+
+    for segment_start, segment_end in zip(boundaries[:-1], boundaries[1:]):
+        if segment_start > 0:
+            row = segment_start
+            holdings = units * prices[row]
+            before = holdings.sum(axis=1)
+            # El índice TWR encadena el crecimiento de cada tramo sin contar los aportes.
+            twr_level = twr_level * before / segment_base
+            contribution = config.contribution if row in contribution_rows else 0.0
+            invested[row:] += contribution
+            if row in rebalance_rows:
+                target = (before + contribution)[:, None] * weights
+                traded = np.abs(target - holdings).sum(axis=1)
+                cost = cost_rate * traded
+                units = (before + contribution - cost)[:, None] * weights / prices[row]
+                turnover += traded / np.maximum(before, 1e-12)
+            else:
+                cost = np.full(scenarios, cost_rate * contribution)
+                units = units + (contribution - cost)[:, None] * weights / prices[row]
+            costs += cost
+        segment_values = prices[segment_start:segment_end] @ units.T
+        values[segment_start:segment_end] = segment_values
+        segment_base = segment_values[0]
+        twr_index[segment_start:segment_end] = twr_level * segment_values / segment_base
+
+    result = BacktestResult(
+        tickers=list(tickers),
+        weights=weights,
+        dates=dates,
+        values=values,
+        invested=invested,
+        twr_index=twr_index,
+        costs=costs,
+        turnover=turnover,
+    )
+    index_matrix = PriceMatrix(
+        keys=[str(scenario) for scenario in range(scenarios)],
+        dates=dates,
+        prices=twr_index,
+        observed=np.ones_like(twr_index, dtype=bool),
+    )
+    risk = compute_risk_metrics(index_matrix)
+    result.metrics = [risk[str(scenario)] for scenario in range(scenarios)]
+    return result
+
+
+def run_backtest_grid(
+    matrix: PriceMatrix,
+    tickers: Sequence[str],
+    weights: np.ndarray,
+    config: BacktestConfig = BacktestConfig(),
+    workers: Optional[int] = None,
+) -> List[Dict[str, object]]:
+    """Resumen por escenario; con `workers` > 1 reparte bloques de escenarios entre procesos."""
+    weights = np.atleast_2d(np.asarray(weights, dtype=float))
+    workers = min(workers or 1, max(1, weights.shape[0] // MIN_SCENARIOS_PER_WORKER))
+    if workers <= 1:
+        return _summaries(matrix, tickers, weights, config)
+
+    blocks = np.array_split(weights, workers)
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [executor.submit(_summaries, matrix, tickers, block, config) for block in blocks]
+        return [summary for future in futures for summary in future.result()]
+
+
+def dirichlet_scenarios(base: Sequence[float], count: int, concentration: float = 50.0, seed: int = 7) -> np.ndarray:
+    """Escenarios alrededor de `base` (la primera fila es `base` tal cual)."""
+    base_array = np.asarray(base, dtype=float)
+    base_array = base_array / base_array.sum()
+    rng = np.random.default_rng(seed)
+    samples = rng.dirichlet(base_array * concentration, size=max(count - 1, 0))
+    return np.vstack((base_array, samples))
+
+
+def platform_histories(payload: Dict, platform_id: str) -> Tuple[Dict[str, List[Dict[str, float]]], Dict[str, float]]:
+    for platform in payload.get("platforms", []):
+        if platform.get("id") != platform_id:
+            continue
+        histories: Dict[str, List[Dict[str, float]]] = {}
+        weights: Dict[str, float] = {}
+        for holding in platform.get("holdings", []):
+            history = (holding.get("series") or {}).get("price_history") or []
+            if history:
+                histories[holding["ticker"]] = history
+                weights[holding["ticker"]] = holding["weight"]
+        return histories, weights
+    raise ValueError(f"No existe la plataforma {platform_id}.")
+
+
+def _summaries(matrix: PriceMatrix, tickers: Sequence[str], weights: np.ndarray, config: BacktestConfig) -> List[Dict[str, object]]:
+    result = run_backtest(matrix, tickers, weights, config)
+    return [result.summary(scenario) for scenario in range(weights.shape[0])]
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Backtest de asignaciones por plataforma")
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT, help="Snapshot a usar (por defecto data/latest.json).")
+    parser.add_argument("--platform", required=True, help="Plataforma cuyos holdings y pesos se simulan.")
+    parser.add_argument("--rebalance", choices=REBALANCE_POLICIES, default="monthly")
+    parser.add_argument("--contribution", type=float, default=0.0, help="Monto de cada aporte.")
+    parser.add_argument("--contribution-frequency", choices=REBALANCE_POLICIES, default="monthly")
+    parser.add_argument("--initial", type=float, default=100.0, help="Valor inicial del portafolio.")
+    parser.add_argument("--cost", type=float, default=0.0, help="Costo de transacción como fracción (0.001 = 10 pb).")
+    parser.add_argument(
+        "--scenarios",
+        type=int,
+        default=1,
+        help="Cantidad de escenarios de pesos (el primero es la asignación actual; el resto, Dirichlet).",
+    )
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--workers", type=int, default=1, help=f"Procesos a usar (0 = {os.cpu_count()}).")
+    parser.add_argument("--top", type=int, default=5, help="Escenarios a mostrar, ordenados por CAGR.")
+    parser.add_argument("--output", type=Path, help="Guarda todos los resúmenes en este JSON.")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    with args.input.open("r", encoding="utf-8") as fh:
+        payload = json.load(fh)
+
+    histories, base_weights = platform_histories(payload, args.platform)
+    tickers = list(histories)
+    config = BacktestConfig(
+        rebalance=args.rebalance,
+        initial_value=args.initial,
+        contribution=args.contribution,
+        contribution_frequency=args.contribution_frequency,
+        transaction_cost=args.cost,
+    )
+    scenarios = dirichlet_scenarios([base_weights[ticker] for ticker in tickers], args.scenarios, seed=args.seed)
+    summaries = run_backtest_grid(
+        build_price_matrix(histories),
+        tickers,
+        scenarios,
+        config,
+        workers=args.workers or os.cpu_count(),
+    )
+
+    ranked = sorted(
+        summaries,
+        key=lambda summary: float("-inf") if summary.get("cagr") is None else summary["cagr"],
+        reverse=True,
+    )
+    report = {"platform": args.platform, "config": config.__dict__, "current": summaries[0], "top": ranked[: args.top]}
+    print(json.dumps(report, indent=2, ensure_ascii=False))
+    if args.output:
+        with args.output.open("w", encoding="utf-8") as fh:
+            json.dump({**report, "scenarios": summaries}, fh, indent=2, ensure_ascii=False)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,95 @@
+"""Matriz de correlación y covarianza entre holdings, calculada una vez por snapshot."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Tuple
+
+import numpy as np
+
+from scripts.price_matrix import PriceMatrix, build_price_matrix
+
+MIN_OBSERVATIONS = 20
+
+
+def aligned_log_returns(matrix: PriceMatrix) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Retornos logarítmicos sobre el calendario intersección (días en que cotizan todos los holdings).
+
+    Un feriado en Santiago o en EE.UU. no genera un retorno cero artificial: el movimiento de ese día
+    queda dentro del retorno entre dos fechas comunes consecutivas.
+    """
+    common = matrix.observed.all(axis=1)
+    prices = matrix.prices[common]
+    dates = matrix.dates[common]
+    if dates.size <= MIN_OBSERVATIONS:
+        raise ValueError("No hay suficientes fechas comunes entre holdings para estimar correlaciones.")
+    return np.diff(np.log(prices), axis=0), dates
+
+
+def build_correlation_payload(payload: Dict) -> Dict:
+    """Artefacto compacto (matrices como filas) asociado al snapshot `payload` por su `content_hash`."""
+    histories: Dict[str, List[Dict[str, float]]] = {}
+    platform_weights: Dict[str, Dict[str, float]] = {}
+    for platform in payload.get("platforms", []):
+        weights = platform_weights.setdefault(platform["id"], {})
+        for holding in platform.get("holdings", []):
+            history = (holding.get("series") or {}).get("price_history") or []
+            if history:
+                histories.setdefault(holding["ticker"], history)
+                weights[holding["ticker"]] = weights.get(holding["ticker"], 0.0) + holding["weight"]
+
+    matrix = build_price_matrix(histories)
+    returns, dates = aligned_log_returns(matrix)
+    years = (dates[-1] - dates[0]).astype(np.int64) / 365.25
+    periods_per_year = returns.shape[0] / years if years > 0 else 252.0
+
+    covariance = np.cov(returns, rowvar=False).reshape(len(matrix.keys), len(matrix.keys)) * periods_per_year
+    volatility = np.sqrt(np.diag(covariance))
+    with np.errstate(divide="ignore", invalid="ignore"):
+        correlation = covariance / np.outer(volatility, volatility)
+    correlation = np.nan_to_num(correlation)
+    np.fill_diagonal(correlation, 1.0)
+
+    platforms = {}
+    portfolio_returns = []
+    for platform_id, weights in platform_weights.items():
+        if not weights:
+            continue
+        columns = [matrix.column(ticker) for ticker in weights]
+        allocation = np.array(list(weights.values()))
+        allocation = allocation / allocation.sum()
+        sub_covariance = covariance[np.ix_(columns, columns)]
+        portfolio_volatility = float(np.sqrt(allocation @ sub_covariance @ allocation))
+        pairs = correlation[np.ix_(columns, columns)][np.triu_indices(len(columns), k=1)]
+        platforms[platform_id] = {
+            "tickers": list(weights),
+            "volatility": round(portfolio_volatility, 4),
+            # Volatilidad ponderada de los componentes sobre la del portafolio: > 1 indica diversificación.
+            "diversification_ratio": round(float(allocation @ volatility[columns]) / portfolio_volatility, 4)
+            if portfolio_volatility
+            else None,
+            "average_correlation": round(float(pairs.mean()), 4) if pairs.size else None,
+        }
+        portfolio_returns.append(returns[:, columns] @ allocation)
+
+    platform_correlation = (
+        np.atleast_2d(np.corrcoef(np.vstack(portfolio_returns))).round(4).tolist() if len(portfolio_returns) > 1 else None
+    )
+
+    return {
+        "generated_at": payload.get("generated_at"),
+        "source_content_hash": payload.get("content_hash"),
+        "calendar": {
+            "start": str(dates[0]),
+            "end": str(dates[-1]),
+            "observations": int(returns.shape[0]),
+            "periods_per_year": round(float(periods_per_year), 2),
+        },
+        "tickers": list(matrix.keys),
+        "volatility": volatility.round(4).tolist(),
+        "correlation": correlation.round(4).tolist(),
+        "covariance": covariance.round(8).tolist(),
+        "platforms": platforms,
+        "platform_ids": list(platforms),
+        "platform_correlation": platform_correlation,
+    }
@@ -8,139 +8,48 @@ históricos reales de los ETFs configurados.
 from __future__ import annotations
 
 import argparse
+import hashlib
 import json
-import math
-from dataclasses import dataclass
-from datetime import date, datetime, timedelta
+import sys
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import Callable, Dict, List, Optional, Sequence, Tuple
+from typing import Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+import numpy as np
 
 try:
     import yfinance as yf  # type: ignore
 except ImportError:  # pragma: no cover
     yf = None  # type: ignore
 
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.async_fetch import FetchPolicy, RetryableError, run_calls
+from scripts.atomic_file import atomic_write
+from scripts.fx import FX_PAIR, build_currency_series, generate_sample_fx_history, parse_fx_history
+from scripts.json_stream import JsonStreamWriter
+from scripts.platform_nav import DEFAULT_REBALANCE, compute_platform_nav
+from scripts.portfolio_config import HoldingConfig, load_platform_config, unique_holdings
+from scripts.price_matrix import PriceMatrix, build_price_matrix
+from scripts.price_series import PriceSeries, as_price_series
+from scripts.risk_metrics import compute_risk_metrics
+from scripts.series_pyramid import build_series_pyramid
+from scripts.synthetic_market import CALENDARS, MarketSpec, build_market_config, generate_market
+
 
 BASE_DIR = Path(__file__).resolve().parents[1]
+_EMPTY_DAYS = np.array([], dtype="datetime64[D]")
 DEFAULT_OUTPUT = BASE_DIR / "data" / "latest.json"
 
-
-@dataclass(frozen=True)
-class HoldingConfig:
-    ticker: str
-    weight: float
-    fetch_symbol: str
-    display_name: str
-    currency: str
-
-
-PLATFORM_CONFIG: Dict[str, Dict] = {
-    "racional": {
-        "name": "Racional",
-        "color": "#0B57D0",
-        "holdings": [
-            HoldingConfig(
-                ticker="CFIETFGE.SN",
-                weight=0.20,
-                fetch_symbol="CFIETFGE.SN",
-                display_name="Singular Global Equities",
-                currency="CLP",
-            ),
-            HoldingConfig(
-                ticker="IYWCL.SN",
-                weight=0.35,
-                fetch_symbol="IYWCL.SN",
-                display_name="iShares U.S. Technology",
-                currency="CLP",
-            ),
-            HoldingConfig(
-                ticker="EEMCL.SN",
-                weight=0.20,
-                fetch_symbol="EEMCL.SN",
-                display_name="iShares MSCI Emerging Markets",
-                currency="CLP",
-            ),
-            HoldingConfig(
-                ticker="CFMITNIPSA.SN",
-                weight=0.20,
-                fetch_symbol="CFMITNIPSA.SN",
-                display_name="IT NOW S&P IPSA",
-                currency="CLP",
-            ),
-            HoldingConfig(
-                ticker="CFIETFCC.SN",
-                weight=0.05,
-                fetch_symbol="CFIETFCC.SN",
-                display_name="Singular Chile Corporativo",
-                currency="CLP",
-            ),
-        ],
-    },
-    "fintual": {
-        "name": "Fintual",
-        "color": "#FF6F61",
-        "holdings": [
-            HoldingConfig(
-                ticker="ESGV",
-                weight=0.294345,
-                fetch_symbol="ESGV",
-                display_name="Vanguard ESG U.S. Stock ETF",
-                currency="USD",
-            ),
-            HoldingConfig(
-                ticker="FTEC",
-                weight=0.181753,
-                fetch_symbol="FTEC",
-                display_name="Fidelity MSCI Information Tech ETF",
-                currency="USD",
-            ),
-            HoldingConfig(
-                ticker="QQQM",
-                weight=0.174532,
-                fetch_symbol="QQQM",
-                display_name="Invesco NASDAQ 100 ETF",
-                currency="USD",
-            ),
-            HoldingConfig(
-                ticker="SOXX",
-                weight=0.108727,
-                fetch_symbol="SOXX",
-                display_name="iShares Semiconductor ETF",
-                currency="USD",
-            ),
-            HoldingConfig(
-                ticker="VGK",
-                weight=0.102116,
-                fetch_symbol="VGK",
-                display_name="Vanguard FTSE Europe ETF",
-                currency="USD",
-            ),
-            HoldingConfig(
-                ticker="IAUM",
-                weight=0.074451,
-                fetch_symbol="IAUM",
-                display_name="iShares Gold Trust Micro",
-                currency="USD",
-            ),
-            HoldingConfig(
-                ticker="KOMP",
-                weight=0.045057,
-                fetch_symbol="KOMP",
-                display_name="SPDR Kensho New Economies ETF",
-                currency="USD",
-            ),
-            HoldingConfig(
-                ticker="EPP",
-                weight=0.019019,
-                fetch_symbol="EPP",
-                display_name="iShares MSCI Pacific ex-Japan ETF",
-                currency="USD",
-            ),
-        ],
-    },
+# Yahoo limita por IP: pocas descargas simultáneas y espaciadas. El modo offline no tiene red.
+PRICE_FETCH_POLICIES: Dict[str, FetchPolicy] = {
+    "yfinance": FetchPolicy(concurrency=4, per_host_interval=0.25, timeout=30.0, deadline=35.0),
+    "offline_sample": FetchPolicy(per_host_interval=0.0, retries=0),
+    "synthetic": FetchPolicy(per_host_interval=0.0, retries=0),
 }
 
-
 SAMPLE_BEHAVIOR: Dict[str, Dict[str, float]] = {
     "CFIETFGE.SN": {"base_price": 19_000, "annual_return": 0.06, "volatility": 0.03},
     "IYWCL.SN": {"base_price": 42_000, "annual_return": 0.12, "volatility": 0.05},
@@ -158,6 +67,10 @@ SAMPLE_BEHAVIOR: Dict[str, Dict[str, float]] = {
 }
 
 
+class SelectionError(ValueError):
+    """Selección de tickers o plataformas que no existen en la configuración."""
+
+
 def iso_now() -> str:
     return datetime.utcnow().replace(microsecond=0).isoformat() + "Z"
 
@@ -172,47 +85,12 @@ def hex_to_rgba(hex_color: str, alpha: float) -> str:
     return f"rgba({r}, {g}, {b}, {alpha})"
 
 
-def compute_normalized_series(price_history: Sequence[Dict[str, float]]) -> List[Dict[str, float]]:
-    if not price_history:
-        return []
-    base_price = price_history[0]["close"] or 1.0
-    normalized = []
-    for point in price_history:
-        value = 100 * (point["close"] / base_price) if base_price else 0.0
-        normalized.append(
-            {
-                "date": point["date"],
-                "value": round(value, 2),
-            }
-        )
-    return normalized
-
-
-def parse_price_history(price_history: Sequence[Dict[str, float]]) -> List[Tuple[date, float]]:
-    parsed: List[Tuple[date, float]] = []
-    for point in price_history:
-        if "date" not in point or "close" not in point:
-            continue
-        try:
-            parsed_date = datetime.fromisoformat(str(point["date"])).date()
-        except ValueError:
-            parsed_date = datetime.fromisoformat(str(point["date"])[:10]).date()
-        try:
-            price_value = float(point["close"])
-        except (TypeError, ValueError):
-            continue
-        parsed.append((parsed_date, price_value))
-    parsed.sort(key=lambda item: item[0])
-    return parsed
-
-
-def level_on_or_before(history: Sequence[Tuple[date, float]], target: date, fallback_to_first: bool = False) -> Optional[float]:
-    for history_date, price in reversed(history):
-        if history_date <= target:
-            return price
-    if fallback_to_first and history:
-        return history[0][1]
-    return None
+def compute_normalized_series(price_history: PriceSeries) -> np.ndarray:
+    """Cierres en base 100 respecto del primero, redondeados a 2 decimales."""
+    if not len(price_history):
+        return np.array([], dtype=float)
+    base_price = price_history.closes[0] or 1.0
+    return (100 * (price_history.closes / base_price)).round(2)
 
 
 def compute_percentage_change(latest: float, base: Optional[float]) -> Optional[float]:
@@ -221,9 +99,14 @@ def compute_percentage_change(latest: float, base: Optional[float]) -> Optional[
     return (latest / base) - 1.0
 
 
-def compute_returns(price_history: List[Dict[str, float]]) -> Dict[str, Optional[float]]:
-    parsed_history = parse_price_history(price_history)
-    if len(parsed_history) < 2:
+# Ventanas de `compute_returns`, en días corridos hacia atrás desde el último cierre.
+RETURN_WINDOWS = {"monthly_change_pct": 30, "return_1y": 365, "return_5y": 365 * 5}
+RETURN_FIELDS = ("return_1y", "return_5y", "monthly_change_pct", "daily_change_pct")
+
+
+def compute_returns(price_history: Union[PriceSeries, Sequence[Dict[str, float]]]) -> Dict[str, Optional[float]]:
+    series = as_price_series(price_history)
+    if len(series) < 2:
         return {
             "return_1y": None,
             "return_5y": None,
@@ -231,21 +114,11 @@ def compute_returns(price_history: List[Dict[str, float]]) -> Dict[str, Optional
             "daily_change_pct": None,
         }
 
-    latest_date, latest_price = parsed_history[-1]
-    _, previous_price = parsed_history[-2]
-
-    one_month_threshold = latest_date - timedelta(days=30)
-    one_year_threshold = latest_date - timedelta(days=365)
-    five_year_threshold = latest_date - timedelta(days=365 * 5)
-
-    base_1m = level_on_or_before(parsed_history, one_month_threshold, fallback_to_first=True)
-    base_1y = level_on_or_before(parsed_history, one_year_threshold, fallback_to_first=True)
-    base_5y = level_on_or_before(parsed_history, five_year_threshold, fallback_to_first=True)
-
-    daily_change_pct = compute_percentage_change(latest_price, previous_price)
-    monthly_change_pct = compute_percentage_change(latest_price, base_1m)
-    return_1y = compute_percentage_change(latest_price, base_1y)
-    return_5y = compute_percentage_change(latest_price, base_5y)
+    latest_price = series.latest_close
+    thresholds = series.days[-1] - np.array(list(RETURN_WINDOWS.values()), dtype="timedelta64[D]")
+    bases = dict(zip(RETURN_WINDOWS, series.asof_many(thresholds, fallback_to_first=True).tolist()))
+    changes = {field: compute_percentage_change(latest_price, base) for field, base in bases.items()}
+    changes["daily_change_pct"] = compute_percentage_change(latest_price, float(series.closes[-2]))
 
     def rounded(value: Optional[float]) -> Optional[float]:
         if value is None:
@@ -253,42 +126,55 @@ def compute_returns(price_history: List[Dict[str, float]]) -> Dict[str, Optional
         return round(value, 4)
 
     return {
-        "return_1y": rounded(return_1y),
-        "return_5y": rounded(return_5y),
-        "monthly_change_pct": rounded(monthly_change_pct),
-        "daily_change_pct": rounded(daily_change_pct),
+        "return_1y": rounded(changes["return_1y"]),
+        "return_5y": rounded(changes["return_5y"]),
+        "monthly_change_pct": rounded(changes["monthly_change_pct"]),
+        "daily_change_pct": rounded(changes["daily_change_pct"]),
     }
 
 
-def generate_sample_price_history(holding: HoldingConfig) -> List[Dict[str, float]]:
-    behavior = SAMPLE_BEHAVIOR[holding.ticker]
+def sample_behavior(symbol: str) -> Dict[str, float]:
+    """Comportamiento de ejemplo; los símbolos sin entrada en SAMPLE_BEHAVIOR reciben uno estable derivado del nombre."""
+    if symbol in SAMPLE_BEHAVIOR:
+        return SAMPLE_BEHAVIOR[symbol]
+    seed = int(hashlib.sha256(symbol.encode("utf-8")).hexdigest()[:8], 16)
+    return {
+        "base_price": 20 + seed % 480,
+        "annual_return": 0.03 + (seed >> 9) % 120 / 1000,
+        "volatility": 0.02 + (seed >> 17) % 60 / 1000,
+    }
+
+
+def generate_sample_price_history(holding: HoldingConfig) -> PriceSeries:
+    behavior = sample_behavior(holding.fetch_symbol)
     total_days = 5 * 365
     start_date = datetime.utcnow().date() - timedelta(days=total_days - 1)
 
     daily_growth_factor = (1 + behavior["annual_return"]) ** (1 / 365)
     seasonal_scale = 0.6
 
-    points = []
-    for idx in range(total_days):
-        current_date = start_date + timedelta(days=idx)
-        trend_component = behavior["base_price"] * (daily_growth_factor**idx)
-        seasonal_component = 1 + seasonal_scale * behavior["volatility"] * math.sin(2 * math.pi * idx / 180)
-        price = max(trend_component * seasonal_component, 0.01)
-        points.append({"date": current_date.isoformat(), "close": round(price, 2)})
-    return points
+    idx = np.arange(total_days)
+    trend_component = behavior["base_price"] * daily_growth_factor**idx
+    seasonal_component = 1 + seasonal_scale * behavior["volatility"] * np.sin(2 * np.pi * idx / 180)
+    closes = np.maximum(trend_component * seasonal_component, 0.01).round(2)
+    return PriceSeries(np.datetime64(start_date, "D") + idx, closes)
 
 
-def generate_online_price_history(holding: HoldingConfig) -> List[Dict[str, float]]:
+def generate_online_price_history(holding: HoldingConfig) -> PriceSeries:
     if yf is None:
         raise RuntimeError(
             "yfinance no está instalado. Ejecuta `pip install -r requirements.txt` antes de usar el modo en línea."
         )
     ticker = yf.Ticker(holding.fetch_symbol)
-    history = ticker.history(period="5y", interval="1d", auto_adjust=True)
+    try:
+        history = ticker.history(period="5y", interval="1d", auto_adjust=True)
+    except Exception as error:  # pragma: no cover - depende de la red
+        raise RetryableError(f"yfinance falló para {holding.fetch_symbol}: {error}") from error
     if history.empty:
-        return []
+        return PriceSeries.empty()
     history = history[["Close"]].dropna()
-    price_history: List[Dict[str, float]] = []
+    labels: List[str] = []
+    closes: List[float] = []
     for index, row in history.iterrows():
         if hasattr(index, "to_pydatetime"):
             as_dt = index.to_pydatetime()
@@ -298,31 +184,102 @@ def generate_online_price_history(holding: HoldingConfig) -> List[Dict[str, floa
             date_str = as_dt.date().isoformat()
         else:
             date_str = str(as_dt)[:10]
-        price_history.append(
-            {
-                "date": date_str,
-                "close": round(float(row["Close"]), 4),
-            }
-        )
-    return price_history
+        labels.append(date_str)
+        closes.append(round(float(row["Close"]), 4))
+    return PriceSeries.from_arrays(np.array(labels, dtype="datetime64[D]"), closes)
+
+
+@dataclass
+class SymbolData:
+    """Históricos y derivados de un `fetch_symbol`, compartidos por todas las plataformas que lo tienen."""
+
+    price_history: PriceSeries = field(default_factory=PriceSeries.empty)
+    error: Optional[str] = None
+    metrics: Dict[str, Optional[float]] = field(default_factory=dict)
+    # Forma JSON que se publica en `holdings[].series`.
+    series: Dict[str, List[Dict]] = field(default_factory=dict)
+    normalized: np.ndarray = field(default_factory=lambda: np.array([], dtype=float))
+
+
+def fetch_price_histories(
+    series_provider: Callable[[HoldingConfig], PriceSeries],
+    holdings: Dict[str, HoldingConfig],
+    provider_name: str,
+    policy: Optional[FetchPolicy] = None,
+) -> Dict[str, Union[PriceSeries, BaseException]]:
+    """Descarga todos los símbolos en paralelo; un símbolo que falla queda con su excepción."""
+    symbols = list(holdings)
+    results = run_calls(
+        [(provider_name, series_provider, (holdings[symbol],)) for symbol in symbols],
+        policy or PRICE_FETCH_POLICIES.get(provider_name, FetchPolicy()),
+    )
+    return dict(zip(symbols, results))
+
+
+def process_symbol(
+    holding: HoldingConfig,
+    price_history: Union[PriceSeries, Sequence[Dict[str, float]], BaseException],
+    fx: Optional[Tuple] = None,
+) -> SymbolData:
+    if isinstance(price_history, BaseException):
+        return SymbolData(error=str(price_history))
+    # Los proveedores también pueden devolver la lista de puntos JSON; queda ordenada y sin fechas repetidas.
+    price_history = as_price_series(price_history)
+    if not len(price_history):
+        return SymbolData()
+
+    labels = price_history.date_labels()
+    normalized = compute_normalized_series(price_history)
+    return SymbolData(
+        price_history=price_history,
+        metrics=compute_returns(price_history),
+        series={
+            "price_history": [{"date": label, "close": close} for label, close in zip(labels, price_history.closes.tolist())],
+            "normalized_5y": [{"date": label, "value": value} for label, value in zip(labels, normalized.tolist())],
+            **build_series_pyramid(price_history),
+            **(build_currency_series(price_history, holding.currency, fx) if fx else {}),
+        },
+        normalized=normalized,
+    )
 
 
 def build_payload(
-    series_provider: Callable[[HoldingConfig], List[Dict[str, float]]],
+    series_provider: Callable[[HoldingConfig], PriceSeries],
     provider_name: str,
     notes: Optional[Dict[str, str]] = None,
     retrieved_at: Optional[str] = None,
+    platform_config: Optional[Dict[str, Dict]] = None,
+    fx_history: Optional[Sequence[Dict[str, float]]] = None,
+    fetch_policy: Optional[FetchPolicy] = None,
+    reuse: Optional[Dict[str, SymbolData]] = None,
 ) -> Dict:
+    """
+    Arma el payload completo. Los símbolos presentes en `reuse` no se descargan: se usan tal cual
+    (ver `reusable_symbol_data`), pero igual entran a resúmenes, métricas de riesgo, NAV y gráficos.
+    """
     generated_at = iso_now()
+    fx = parse_fx_history(fx_history) if fx_history else None
     retrieved_value = retrieved_at or generated_at
     platforms_output = []
     histogram_monthly = []
     histogram_1y = []
     histogram_5y = []
-    labels_set = set()
     datasets_temp = []
+    platform_config = platform_config or load_platform_config()
+
+    # Cada símbolo se descarga y procesa una vez, aunque aparezca en varias plataformas.
+    holdings_by_symbol = unique_holdings(platform_config)
+    reuse = reuse or {}
+    to_fetch = {symbol: holding for symbol, holding in holdings_by_symbol.items() if symbol not in reuse}
+    fetched = fetch_price_histories(series_provider, to_fetch, provider_name, fetch_policy)
+    symbol_data = {
+        symbol: reuse[symbol] if symbol in reuse else process_symbol(holding, fetched[symbol], fx)
+        for symbol, holding in holdings_by_symbol.items()
+    }
+    histories = {symbol: data.price_history for symbol, data in symbol_data.items() if len(data.price_history)}
+    symbol_of: Dict[str, str] = {}
 
-    for platform_id, platform_data in PLATFORM_CONFIG.items():
+    for platform_id, platform_data in platform_config.items():
         holdings_output = []
         weights_with_data = 0.0
         weighted_monthly_change = 0.0
@@ -335,9 +292,9 @@ def build_payload(
         platform_end_dates = []
 
         for holding in platform_data["holdings"]:
-            try:
-                price_history = series_provider(holding)
-            except Exception as error:  # pragma: no cover - avisamos en payload
+            data = symbol_data[holding.fetch_symbol]
+            symbol_of[holding.ticker] = holding.fetch_symbol
+            if not len(data.price_history):
                 holdings_output.append(
                     {
                         "ticker": holding.ticker,
@@ -348,37 +305,19 @@ def build_payload(
                         "latest_price": None,
                         "metrics": {},
                         "series": {"price_history": [], "normalized_5y": []},
-                        "status": {"missing_data": True, "warnings": [str(error)]},
+                        "status": {
+                            "missing_data": True,
+                            "warnings": [data.error or "Sin datos disponibles para este ticker."],
+                        },
                     }
                 )
                 continue
 
-            if not price_history:
-                holdings_output.append(
-                    {
-                        "ticker": holding.ticker,
-                        "display_name": holding.display_name,
-                        "platform_id": platform_id,
-                        "weight": holding.weight,
-                        "currency": holding.currency,
-                        "latest_price": None,
-                        "metrics": {},
-                        "series": {"price_history": [], "normalized_5y": []},
-                        "status": {"missing_data": True, "warnings": ["Sin datos disponibles para este ticker."]},
-                    }
-                )
-                continue
-
-            # Aseguramos orden cronológico
-            price_history = sorted(price_history, key=lambda item: item["date"])
-            normalized = compute_normalized_series(price_history)
-            metrics = compute_returns(price_history)
-            latest_price = price_history[-1]["close"]
-            platform_start_dates.append(price_history[0]["date"])
-            platform_end_dates.append(price_history[-1]["date"])
+            price_history = data.price_history
+            metrics = dict(data.metrics)
+            platform_start_dates.append(price_history.first_date)
+            platform_end_dates.append(price_history.last_date)
 
-            dataset_map = {point["date"]: point["value"] for point in normalized}
-            labels_set.update(dataset_map.keys())
             datasets_temp.append(
                 {
                     "id": holding.ticker,
@@ -387,7 +326,7 @@ def build_payload(
                     "borderColor": platform_data["color"],
                     "backgroundColor": hex_to_rgba(platform_data["color"], 0.15),
                     "weight": holding.weight,
-                    "data_map": dataset_map,
+                    "symbol": data,
                 }
             )
 
@@ -398,12 +337,9 @@ def build_payload(
                     "platform_id": platform_id,
                     "weight": holding.weight,
                     "currency": holding.currency,
-                    "latest_price": latest_price,
+                    "latest_price": price_history.latest_close,
                     "metrics": metrics,
-                    "series": {
-                        "price_history": price_history,
-                        "normalized_5y": normalized,
-                    },
+                    "series": dict(data.series),
                 }
             )
 
@@ -453,13 +389,19 @@ def build_payload(
             }
         )
 
-    labels = sorted(labels_set)
+    price_matrix = build_price_matrix(histories)
+    apply_risk_metrics(platforms_output, compute_risk_metrics(price_matrix), symbol_of)
+    apply_platform_nav(platforms_output, price_matrix, platform_config, symbol_of)
+
+    # Calendario unión de todos los holdings; cada dataset deja `None` en las fechas que no cotizó.
+    label_days = np.unique(np.concatenate([_EMPTY_DAYS] + [dataset["symbol"].price_history.days for dataset in datasets_temp]))
+    labels = np.datetime_as_string(label_days, unit="D").tolist()
     datasets = []
     for dataset in datasets_temp:
-        data = []
-        for label in labels:
-            value = dataset["data_map"].get(label)
-            data.append(round(value, 2) if value is not None else None)
+        symbol = dataset["symbol"]
+        data: List[Optional[float]] = [None] * len(labels)
+        for row, value in zip(np.searchsorted(label_days, symbol.price_history.days).tolist(), symbol.normalized.tolist()):
+            data[row] = value
         datasets.append(
             {
                 "id": dataset["id"],
@@ -492,33 +434,216 @@ def build_payload(
             },
         },
     }
+    if fx:
+        payload["fx"] = {
+            "pair": FX_PAIR,
+            "observed_at": str(fx[0][-1]),
+            "value": float(fx[1][-1]),
+        }
     if notes:
         payload["source"]["notes"] = notes
     return payload
 
 
-def generate_offline_payload() -> Dict:
+RISK_SUMMARY_FIELDS = {
+    "volatility": "avg_volatility",
+    "max_drawdown": "avg_max_drawdown",
+    "sharpe_ratio": "avg_sharpe_ratio",
+    "cagr": "avg_cagr",
+}
+
+
+def apply_risk_metrics(
+    platforms: List[Dict],
+    risk_metrics: Dict[str, Dict],
+    symbol_of: Optional[Dict[str, str]] = None,
+) -> None:
+    """
+    Agrega las métricas extendidas a cada holding y sus promedios ponderados al resumen de la plataforma.
+
+    `risk_metrics` viene por símbolo; `symbol_of` traduce ticker a símbolo (por defecto son iguales).
+    """
+    symbol_of = symbol_of or {}
+    for platform in platforms:
+        totals = {field: [0.0, 0.0] for field in RISK_SUMMARY_FIELDS}
+        for holding in platform["holdings"]:
+            extended = risk_metrics.get(symbol_of.get(holding["ticker"], holding["ticker"]))
+            if not extended or not holding.get("metrics"):
+                continue
+            holding["metrics"].update(extended)
+            for field, accumulator in totals.items():
+                if extended.get(field) is not None:
+                    accumulator[0] += holding["weight"] * extended[field]
+                    accumulator[1] += holding["weight"]
+        for field, (weighted_sum, weight) in totals.items():
+            if weight:
+                platform["summary"][RISK_SUMMARY_FIELDS[field]] = round(weighted_sum / weight, 4)
+
+
+def apply_platform_nav(
+    platforms: List[Dict],
+    price_matrix: PriceMatrix,
+    platform_config: Dict[str, Dict],
+    symbol_of: Optional[Dict[str, str]] = None,
+) -> None:
+    """Guarda en `series.nav` de cada plataforma su NAV diario ponderado (base 100)."""
+    symbol_of = symbol_of or {}
+    for platform in platforms:
+        rebalance = platform_config.get(platform["id"], {}).get("rebalance", DEFAULT_REBALANCE)
+        weights: Dict[str, float] = {}
+        for holding in platform["holdings"]:
+            if holding.get("latest_price") is not None:
+                symbol = symbol_of.get(holding["ticker"], holding["ticker"])
+                weights[symbol] = weights.get(symbol, 0.0) + holding["weight"]
+        platform["nav_rebalance"] = rebalance
+        platform["series"] = {"nav": compute_platform_nav(price_matrix, weights, rebalance)}
+
+
+def select_symbols(
+    platform_config: Dict[str, Dict],
+    tickers: Sequence[str] = (),
+    platforms: Sequence[str] = (),
+) -> List[str]:
+    """
+    `fetch_symbol` de los holdings elegidos por ticker (o su `fetch_symbol`) o por plataforma.
+
+    Un símbolo compartido se refresca en todas las plataformas que lo tienen.
+    """
+    unknown_platforms = [platform_id for platform_id in platforms if platform_id not in platform_config]
+    known_tickers = {
+        name for platform in platform_config.values() for holding in platform["holdings"] for name in (holding.ticker, holding.fetch_symbol)
+    }
+    unknown_tickers = [ticker for ticker in tickers if ticker not in known_tickers]
+    problems = []
+    if unknown_tickers:
+        problems.append(f"tickers desconocidos: {', '.join(unknown_tickers)}")
+    if unknown_platforms:
+        problems.append(f"plataformas desconocidas: {', '.join(unknown_platforms)}")
+    if problems:
+        raise SelectionError(f"Selección inválida ({'; '.join(problems)}).")
+
+    selected: Dict[str, None] = {}
+    for platform_id, platform in platform_config.items():
+        for holding in platform["holdings"]:
+            if platform_id in platforms or holding.ticker in tickers or holding.fetch_symbol in tickers:
+                selected[holding.fetch_symbol] = None
+    return list(selected)
+
+
+def reusable_symbol_data(
+    previous: Dict,
+    platform_config: Dict[str, Dict],
+    exclude: Sequence[str] = (),
+) -> Dict[str, SymbolData]:
+    """
+    Reconstruye `SymbolData` desde un snapshot publicado para no volver a descargar esos símbolos.
+
+    Quedan fuera los de `exclude` y los que el snapshot no tiene (p. ej. holdings recién agregados).
+    """
+    published = {
+        (holding.get("platform_id"), holding.get("ticker")): holding
+        for platform in previous.get("platforms") or []
+        for holding in platform.get("holdings") or []
+    }
+    reuse: Dict[str, SymbolData] = {}
+    for platform_id, platform in platform_config.items():
+        for holding in platform["holdings"]:
+            symbol = holding.fetch_symbol
+            item = published.get((platform_id, holding.ticker))
+            if symbol in exclude or symbol in reuse or item is None:
+                continue
+            status = item.get("status") or {}
+            if status.get("missing_data"):
+                reuse[symbol] = SymbolData(error=" ".join(status.get("warnings") or []) or None)
+                continue
+            series = dict(item.get("series") or {})
+            price_history = as_price_series(series.get("price_history"))
+            reuse[symbol] = SymbolData(
+                price_history=price_history,
+                # Las métricas de riesgo se recalculan con la matriz completa; sólo se conservan los retornos.
+                metrics={field: (item.get("metrics") or {}).get(field) for field in RETURN_FIELDS},
+                series=series,
+                normalized=compute_normalized_series(price_history),
+            )
+    return reuse
+
+
+def generate_offline_payload(
+    fx_history: Optional[Sequence[Dict[str, float]]] = None,
+    reuse: Optional[Dict[str, SymbolData]] = None,
+) -> Dict:
     notes = {
         "info": "Datos deterministas generados en modo offline.",
     }
-    return build_payload(generate_sample_price_history, provider_name="offline_sample", notes=notes)
+    return build_payload(
+        generate_sample_price_history,
+        provider_name="offline_sample",
+        notes=notes,
+        fx_history=fx_history or generate_sample_fx_history(),
+        reuse=reuse,
+    )
+
+
+def generate_synthetic_payload(spec: MarketSpec, *, platforms: int = 2, workers: int = 1) -> Dict:
+    """Payload completo sobre un mercado sintético de `spec.tickers` tickers, para pruebas de carga."""
+    market = generate_market(spec, workers=workers)
+    end = spec.end_date or datetime.utcnow().date()
+    notes = {
+        "info": f"Mercado sintético: {spec.tickers} tickers, {spec.years} años, semilla {spec.seed}.",
+    }
+    return build_payload(
+        lambda holding: market[holding.fetch_symbol],
+        provider_name="synthetic",
+        notes=notes,
+        platform_config=build_market_config(spec, platforms),
+        fx_history=generate_sample_fx_history(days=365 * spec.years + 1, today=end),
+    )
 
 
-def generate_online_payload() -> Dict:
+def generate_online_payload(
+    fx_history: Optional[Sequence[Dict[str, float]]] = None,
+    reuse: Optional[Dict[str, SymbolData]] = None,
+) -> Dict:
     notes = {
         cfg.ticker: cfg.fetch_symbol
-        for platform in PLATFORM_CONFIG.values()
-        for cfg in platform["holdings"]
+        for cfg in unique_holdings(load_platform_config()).values()
         if cfg.ticker != cfg.fetch_symbol
     }
     notes = notes or None
-    return build_payload(generate_online_price_history, provider_name="yfinance", notes=notes)
+    return build_payload(
+        generate_online_price_history,
+        provider_name="yfinance",
+        notes=notes,
+        fx_history=fx_history,
+        reuse=reuse,
+    )
+
+
+def generate_partial_payload(
+    previous: Dict,
+    *,
+    tickers: Sequence[str] = (),
+    platforms: Sequence[str] = (),
+    offline: bool = False,
+    fx_history: Optional[Sequence[Dict[str, float]]] = None,
+) -> Dict:
+    """
+    Vuelve a descargar sólo los holdings elegidos y los combina con el resto de `previous`.
+
+    Resúmenes, métricas de riesgo, NAV, histogramas y gráficos se recalculan sobre el conjunto completo.
+    """
+    platform_config = load_platform_config()
+    selected = select_symbols(platform_config, tickers, platforms)
+    reuse = reusable_symbol_data(previous, platform_config, exclude=selected)
+    if offline:
+        return generate_offline_payload(fx_history, reuse=reuse)
+    return generate_online_payload(fx_history, reuse=reuse)
 
 
 def write_json(payload: Dict, output_path: Path) -> None:
-    output_path.parent.mkdir(parents=True, exist_ok=True)
-    with output_path.open("w", encoding="utf-8") as fh:
-        json.dump(payload, fh, indent=2, ensure_ascii=False)
+    """Escribe a un temporal y lo reemplaza al final: un fallo a mitad de camino no deja el archivo truncado."""
+    with atomic_write(output_path) as fh:
+        JsonStreamWriter(fh.write, indent=2).dump(payload)
         fh.write("\n")
 
 
@@ -534,14 +659,80 @@ def parse_args() -> argparse.Namespace:
         action="store_true",
         help="Genera datos deterministas de ejemplo sin consultar APIs externas.",
     )
-    return parser.parse_args()
+    parser.add_argument(
+        "--synthetic",
+        type=int,
+        metavar="TICKERS",
+        help="Genera un mercado sintético con esta cantidad de tickers (implica --offline).",
+    )
+    parser.add_argument("--years", type=int, default=5, help="Años de historia del mercado sintético.")
+    parser.add_argument(
+        "--synthetic-platforms",
+        type=int,
+        default=2,
+        help="Plataformas del mercado sintético.",
+    )
+    parser.add_argument("--seed", type=int, default=7, help="Semilla del mercado sintético.")
+    parser.add_argument(
+        "--calendar",
+        choices=sorted(CALENDARS),
+        default="business",
+        help="Calendario de transacciones del mercado sintético.",
+    )
+    parser.add_argument("--correlation", type=float, default=0.3, help="Correlación entre tickers sintéticos.")
+    parser.add_argument("--workers", type=int, default=1, help="Procesos para generar el mercado sintético.")
+    parser.add_argument(
+        "--tickers",
+        action="append",
+        default=[],
+        help="Refresca sólo estos tickers (separados por coma) y los combina con el JSON existente en --output.",
+    )
+    parser.add_argument(
+        "--platforms",
+        action="append",
+        default=[],
+        help="Refresca sólo los holdings de estas plataformas (separadas por coma).",
+    )
+    args = parser.parse_args()
+    args.tickers = _split_selector(args.tickers)
+    args.platforms = _split_selector(args.platforms)
+    if args.synthetic and (args.tickers or args.platforms):
+        parser.error("--tickers/--platforms no se pueden combinar con --synthetic.")
+    return args
+
+
+def _split_selector(values: Sequence[str]) -> List[str]:
+    return list(dict.fromkeys(item.strip() for value in values for item in value.split(",") if item.strip()))
 
 
 def main() -> None:
     args = parse_args()
     output_path = Path(args.output).resolve()
 
-    if args.offline:
+    if args.synthetic:
+        spec = MarketSpec(
+            tickers=args.synthetic,
+            years=args.years,
+            seed=args.seed,
+            calendar=args.calendar,
+            correlation=args.correlation,
+        )
+        payload = generate_synthetic_payload(spec, platforms=args.synthetic_platforms, workers=args.workers)
+    elif args.tickers or args.platforms:
+        if not output_path.exists():
+            raise SystemExit(f"No existe {output_path}; genera el archivo completo antes de refrescar una parte.")
+        with output_path.open("r", encoding="utf-8") as fh:
+            previous = json.load(fh)
+        try:
+            payload = generate_partial_payload(
+                previous,
+                tickers=args.tickers,
+                platforms=args.platforms,
+                offline=args.offline,
+            )
+        except SelectionError as error:
+            raise SystemExit(str(error)) from error
+    elif args.offline:
         payload = generate_offline_payload()
     else:
         payload = generate_online_payload()
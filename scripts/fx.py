@@ -0,0 +1,78 @@
+"""Series normalizadas en CLP y USD para cada holding usando el dólar observado histórico."""
+
+from __future__ import annotations
+
+import math
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from scripts.platform_nav import rebalance_starts
+from scripts.price_series import PriceSeries
+
+FX_PAIR = "USD/CLP"
+CURRENCY_SERIES = {"CLP": "normalized_5y_clp", "USD": "normalized_5y_usd"}
+
+
+def parse_fx_history(observations: Sequence[Dict[str, float]]) -> Tuple[np.ndarray, np.ndarray]:
+    """Fechas (`datetime64[D]`, ordenadas y sin duplicados) y valores CLP por USD."""
+    by_date = {point["date"][:10]: float(point["value"]) for point in observations if point.get("value")}
+    labels = sorted(by_date)
+    return np.array(labels, dtype="datetime64[D]"), np.array([by_date[label] for label in labels], dtype=float)
+
+
+def fx_as_of(fx_dates: np.ndarray, fx_values: np.ndarray, dates: np.ndarray) -> np.ndarray:
+    """Último dólar observado en o antes de cada fecha; NaN antes de la primera observación."""
+    rows = np.searchsorted(fx_dates, dates, side="right") - 1
+    return np.where(rows >= 0, fx_values[np.maximum(rows, 0)], np.nan)
+
+
+def build_currency_series(
+    price_history: PriceSeries,
+    currency: str,
+    fx_history: Tuple[np.ndarray, np.ndarray],
+) -> Dict[str, List[Dict[str, float]]]:
+    """
+    Devuelve `normalized_5y_clp` y `normalized_5y_usd` (base 100) para un holding cotizado en `currency`.
+
+    La base es el primer día hábil del primer mes completo con dólar disponible, igual que el NAV:
+    así la serie sólo se rebasa al cruzar un mes y el delta diario sigue siendo un append.
+    """
+    fx_dates, fx_values = fx_history
+    if currency not in CURRENCY_SERIES or not len(price_history) or fx_dates.size == 0:
+        return {}
+
+    dates, closes = price_history.days, price_history.closes
+    fx = fx_as_of(fx_dates, fx_values, dates)
+    ready = ~np.isnan(fx) & (closes > 0)
+    if not ready.any():
+        return {}
+
+    start = int(np.argmax(ready))
+    boundaries = rebalance_starts(dates[start:], "monthly")
+    if boundaries.size > 1:
+        start += int(boundaries[1])
+    dates, closes, fx, ready = dates[start:], closes[start:], fx[start:], ready[start:]
+
+    in_clp = closes if currency == "CLP" else closes * fx
+    in_usd = closes / fx if currency == "CLP" else closes
+    labels = np.datetime_as_string(dates[ready], unit="D").tolist()
+    output = {}
+    for code, values in (("CLP", in_clp[ready]), ("USD", in_usd[ready])):
+        normalized = (100.0 * values / values[0]).round(2).tolist()
+        output[CURRENCY_SERIES[code]] = [{"date": label, "value": value} for label, value in zip(labels, normalized)]
+    return output
+
+
+def generate_sample_fx_history(days: int = 5 * 365, today: Optional[date] = None) -> List[Dict[str, float]]:
+    """Dólar observado determinista para el modo offline (sólo días hábiles, como el Banco Central)."""
+    start = (today or datetime.utcnow().date()) - timedelta(days=days - 1)
+    points = []
+    for offset in range(days):
+        current = start + timedelta(days=offset)
+        if current.weekday() >= 5:
+            continue
+        value = 780.0 * (1.035 ** (offset / 365)) * (1 + 0.04 * math.sin(2 * math.pi * offset / 240))
+        points.append({"date": current.isoformat(), "value": round(value, 2)})
+    return points
@@ -0,0 +1,227 @@
+"""Lectura y escritura incremental de JSON para manejar archivos grandes sin tenerlos completos en memoria."""
+
+from __future__ import annotations
+
+import json
+from typing import Any, Callable, Iterator, TextIO, Tuple
+
+DEFAULT_CHUNK_SIZE = 64 * 1024
+# Profundidad hasta la que el escritor abre contenedores: en el payload alcanza para emitir
+# cada holding y cada dataset de los gráficos como una pieza independiente.
+DEFAULT_STREAM_DEPTH = 4
+_WHITESPACE = " \t\n\r"
+_VALUE_TERMINATORS = _WHITESPACE + ",]}:"
+
+
+class JsonStreamError(ValueError):
+    """El documento no es JSON válido o no tiene la forma esperada."""
+
+    def __init__(self, message: str, offset: int):
+        super().__init__(f"{message} (carácter {offset})")
+        self.offset = offset
+
+
+class JsonStreamReader:
+    """
+    Lector tipo pull: el llamador decide si entra a un objeto/lista o si materializa el valor.
+
+    Después de cada clave entregada por `iter_object` o índice entregado por `iter_array`,
+    el llamador debe consumir exactamente un valor con `read_value`, `skip_value`,
+    `iter_object` o `iter_array`.
+    """
+
+    def __init__(self, fh: TextIO, *, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self._fh = fh
+        self._chunk_size = chunk_size
+        self._decoder = json.JSONDecoder()
+        self._buffer = ""
+        self._pos = 0
+        self._offset = 0
+        self._eof = False
+
+    @property
+    def offset(self) -> int:
+        return self._offset + self._pos
+
+    def peek(self) -> str:
+        """Devuelve el próximo carácter significativo sin consumirlo ('' al final)."""
+        self._skip_whitespace()
+        if self._pos >= len(self._buffer):
+            return ""
+        return self._buffer[self._pos]
+
+    def iter_object(self) -> Iterator[str]:
+        self._expect("{")
+        if self.peek() == "}":
+            self._pos += 1
+            return
+        while True:
+            if self.peek() != '"':
+                raise JsonStreamError("Se esperaba una clave string", self.offset)
+            key = self.read_value()
+            self._expect(":")
+            yield key
+            separator = self._next_char()
+            if separator == "}":
+                return
+            if separator != ",":
+                raise JsonStreamError("Se esperaba ',' o '}'", self.offset)
+
+    def iter_array(self) -> Iterator[int]:
+        self._expect("[")
+        if self.peek() == "]":
+            self._pos += 1
+            return
+        index = 0
+        while True:
+            yield index
+            index += 1
+            separator = self._next_char()
+            if separator == "]":
+                return
+            if separator != ",":
+                raise JsonStreamError("Se esperaba ',' o ']'", self.offset)
+
+    def read_value(self) -> Any:
+        """Materializa el próximo valor completo; sólo crece el buffer lo necesario."""
+        self._skip_whitespace()
+        read_size = self._chunk_size
+        while True:
+            try:
+                value, end = self._decoder.raw_decode(self._buffer, self._pos)
+            except json.JSONDecodeError as error:
+                if self._eof:
+                    raise JsonStreamError(f"JSON inválido: {error.msg}", self._offset + error.pos) from error
+            else:
+                # Un número al borde del bloque ("1." o "1e") puede seguir en el próximo: el valor sólo
+                # está completo si lo que viene después es un separador.
+                if self._eof or (end < len(self._buffer) and self._buffer[end] in _VALUE_TERMINATORS):
+                    self._pos = end
+                    return value
+            self._read_more(read_size)
+            read_size *= 2
+
+    def skip_value(self) -> None:
+        token = self.peek()
+        if token == "{":
+            for _ in self.iter_object():
+                self.skip_value()
+        elif token == "[":
+            for _ in self.iter_array():
+                self.skip_value()
+        else:
+            self.read_value()
+
+    def ensure_finished(self) -> None:
+        if self.peek():
+            raise JsonStreamError("Hay contenido extra después del documento", self.offset)
+
+    def _expect(self, char: str) -> None:
+        if self._next_char() != char:
+            raise JsonStreamError(f"Se esperaba '{char}'", self.offset)
+
+    def _next_char(self) -> str:
+        char = self.peek()
+        if not char:
+            raise JsonStreamError("El documento terminó antes de tiempo", self.offset)
+        self._pos += 1
+        return char
+
+    def _skip_whitespace(self) -> None:
+        while True:
+            buffer = self._buffer
+            length = len(buffer)
+            pos = self._pos
+            while pos < length and buffer[pos] in _WHITESPACE:
+                pos += 1
+            self._pos = pos
+            if pos < length or self._eof:
+                return
+            self._read_more(self._chunk_size)
+
+    def _read_more(self, size: int) -> None:
+        if self._pos > self._chunk_size:
+            self._offset += self._pos
+            self._buffer = self._buffer[self._pos :]
+            self._pos = 0
+        chunk = self._fh.read(size)
+        if not chunk:
+            self._eof = True
+            return
+        self._buffer += chunk
+
+
+class JsonStreamWriter:
+    """
+    Serializa un documento por piezas: abre objetos y listas hasta `max_depth` y codifica cada
+    hoja con `json.dumps`, así el texto completo nunca existe en memoria a la vez.
+
+    Los valores pueden ser iteradores (p. ej. generadores): se escriben como listas a medida que
+    producen elementos. El resultado es idéntico al de `json.dumps` con los mismos parámetros.
+    """
+
+    def __init__(
+        self,
+        write: Callable[[str], Any],
+        *,
+        indent: int | None = None,
+        separators: Tuple[str, str] | None = None,
+        ensure_ascii: bool = False,
+        max_depth: int = DEFAULT_STREAM_DEPTH,
+    ):
+        self._write = write
+        self._indent = indent
+        self._item_separator, self._key_separator = separators or ((",", ": ") if indent is not None else (", ", ": "))
+        self._ensure_ascii = ensure_ascii
+        self._max_depth = max_depth
+
+    def dump(self, value: Any) -> None:
+        self._write_value(value, 0)
+
+    def _write_value(self, value: Any, depth: int) -> None:
+        if isinstance(value, dict):
+            if depth < self._max_depth and _has_containers(value.values()):
+                self._write_container("{", "}", value.items(), depth, keyed=True)
+                return
+        elif isinstance(value, (list, tuple)):
+            if depth < self._max_depth and _has_containers(value):
+                self._write_container("[", "]", value, depth, keyed=False)
+                return
+        elif isinstance(value, Iterator):
+            self._write_container("[", "]", value, depth, keyed=False)
+            return
+        self._write(self._encode(value, depth))
+
+    def _write_container(self, opening: str, closing: str, items: Any, depth: int, *, keyed: bool) -> None:
+        write = self._write
+        if self._indent is None:
+            newline = inner = ""
+        else:
+            newline = "\n" + " " * (self._indent * depth)
+            inner = newline + " " * self._indent
+        write(opening)
+        first = True
+        for item in items:
+            write(inner if first else self._item_separator + inner)
+            first = False
+            if keyed:
+                key, item = item
+                write(json.dumps(str(key), ensure_ascii=self._ensure_ascii) + self._key_separator)
+            self._write_value(item, depth + 1)
+        write(closing if first else newline + closing)
+
+    def _encode(self, value: Any, depth: int) -> str:
+        serialized = json.dumps(
+            value,
+            ensure_ascii=self._ensure_ascii,
+            indent=self._indent,
+            separators=(self._item_separator, self._key_separator),
+        )
+        if self._indent and depth:
+            # JSON no admite saltos de línea literales dentro de strings, así que reindentar es seguro.
+            serialized = serialized.replace("\n", "\n" + " " * (self._indent * depth))
+        return serialized
+
+
+def _has_containers(values: Any) -> bool:
+    return any(isinstance(value, (dict, list, tuple)) or isinstance(value, Iterator) for value in values)
@@ -0,0 +1,605 @@
+"""
+Esquemas declarativos de los datasets y su compilación a validadores especializados.
+
+Cada esquema se describe una sola vez con nodos (`Obj`, `ListOf`, `Str`, `Num`, ...) y se
+compila al importar el módulo en funciones cerradas que:
+- revisan listas homogéneas en bloque con tipos exactos y sólo recorren ítem a ítem si algo falla,
+- arman los mensajes (con ruta JSON) únicamente cuando una regla no se cumple,
+- respetan un tope de errores y un corte temprano opcional.
+
+El mismo árbol de nodos guía la validación en memoria y la validación incremental de archivos.
+"""
+
+from __future__ import annotations
+
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from scripts.json_stream import JsonStreamError, JsonStreamReader
+
+DEFAULT_MAX_ERRORS = 100
+_NUMBER_TYPES = (int, float)
+_NONE_TYPE = type(None)
+
+
+class ValidationError(Exception):
+    """Error que agrupa una o más fallas de validación."""
+
+    def __init__(self, errors: Iterable[str]):
+        errors = list(errors)
+        super().__init__("\n".join(errors))
+        self.errors = errors
+
+
+class _ValidationAborted(Exception):
+    """Corta la validación cuando ya no tiene sentido seguir juntando errores."""
+
+
+class _ErrorCollector:
+    """Acumula errores con tope y corte temprano opcional."""
+
+    __slots__ = ("errors", "max_errors", "fail_fast")
+
+    def __init__(self, *, max_errors: Optional[int] = DEFAULT_MAX_ERRORS, fail_fast: bool = False):
+        self.errors: List[str] = []
+        self.max_errors = max_errors
+        self.fail_fast = fail_fast
+
+    def add(self, message: str) -> None:
+        self.errors.append(message)
+        if self.fail_fast:
+            raise _ValidationAborted
+        if self.max_errors is not None and len(self.errors) >= self.max_errors:
+            self.errors.append(f"Se alcanzó el máximo de {self.max_errors} errores; se omiten los restantes.")
+            raise _ValidationAborted
+
+
+class _Path:
+    """Ruta JSON enlazada; sólo se convierte a texto cuando hay que reportar un error."""
+
+    __slots__ = ("parent", "key")
+
+    def __init__(self, parent: Optional["_Path"], key: Any):
+        self.parent = parent
+        self.key = key
+
+    def __str__(self) -> str:
+        parts = []
+        node: Optional[_Path] = self
+        while node is not None:
+            parts.append(node.key)
+            node = node.parent
+        return _join_path(reversed(parts))
+
+
+def _join_path(parts: Iterable[Any]) -> str:
+    rendered = ""
+    for part in parts:
+        if isinstance(part, int):
+            rendered += f"[{part}]"
+        elif rendered:
+            rendered += f".{part}"
+        else:
+            rendered = str(part)
+    return rendered
+
+
+def _format_path(parent: Optional[_Path], key: Any) -> str:
+    if parent is None:
+        return str(key)
+    return _join_path((str(parent), key))
+
+
+_ROOT_KEY = "$"
+
+# check(value, parent_path, key, errors)
+Checker = Callable[[Any, Optional[_Path], Any, _ErrorCollector], None]
+
+
+class Node:
+    """Nodo base del esquema."""
+
+    expected = "valor"
+    nullable = False
+    check: Checker
+
+    def accepts(self, value: Any) -> bool:
+        return True
+
+    def fast_types(self) -> Optional[Tuple[type, ...]]:
+        """Tipos exactos que bastan para aceptar un valor sin más revisiones (None si no aplica)."""
+        return None
+
+    def compile(self) -> Checker:
+        accepts = self.accepts
+        expected = self.expected
+
+        def check(value: Any, parent: Optional[_Path], key: Any, errors: _ErrorCollector) -> None:
+            if not accepts(value):
+                errors.add(f"{_format_path(parent, key)} debe ser {expected}")
+
+        return check
+
+
+class AnyValue(Node):
+    def compile(self) -> Checker:
+        def check(value: Any, parent: Optional[_Path], key: Any, errors: _ErrorCollector) -> None:
+            return
+
+        return check
+
+
+class Str(Node):
+    def __init__(self, *, non_empty: bool = False, nullable: bool = False):
+        self.non_empty = non_empty
+        self.nullable = nullable
+        self.expected = "string no vacío" if non_empty else "string"
+        if nullable:
+            self.expected += " o null"
+
+    def accepts(self, value: Any) -> bool:
+        if value is None:
+            return self.nullable
+        if not isinstance(value, str):
+            return False
+        return bool(value.strip()) if self.non_empty else True
+
+    def fast_types(self) -> Optional[Tuple[type, ...]]:
+        if self.non_empty:
+            return None
+        return (str, _NONE_TYPE) if self.nullable else (str,)
+
+
+class Num(Node):
+    def __init__(self, *, nullable: bool = False):
+        self.nullable = nullable
+        self.expected = "número o null" if nullable else "numérico"
+
+    def accepts(self, value: Any) -> bool:
+        if value is None:
+            return self.nullable
+        return isinstance(value, _NUMBER_TYPES)
+
+    def fast_types(self) -> Optional[Tuple[type, ...]]:
+        return (int, float, _NONE_TYPE) if self.nullable else _NUMBER_TYPES
+
+
+class Int(Node):
+    def __init__(self, *, nullable: bool = False):
+        self.nullable = nullable
+        self.expected = "entero o null" if nullable else "entero"
+
+    def accepts(self, value: Any) -> bool:
+        if value is None:
+            return self.nullable
+        return isinstance(value, int) and not isinstance(value, bool)
+
+    def fast_types(self) -> Optional[Tuple[type, ...]]:
+        return (int, _NONE_TYPE) if self.nullable else (int,)
+
+
+class Obj(Node):
+    expected = "objeto"
+
+    def __init__(
+        self,
+        fields: Dict[str, Node],
+        *,
+        required: Sequence[str] = (),
+        nullable: bool = False,
+    ):
+        self.fields = fields
+        self.required = tuple(required)
+        self.nullable = nullable
+        if nullable:
+            self.expected = "objeto o null"
+
+    def accepts(self, value: Any) -> bool:
+        return isinstance(value, dict) or (value is None and self.nullable)
+
+    def is_flat(self) -> bool:
+        return all(child.fast_types() is not None for child in self.fields.values())
+
+    def report_missing(self, seen: Iterable[str], path: _Path, errors: _ErrorCollector) -> None:
+        for key in self.required:
+            if key not in seen:
+                errors.add(f"{path}: falta la clave obligatoria {key}")
+
+    def compile(self) -> Checker:
+        field_checks = [(key, child.check) for key, child in self.fields.items()]
+        required = self.required
+        nullable = self.nullable
+
+        def check(value: Any, parent: Optional[_Path], key: Any, errors: _ErrorCollector) -> None:
+            if not isinstance(value, dict):
+                if value is None and nullable:
+                    return
+                errors.add(f"{_format_path(parent, key)} debe ser objeto")
+                return
+            path = _Path(parent, key)
+            for field_key in required:
+                if field_key not in value:
+                    errors.add(f"{path}: falta la clave obligatoria {field_key}")
+            for field_key, field_check in field_checks:
+                if field_key in value:
+                    field_check(value[field_key], path, field_key, errors)
+
+        return check
+
+
+class ListOf(Node):
+    expected = "lista"
+
+    def __init__(self, item: Node, *, nullable: bool = False):
+        self.item = item
+        self.nullable = nullable
+
+    def accepts(self, value: Any) -> bool:
+        return isinstance(value, list) or (value is None and self.nullable)
+
+    def is_streamable(self) -> bool:
+        """Las listas de objetos anidados se recorren ítem a ítem; el resto se materializa completo."""
+        item = self.item
+        return isinstance(item, ListOf) or (isinstance(item, Obj) and not item.is_flat())
+
+    def compile(self) -> Checker:
+        item_check = self.item.check
+        fast_check = self._compile_fast_path()
+        nullable = self.nullable
+
+        def check(value: Any, parent: Optional[_Path], key: Any, errors: _ErrorCollector) -> None:
+            if not isinstance(value, list):
+                if value is None and nullable:
+                    return
+                errors.add(f"{_format_path(parent, key)} debe ser lista")
+                return
+            if fast_check is not None and fast_check(value):
+                return
+            path = _Path(parent, key)
+            for index, item in enumerate(value):
+                item_check(item, path, index, errors)
+
+        return check
+
+    def _compile_fast_path(self) -> Optional[Callable[[List[Any]], bool]]:
+        item = self.item
+        scalar_types = item.fast_types()
+        if scalar_types is not None:
+            return lambda values: all(type(value) in scalar_types for value in values)
+
+        if not isinstance(item, Obj) or not item.is_flat():
+            return None
+
+        # Registros planos (por ejemplo {date, close}): basta revisar el tipo exacto de cada campo.
+        required = set(item.required)
+        return _build_records_checker(
+            [(key, child.fast_types(), key in required) for key, child in item.fields.items()]
+        )
+
+
+_MISSING = object()
+
+
+def _build_records_checker(fields: List[Tuple[str, Tuple[type, ...], bool]]) -> Callable[[List[Any]], bool]:
+    fields = tuple(fields)
+
+    def records_look_valid(values: List[Any]) -> bool:
+        for record in values:
+            if type(record) is not dict:
+                return False
+            for key, types, is_required in fields:
+                value = record.get(key, _MISSING)
+                if value is _MISSING:
+                    if is_required:
+                        return False
+                elif type(value) not in types:
+                    return False
+        return True
+
+    return records_look_valid
+
+
+class MapOf(Node):
+    expected = "objeto"
+
+    def __init__(self, value: Node):
+        self.value = value
+
+    def accepts(self, value: Any) -> bool:
+        return isinstance(value, dict)
+
+    def compile(self) -> Checker:
+        value_check = self.value.check
+
+        def check(value: Any, parent: Optional[_Path], key: Any, errors: _ErrorCollector) -> None:
+            if not isinstance(value, dict):
+                errors.add(f"{_format_path(parent, key)} debe ser objeto")
+                return
+            path = _Path(parent, key)
+            for entry_key, entry_value in value.items():
+                value_check(entry_value, path, entry_key, errors)
+
+        return check
+
+
+def _compile_tree(node: Node) -> None:
+    if isinstance(node, Obj):
+        for child in node.fields.values():
+            _compile_tree(child)
+    elif isinstance(node, ListOf):
+        _compile_tree(node.item)
+    elif isinstance(node, MapOf):
+        _compile_tree(node.value)
+    node.check = node.compile()
+
+
+class Schema:
+    """Esquema compilado de un dataset."""
+
+    def __init__(self, name: str, root: Obj):
+        self.name = name
+        self.root = root
+        _compile_tree(root)
+
+    def validate(
+        self,
+        payload: Any,
+        *,
+        max_errors: Optional[int] = DEFAULT_MAX_ERRORS,
+        fail_fast: bool = False,
+    ) -> None:
+        errors = _ErrorCollector(max_errors=max_errors, fail_fast=fail_fast)
+        try:
+            self.root.check(payload, None, _ROOT_KEY, errors)
+        except _ValidationAborted:
+            pass
+        if errors.errors:
+            raise ValidationError(errors.errors)
+
+    def validate_stream(
+        self,
+        reader: JsonStreamReader,
+        *,
+        max_errors: Optional[int] = DEFAULT_MAX_ERRORS,
+        fail_fast: bool = False,
+    ) -> None:
+        """Valida leyendo incrementalmente; sólo materializa hojas y registros planos."""
+        errors = _ErrorCollector(max_errors=max_errors, fail_fast=fail_fast)
+        try:
+            _stream_node(reader, self.root, None, _ROOT_KEY, errors)
+            reader.ensure_finished()
+        except JsonStreamError as error:
+            errors.errors.append(f"JSON inválido: {error}")
+        except _ValidationAborted:
+            pass
+        if errors.errors:
+            raise ValidationError(errors.errors)
+
+
+def _stream_node(
+    reader: JsonStreamReader,
+    node: Node,
+    parent: Optional[_Path],
+    key: Any,
+    errors: _ErrorCollector,
+) -> None:
+    token = reader.peek()
+    if isinstance(node, Obj) and token == "{":
+        path = _Path(parent, key)
+        seen = []
+        for field_key in reader.iter_object():
+            seen.append(field_key)
+            child = node.fields.get(field_key)
+            if child is None:
+                reader.skip_value()
+            else:
+                _stream_node(reader, child, path, field_key, errors)
+        node.report_missing(seen, path, errors)
+    elif isinstance(node, ListOf) and token == "[" and node.is_streamable():
+        path = _Path(parent, key)
+        for index in reader.iter_array():
+            _stream_node(reader, node.item, path, index, errors)
+    else:
+        node.check(reader.read_value(), parent, key, errors)
+
+
+PRICE_POINT = Obj({"date": Str(), "close": Num()}, required=("date", "close"))
+NORMALIZED_POINT = Obj({"date": Str(), "value": Num()}, required=("date", "value"))
+OHLC_POINT = Obj(
+    {"date": Str(), "open": Num(), "high": Num(), "low": Num(), "close": Num()},
+    required=("date", "open", "high", "low", "close"),
+)
+
+HOLDING = Obj(
+    {
+        "ticker": Str(non_empty=True),
+        "display_name": Str(non_empty=True),
+        "weight": Num(),
+        "currency": Str(),
+        "metrics": Obj(
+            {
+                "return_1y": Num(nullable=True),
+                "return_5y": Num(nullable=True),
+                "monthly_change_pct": Num(nullable=True),
+                "daily_change_pct": Num(nullable=True),
+                "volatility": Num(nullable=True),
+                "max_drawdown": Num(nullable=True),
+                "max_drawdown_start": Str(nullable=True),
+                "max_drawdown_end": Str(nullable=True),
+                "max_drawdown_recovery": Str(nullable=True),
+                "sharpe_ratio": Num(nullable=True),
+                "sortino_ratio": Num(nullable=True),
+                "cagr": Num(nullable=True),
+                "rolling_1y_min": Num(nullable=True),
+                "rolling_1y_max": Num(nullable=True),
+                "rolling_1y_mean": Num(nullable=True),
+                "rolling_1y_positive_share": Num(nullable=True),
+            }
+        ),
+        "series": Obj(
+            {
+                "price_history": ListOf(PRICE_POINT),
+                "normalized_5y": ListOf(NORMALIZED_POINT),
+                "weekly": ListOf(OHLC_POINT),
+                "monthly": ListOf(OHLC_POINT),
+                "daily_tail": ListOf(PRICE_POINT),
+                "normalized_5y_clp": ListOf(NORMALIZED_POINT),
+                "normalized_5y_usd": ListOf(NORMALIZED_POINT),
+            }
+        ),
+    },
+    required=("ticker", "display_name", "weight", "currency"),
+)
+
+PLATFORM = Obj(
+    {
+        "id": Str(non_empty=True),
+        "name": Str(),
+        "color": Str(),
+        "summary": Obj(
+            {
+                "total_weight": Num(),
+                "avg_monthly_change": Num(),
+                "avg_return_1y": Num(),
+                "avg_return_5y": Num(),
+                "avg_volatility": Num(),
+                "avg_max_drawdown": Num(),
+                "avg_sharpe_ratio": Num(),
+                "avg_cagr": Num(),
+                "timestamp_range": Obj({"start": Str(), "end": Str()}, required=("start", "end")),
+            },
+            nullable=True,
+        ),
+        "nav_rebalance": Str(),
+        "series": Obj({"nav": ListOf(NORMALIZED_POINT)}),
+        "holdings": ListOf(HOLDING),
+    },
+    required=("id", "name", "color"),
+)
+
+TIMESERIES_DATASET = Obj(
+    {
+        "id": Str(),
+        "label": Str(),
+        "platform_id": Str(),
+        "borderColor": Str(),
+        "backgroundColor": Str(),
+        "data": ListOf(Num(nullable=True)),
+    },
+    required=("id", "label", "platform_id", "borderColor", "backgroundColor"),
+)
+
+HISTOGRAM_ENTRY = Obj(
+    {
+        "ticker": Str(),
+        "platform_id": Str(),
+        "label": Str(),
+        "weight": Num(),
+        "value": Num(),
+    },
+    required=("ticker", "platform_id", "label", "weight", "value"),
+)
+
+LATEST_V1_SCHEMA = Schema(
+    "latest",
+    Obj(
+        {
+            "generated_at": Str(),
+            "content_hash": Str(),
+            "currency": Str(),
+            "source": Obj(
+                {
+                    "provider": Str(),
+                    "retrieved_at": Str(),
+                    "notes": MapOf(AnyValue()),
+                },
+                required=("provider",),
+            ),
+            "fx": Obj({"pair": Str(), "observed_at": Str(), "value": Num()}, required=("pair", "observed_at", "value")),
+            "platforms": ListOf(PLATFORM),
+            "charts": Obj(
+                {
+                    "timeseries_5y": Obj(
+                        {
+                            "labels": ListOf(Str()),
+                            "datasets": ListOf(TIMESERIES_DATASET),
+                        }
+                    ),
+                    "histograms": Obj(
+                        {
+                            "monthly_change": ListOf(HISTOGRAM_ENTRY),
+                            "return_1y": ListOf(HISTOGRAM_ENTRY),
+                            "return_5y": ListOf(HISTOGRAM_ENTRY),
+                        }
+                    ),
+                }
+            ),
+        },
+        required=("generated_at", "currency", "source", "platforms", "charts"),
+    ),
+)
+
+INDICATORS_SCHEMA = Schema(
+    "indicators",
+    Obj(
+        {
+            "items": ListOf(
+                Obj(
+                    {
+                        "key": Str(non_empty=True),
+                        "label": Str(),
+                        "series_id": Str(),
+                        "value": Num(),
+                        "unit": Str(),
+                        "decimals": Int(),
+                        "observed_at": Str(),
+                    },
+                    required=("key", "label", "value", "unit", "decimals", "observed_at"),
+                )
+            ),
+            "fetched_at": Str(),
+            "content_hash": Str(),
+            "source": Str(),
+            "source_url": Str(),
+        },
+        required=("items", "fetched_at", "source"),
+    ),
+)
+
+CORRELATIONS_SCHEMA = Schema(
+    "correlations",
+    Obj(
+        {
+            "generated_at": Str(),
+            "source_content_hash": Str(nullable=True),
+            "content_hash": Str(),
+            "calendar": Obj(
+                {"start": Str(), "end": Str(), "observations": Int(), "periods_per_year": Num()},
+                required=("start", "end", "observations"),
+            ),
+            "tickers": ListOf(Str(non_empty=True)),
+            "volatility": ListOf(Num()),
+            "correlation": ListOf(ListOf(Num())),
+            "covariance": ListOf(ListOf(Num())),
+            "platforms": MapOf(
+                Obj(
+                    {
+                        "tickers": ListOf(Str()),
+                        "volatility": Num(),
+                        "diversification_ratio": Num(nullable=True),
+                        "average_correlation": Num(nullable=True),
+                    },
+                    required=("tickers", "volatility"),
+                )
+            ),
+            "platform_ids": ListOf(Str()),
+            "platform_correlation": ListOf(ListOf(Num()), nullable=True),
+        },
+        required=("generated_at", "calendar", "tickers", "volatility", "correlation", "covariance"),
+    ),
+)
+
+SCHEMAS: Dict[str, Schema] = {
+    LATEST_V1_SCHEMA.name: LATEST_V1_SCHEMA,
+    INDICATORS_SCHEMA.name: INDICATORS_SCHEMA,
+    CORRELATIONS_SCHEMA.name: CORRELATIONS_SCHEMA,
+}
@@ -0,0 +1,71 @@
+"""NAV diario ponderado por plataforma a partir de la matriz de precios alineada."""
+
+from __future__ import annotations
+
+from typing import Dict, List, Mapping
+
+import numpy as np
+
+from scripts.price_matrix import PriceMatrix
+
+REBALANCE_POLICIES = ("none", "monthly", "quarterly")
+DEFAULT_REBALANCE = "monthly"
+NAV_BASE = 100.0
+
+
+def compute_platform_nav(
+    matrix: PriceMatrix,
+    weights: Mapping[str, float],
+    rebalance: str = DEFAULT_REBALANCE,
+    base: float = NAV_BASE,
+) -> List[Dict[str, float]]:
+    """
+    Devuelve `[{date, value}]` con base `base` en la primera fecha en que todos los holdings tienen
+    precio; con rebalanceo, en el primer rebalanceo posterior. Así el NAV no se recalcula entero
+    cada vez que la ventana de históricos avanza un día, salvo al cruzar un período.
+
+    Entre rebalanceos las unidades quedan fijas, así que cada tramo es `NAV_inicio * (P_t / P_inicio) @ w`;
+    los tramos se encadenan con un producto acumulado. Los pesos se renormalizan entre los
+    holdings con datos y los huecos del calendario usan el último cierre conocido.
+    """
+    if rebalance not in REBALANCE_POLICIES:
+        raise ValueError(f"Política de rebalanceo inválida: {rebalance}. Usa {', '.join(REBALANCE_POLICIES)}.")
+
+    selected = [(matrix.column(key), weight) for key, weight in weights.items() if key in matrix.keys and weight > 0]
+    if not selected or matrix.dates.size == 0:
+        return []
+    columns = [column for column, _ in selected]
+    allocation = np.array([weight for _, weight in selected], dtype=float)
+    allocation /= allocation.sum()
+
+    prices = matrix.prices[:, columns]
+    ready = ~np.isnan(prices).any(axis=1)
+    if not ready.any():
+        return []
+    start = int(np.argmax(ready))
+    if rebalance != "none":
+        boundaries = rebalance_starts(matrix.dates[start:], rebalance)
+        if boundaries.size > 1:
+            start += int(boundaries[1])
+    prices = prices[start:]
+    dates = matrix.dates[start:]
+    observed = matrix.observed[start:, columns].any(axis=1)
+
+    rebalance_rows = rebalance_starts(dates, rebalance)
+    # Cada fila usa el último rebalanceo estrictamente anterior (el del día se aplica al cierre).
+    segment = np.maximum(np.searchsorted(rebalance_rows, np.arange(dates.size), side="left") - 1, 0)
+    growth = (prices / prices[rebalance_rows[segment]]) @ allocation
+    nav_at_rebalance = base * np.concatenate(([1.0], np.cumprod(growth[rebalance_rows[1:]])))
+    nav = nav_at_rebalance[segment] * growth
+
+    labels = np.datetime_as_string(dates[observed], unit="D").tolist()
+    return [{"date": label, "value": round(value, 4)} for label, value in zip(labels, nav[observed].tolist())]
+
+
+def rebalance_starts(dates: np.ndarray, rebalance: str) -> np.ndarray:
+    """Filas donde empieza cada período de rebalanceo; la fila 0 siempre está incluida."""
+    if rebalance == "none" or dates.size == 0:
+        return np.zeros(1, dtype=np.int64)
+    months = dates.astype("datetime64[M]").astype(np.int64)
+    periods = months // 3 if rebalance == "quarterly" else months
+    return np.flatnonzero(np.r_[True, periods[1:] != periods[:-1]])
@@ -0,0 +1,160 @@
+"""
+Configuración de plataformas y holdings desde `config/portfolios.toml` (o un JSON equivalente).
+
+La ruta se puede cambiar con `PORTFOLIO_CONFIG_PATH`.
+"""
+
+from __future__ import annotations
+
+import json
+import os
+import re
+import tomllib
+from dataclasses import dataclass
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from scripts.platform_nav import DEFAULT_REBALANCE, REBALANCE_POLICIES
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_CONFIG_PATH = BASE_DIR / "config" / "portfolios.toml"
+CONFIG_PATH_ENV = "PORTFOLIO_CONFIG_PATH"
+SUPPORTED_CURRENCIES = ("CLP", "USD")
+# Tolerancia para la suma de pesos de una plataforma (los pesos publicados vienen redondeados).
+WEIGHT_SUM_TOLERANCE = 0.01
+
+_COLOR_PATTERN = re.compile(r"^#[0-9A-Fa-f]{6}$")
+
+
+@dataclass(frozen=True)
+class HoldingConfig:
+    ticker: str
+    weight: float
+    fetch_symbol: str
+    display_name: str
+    currency: str
+
+
+class ConfigError(ValueError):
+    """Configuración de portafolios inválida; el mensaje lista todos los problemas encontrados."""
+
+
+def load_platform_config(path: Optional[str] = None) -> Dict[str, Dict]:
+    """Lee y valida la configuración; el resultado queda cacheado por ruta."""
+    # La ruta se resuelve en cada llamada para que un cambio de `PORTFOLIO_CONFIG_PATH` se respete.
+    return _load_platform_config(str(Path(path or os.getenv(CONFIG_PATH_ENV) or DEFAULT_CONFIG_PATH)))
+
+
+@lru_cache(maxsize=4)
+def _load_platform_config(config_path: str) -> Dict[str, Dict]:
+    return parse_platform_config(_read_raw_config(Path(config_path)), source=config_path)
+
+
+def parse_platform_config(raw: Dict[str, Any], *, source: str = "config") -> Dict[str, Dict]:
+    """Convierte `{"platforms": {id: {...}}}` al formato que usa `build_payload`."""
+    errors: List[str] = []
+    platforms = raw.get("platforms")
+    if not isinstance(platforms, dict) or not platforms:
+        raise ConfigError(f"{source}: falta la tabla 'platforms' con al menos una plataforma.")
+
+    config: Dict[str, Dict] = {}
+    symbols: Dict[str, HoldingConfig] = {}
+    for platform_id, platform in platforms.items():
+        where = f"platforms.{platform_id}"
+        if not isinstance(platform, dict):
+            errors.append(f"{where}: debe ser una tabla.")
+            continue
+        name = platform.get("name")
+        color = platform.get("color")
+        rebalance = platform.get("rebalance", DEFAULT_REBALANCE)
+        if not isinstance(name, str) or not name.strip():
+            errors.append(f"{where}.name: falta el nombre.")
+        if not isinstance(color, str) or not _COLOR_PATTERN.match(color):
+            errors.append(f"{where}.color: debe tener formato #RRGGBB.")
+        if rebalance not in REBALANCE_POLICIES:
+            errors.append(f"{where}.rebalance: usa {', '.join(REBALANCE_POLICIES)}.")
+
+        holdings = []
+        seen_tickers = set()
+        for index, item in enumerate(platform.get("holdings") or []):
+            holding = _parse_holding(item, f"{where}.holdings[{index}]", errors)
+            if holding is None:
+                continue
+            if holding.ticker in seen_tickers:
+                errors.append(f"{where}: el ticker {holding.ticker} está repetido.")
+                continue
+            seen_tickers.add(holding.ticker)
+            # Un mismo símbolo se descarga una sola vez, así que todas sus apariciones deben coincidir.
+            known = symbols.setdefault(holding.fetch_symbol, holding)
+            if (known.ticker, known.currency) != (holding.ticker, holding.currency):
+                errors.append(
+                    f"{where}: {holding.fetch_symbol} aparece con otro ticker o moneda en otra plataforma."
+                )
+            holdings.append(holding)
+
+        if not holdings:
+            errors.append(f"{where}.holdings: necesita al menos un holding.")
+        elif abs(sum(holding.weight for holding in holdings) - 1.0) > WEIGHT_SUM_TOLERANCE:
+            errors.append(f"{where}.holdings: los pesos deben sumar 1.")
+
+        config[platform_id] = {"name": name, "color": color, "rebalance": rebalance, "holdings": holdings}
+
+    if errors:
+        raise ConfigError(f"{source} inválido:\n- " + "\n- ".join(errors))
+    return config
+
+
+def unique_holdings(platform_config: Dict[str, Dict]) -> Dict[str, HoldingConfig]:
+    """Primer holding de cada `fetch_symbol`, en orden de aparición."""
+    unique: Dict[str, HoldingConfig] = {}
+    for platform in platform_config.values():
+        for holding in platform["holdings"]:
+            unique.setdefault(holding.fetch_symbol, holding)
+    return unique
+
+
+def _parse_holding(item: Any, where: str, errors: List[str]) -> Optional[HoldingConfig]:
+    if not isinstance(item, dict):
+        errors.append(f"{where}: debe ser una tabla.")
+        return None
+    ticker = item.get("ticker")
+    weight = item.get("weight")
+    currency = item.get("currency")
+    valid = True
+    if not isinstance(ticker, str) or not ticker.strip():
+        errors.append(f"{where}.ticker: falta el ticker.")
+        valid = False
+    if isinstance(weight, bool) or not isinstance(weight, (int, float)) or weight <= 0:
+        errors.append(f"{where}.weight: debe ser un número positivo.")
+        valid = False
+    if currency not in SUPPORTED_CURRENCIES:
+        errors.append(f"{where}.currency: usa {', '.join(SUPPORTED_CURRENCIES)}.")
+        valid = False
+    for optional in ("fetch_symbol", "display_name"):
+        value = item.get(optional)
+        if value is not None and (not isinstance(value, str) or not value.strip()):
+            errors.append(f"{where}.{optional}: si se indica, debe ser un texto no vacío.")
+            valid = False
+    if not valid:
+        return None
+    return HoldingConfig(
+        ticker=ticker,
+        weight=float(weight),
+        fetch_symbol=item.get("fetch_symbol") or ticker,
+        display_name=item.get("display_name") or ticker,
+        currency=currency,
+    )
+
+
+def _read_raw_config(path: Path) -> Dict[str, Any]:
+    if not path.exists():
+        raise ConfigError(f"No existe el archivo de configuración {path}.")
+    try:
+        if path.suffix == ".toml":
+            with path.open("rb") as fh:
+                return tomllib.load(fh)
+        with path.open("r", encoding="utf-8") as fh:
+            return json.load(fh)
+    except (ValueError, OSError) as error:
+        raise ConfigError(f"No se pudo leer {path}: {error}") from error
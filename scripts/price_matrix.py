@@ -0,0 +1,50 @@
+"""Matriz de precios alineada por fecha para cálculos vectorizados sobre varios holdings."""
+
+from __future__ import annotations
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Mapping, Sequence, Union
+
+import numpy as np
+
+from scripts.price_series import PriceSeries, as_price_series
+
+
+@dataclass(frozen=True)
+class PriceMatrix:
+    """
+    `prices` tiene una fila por fecha del calendario unión y una columna por serie.
+
+    Los huecos se rellenan con el último cierre conocido; antes de la primera observación
+    queda `NaN`. `observed` marca las celdas que vienen de un cierre real.
+    """
+
+    keys: List[str]
+    dates: np.ndarray
+    prices: np.ndarray
+    observed: np.ndarray
+
+    def column(self, key: str) -> int:
+        return self.keys.index(key)
+
+
+def build_price_matrix(histories: Mapping[str, Union[PriceSeries, Sequence[Dict[str, Any]]]]) -> PriceMatrix:
+    """Acepta `PriceSeries` o las listas de puntos JSON de un snapshot publicado."""
+    keys = list(histories)
+    columns = [(series.days, series.closes) for series in map(as_price_series, histories.values())]
+    if not columns or not any(days.size for days, _ in columns):
+        empty = np.empty((0, len(keys)))
+        return PriceMatrix(keys, np.array([], dtype="datetime64[D]"), empty, empty.astype(bool))
+
+    dates, rows = np.unique(np.concatenate([days for days, _ in columns]), return_inverse=True)
+    prices = np.full((dates.size, len(keys)), np.nan)
+    column_index = np.repeat(np.arange(len(keys)), [days.size for days, _ in columns])
+    prices[rows, column_index] = np.concatenate([closes for _, closes in columns])
+
+    observed = ~np.isnan(prices)
+    last_seen = np.where(observed, np.arange(dates.size)[:, None], 0)
+    np.maximum.accumulate(last_seen, axis=0, out=last_seen)
+    filled = prices[last_seen, np.arange(len(keys))]
+    # Las filas anteriores a la primera observación apuntan a la fila 0, que puede no ser de la serie.
+    filled[np.cumsum(observed, axis=0) == 0] = np.nan
+    return PriceMatrix(keys, dates, filled, observed)
@@ -0,0 +1,127 @@
+"""Serie de cierres diarios respaldada por arreglos NumPy; se convierte a JSON sólo al publicar."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+_EMPTY_DAYS = np.array([], dtype="datetime64[D]")
+
+
+class PriceSeries:
+    """
+    Fechas (`datetime64[D]`, estrictamente crecientes) y cierres (`float64`) en dos arreglos paralelos.
+
+    Reemplaza a las listas de `{"date": ..., "close": ...}`: ocupa 16 bytes por punto y los
+    cálculos trabajan sobre los arreglos sin volver a parsear fechas.
+    """
+
+    __slots__ = ("days", "closes")
+
+    def __init__(self, days: np.ndarray, closes: np.ndarray) -> None:
+        self.days = days
+        self.closes = closes
+
+    @classmethod
+    def empty(cls) -> "PriceSeries":
+        return cls(_EMPTY_DAYS, np.array([], dtype=float))
+
+    @classmethod
+    def from_arrays(cls, days: Any, closes: Any) -> "PriceSeries":
+        """Ordena por fecha, descarta cierres no finitos y, ante fechas repetidas, conserva la última."""
+        days = np.asarray(days, dtype="datetime64[D]")
+        closes = np.asarray(closes, dtype=float)
+        if days.shape != closes.shape:
+            raise ValueError("Las fechas y los cierres deben tener el mismo largo.")
+        valid = np.isfinite(closes)
+        days, closes = days[valid], closes[valid]
+        order = np.argsort(days, kind="stable")
+        days, closes = days[order], closes[order]
+        keep = np.r_[days[1:] != days[:-1], True] if days.size else np.array([], dtype=bool)
+        return cls(days[keep], closes[keep])
+
+    @classmethod
+    def from_points(cls, points: Sequence[Dict[str, Any]]) -> "PriceSeries":
+        """Lee la forma JSON (`date` ISO, `close` numérico); los puntos incompletos se ignoran."""
+        labels: List[str] = []
+        closes: List[float] = []
+        for point in points:
+            if "date" not in point or "close" not in point:
+                continue
+            try:
+                close = float(point["close"])
+            except (TypeError, ValueError):
+                continue
+            labels.append(str(point["date"])[:10])
+            closes.append(close)
+        return cls.from_arrays(np.array(labels, dtype="datetime64[D]"), closes)
+
+    def __len__(self) -> int:
+        return int(self.days.size)
+
+    def __getitem__(self, index: slice) -> "PriceSeries":
+        if not isinstance(index, slice):
+            raise TypeError("PriceSeries sólo admite slices; usa `asof` para consultar una fecha.")
+        return PriceSeries(self.days[index], self.closes[index])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PriceSeries):
+            return NotImplemented
+        return np.array_equal(self.days, other.days) and np.array_equal(self.closes, other.closes)
+
+    def __repr__(self) -> str:
+        if not len(self):
+            return "PriceSeries([])"
+        return f"PriceSeries({len(self)} puntos, {self.first_date} → {self.last_date})"
+
+    @property
+    def first_date(self) -> str:
+        return str(self.days[0])
+
+    @property
+    def last_date(self) -> str:
+        return str(self.days[-1])
+
+    @property
+    def latest_close(self) -> float:
+        return float(self.closes[-1])
+
+    def between(self, start: Optional[str] = None, end: Optional[str] = None) -> "PriceSeries":
+        """Puntos con fecha en `[start, end]` (ambos opcionales)."""
+        lower = int(np.searchsorted(self.days, np.datetime64(start, "D"))) if start else 0
+        upper = int(np.searchsorted(self.days, np.datetime64(end, "D"), side="right")) if end else len(self)
+        return self[lower:upper]
+
+    def asof(self, day: Union[str, np.datetime64], *, fallback_to_first: bool = False) -> Optional[float]:
+        """Último cierre en o antes de `day`; con `fallback_to_first` devuelve el primero si no hay anterior."""
+        value = self.asof_many(np.array([day], dtype="datetime64[D]"), fallback_to_first=fallback_to_first)[0]
+        return None if np.isnan(value) else float(value)
+
+    def asof_many(self, days: np.ndarray, *, fallback_to_first: bool = False) -> np.ndarray:
+        """Versión vectorizada de `asof`; NaN donde no hay cierre."""
+        if not len(self):
+            return np.full(np.shape(days), np.nan)
+        rows = np.searchsorted(self.days, days, side="right") - 1
+        if fallback_to_first:
+            return self.closes[np.maximum(rows, 0)]
+        return np.where(rows >= 0, self.closes[np.maximum(rows, 0)], np.nan)
+
+    def merge(self, other: "PriceSeries") -> "PriceSeries":
+        """Unión ordenada de ambas series; en fechas repetidas gana `other`."""
+        return PriceSeries.from_arrays(np.concatenate([self.days, other.days]), np.concatenate([self.closes, other.closes]))
+
+    def date_labels(self) -> List[str]:
+        return np.datetime_as_string(self.days, unit="D").tolist()
+
+    def to_points(self) -> List[Dict[str, Any]]:
+        return [{"date": label, "close": close} for label, close in zip(self.date_labels(), self.closes.tolist())]
+
+
+def as_price_series(value: Union[PriceSeries, Sequence[Dict[str, Any]], None]) -> PriceSeries:
+    """Acepta una `PriceSeries` o la lista de puntos JSON que devuelven proveedores y snapshots."""
+    if isinstance(value, PriceSeries):
+        return value
+    if not value:
+        return PriceSeries.empty()
+    return PriceSeries.from_points(value)
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""
+Proyecciones Monte Carlo por plataforma a partir de los retornos diarios históricos.
+
+Los caminos se generan por bloques (memoria acotada) y cada bloque usa su propia semilla
+derivada de `SeedSequence`, así el resultado no depende de cuántos procesos se usen.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Dict, Mapping, Optional, Sequence
+
+import numpy as np
+
+if __package__ in (None, ""):
+    sys.path.insert(0, str(Path(__file__).resolve().parents[1]))
+
+from scripts.backtest import platform_histories
+from scripts.platform_nav import DEFAULT_REBALANCE, REBALANCE_POLICIES
+from scripts.price_matrix import PriceMatrix, build_price_matrix
+from scripts.risk_metrics import TRADING_DAYS
+
+BASE_DIR = Path(__file__).resolve().parents[1]
+DEFAULT_INPUT = BASE_DIR / "data" / "latest.json"
+PROJECTION_METHODS = ("bootstrap", "gaussian")
+PERCENTILES = (5, 25, 50, 75, 95)
+# Un punto del abanico por mes (21 ruedas); el rebalanceo se aplica en esos mismos cortes.
+DAYS_PER_STEP = 21
+STEPS_PER_YEAR = TRADING_DAYS // DAYS_PER_STEP
+REBALANCE_STEPS = {"none": None, "monthly": 1, "quarterly": 3}
+
+
+@dataclass(frozen=True)
+class ProjectionConfig:
+    paths: int = 5000
+    years: int = 5
+    method: str = "bootstrap"
+    rebalance: str = DEFAULT_REBALANCE
+    seed: int = 7
+    chunk_paths: int = 256
+
+
+def historical_returns(matrix: PriceMatrix, tickers: Sequence[str]) -> np.ndarray:
+    """Retornos simples diarios (fechas × tickers) desde la primera fecha común, con huecos arrastrados."""
+    prices = matrix.prices[:, [matrix.column(ticker) for ticker in tickers]]
+    ready = ~np.isnan(prices).any(axis=1)
+    if ready.sum() < 2:
+        raise ValueError("No hay suficiente historia común para proyectar.")
+    prices = prices[int(np.argmax(ready)) :]
+    return prices[1:] / prices[:-1] - 1.0
+
+
+def simulate_growth(
+    returns: np.ndarray,
+    weights: np.ndarray,
+    config: ProjectionConfig,
+    workers: Optional[int] = None,
+) -> np.ndarray:
+    """Devuelve el crecimiento del portafolio (caminos × pasos mensuales), partiendo en 1."""
+    if config.method not in PROJECTION_METHODS:
+        raise ValueError(f"Método inválido: {config.method}. Usa {', '.join(PROJECTION_METHODS)}.")
+    if config.rebalance not in REBALANCE_POLICIES:
+        raise ValueError(f"Política de rebalanceo inválida: {config.rebalance}.")
+
+    weights = np.asarray(weights, dtype=float)
+    weights = weights / weights.sum()
+    steps = config.years * STEPS_PER_YEAR
+    sizes = [min(config.chunk_paths, config.paths - offset) for offset in range(0, config.paths, config.chunk_paths)]
+    seeds = np.random.SeedSequence(config.seed).spawn(len(sizes))
+
+    if config.method == "gaussian":
+        log_returns = np.log1p(returns)
+        # Un pequeño jitter mantiene la matriz definida positiva con series casi colineales.
+        covariance = np.cov(log_returns, rowvar=False).reshape(returns.shape[1], returns.shape[1])
+        covariance += np.eye(covariance.shape[0]) * 1e-12
+        model = (log_returns.mean(axis=0), np.linalg.cholesky(covariance))
+    else:
+        model = (returns,)
+
+    tasks = [(config.method, model, weights, size, steps, config.rebalance, seed) for size, seed in zip(sizes, seeds)]
+    if workers and workers > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            blocks = list(executor.map(_simulate_chunk, tasks))
+    else:
+        blocks = [_simulate_chunk(task) for task in tasks]
+    return np.vstack(blocks)
+
+
+def project_platform(
+    histories: Mapping[str, Sequence[Dict[str, float]]],
+    weights: Mapping[str, float],
+    config: ProjectionConfig = ProjectionConfig(),
+    workers: Optional[int] = None,
+) -> Dict[str, object]:
+    """Abanico de percentiles (base 100) por mes y estadísticas del valor final."""
+    tickers = [ticker for ticker in weights if ticker in histories]
+    matrix = build_price_matrix({ticker: histories[ticker] for ticker in tickers})
+    returns = historical_returns(matrix, tickers)
+    growth = simulate_growth(returns, np.array([weights[ticker] for ticker in tickers]), config, workers)
+
+    bands = np.percentile(growth, PERCENTILES, axis=0) * 100.0
+    first_month = matrix.dates[-1].astype("datetime64[M]") + 1
+    labels = np.datetime_as_string(first_month + np.arange(growth.shape[1]), unit="D").tolist()
+    steps = [
+        {"date": label, **{f"p{percentile}": round(float(value), 2) for percentile, value in zip(PERCENTILES, column)}}
+        for label, column in zip(labels, bands.T.tolist())
+    ]
+    final = growth[:, -1]
+    return {
+        "config": asdict(config),
+        "tickers": tickers,
+        "history_days": int(returns.shape[0]),
+        "base": 100.0,
+        "steps": steps,
+        "final": {
+            **{f"p{percentile}": round(float(value), 2) for percentile, value in zip(PERCENTILES, bands[:, -1])},
+            "probability_of_loss": round(float((final < 1.0).mean()), 4),
+            "median_cagr": round(float(np.median(final) ** (1.0 / config.years) - 1.0), 4),
+        },
+    }
+
+
+def _simulate_chunk(task: tuple) -> np.ndarray:
+    method, model, weights, size, steps, rebalance, seed = task
+    rng = np.random.default_rng(seed)
+    # Se sortea un mes (DAYS_PER_STEP ruedas) a la vez: la memoria depende del tamaño del bloque,
+    # no del horizonte.
+    step_growth = np.empty((size, steps, weights.size))
+    for step in range(steps):
+        if method == "gaussian":
+            mean, cholesky = model
+            shocks = rng.standard_normal((size, DAYS_PER_STEP, mean.size))
+            step_growth[:, step] = np.exp((mean + shocks @ cholesky.T).sum(axis=1))
+        else:
+            (returns,) = model
+            # Se muestrean fechas completas: así se conserva la correlación entre activos de cada día.
+            rows = rng.integers(0, returns.shape[0], size=(size, DAYS_PER_STEP))
+            step_growth[:, step] = (1.0 + returns[rows]).prod(axis=1)
+
+    period = REBALANCE_STEPS[rebalance] or steps
+    periods = -(-steps // period)
+    padded = np.ones((size, periods * period, step_growth.shape[2]))
+    padded[:, :steps] = step_growth
+    # Dentro de cada período las unidades quedan fijas; al cerrar se vuelve a los pesos objetivo.
+    within = np.cumprod(padded.reshape(size, periods, period, -1), axis=2) @ weights
+    period_start = np.cumprod(np.concatenate((np.ones((size, 1)), within[:, :-1, -1]), axis=1), axis=1)
+    return (period_start[:, :, None] * within).reshape(size, periods * period)[:, :steps]
+
+
+def parse_args(argv: Optional[Sequence[str]] = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Proyecciones Monte Carlo por plataforma")
+    parser.add_argument("--input", type=Path, default=DEFAULT_INPUT, help="Snapshot a usar (por defecto data/latest.json).")
+    parser.add_argument("--platform", required=True)
+    parser.add_argument("--paths", type=int, default=ProjectionConfig.paths)
+    parser.add_argument("--years", type=int, default=ProjectionConfig.years)
+    parser.add_argument("--method", choices=PROJECTION_METHODS, default=ProjectionConfig.method)
+    parser.add_argument("--rebalance", choices=REBALANCE_POLICIES, help="Por defecto, la política de la plataforma.")
+    parser.add_argument("--seed", type=int, default=ProjectionConfig.seed)
+    parser.add_argument("--workers", type=int, default=1, help=f"Procesos a usar (0 = {os.cpu_count()}).")
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[Sequence[str]] = None) -> None:
+    args = parse_args(argv)
+    with args.input.open("r", encoding="utf-8") as fh:
+        payload = json.load(fh)
+    histories, weights = platform_histories(payload, args.platform)
+    platform = next(item for item in payload["platforms"] if item["id"] == args.platform)
+    config = ProjectionConfig(
+        paths=args.paths,
+        years=args.years,
+        method=args.method,
+        rebalance=args.rebalance or platform.get("nav_rebalance", DEFAULT_REBALANCE),
+        seed=args.seed,
+    )
+    result = project_platform(histories, weights, config, workers=args.workers or os.cpu_count())
+    print(json.dumps({"platform": args.platform, **result}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
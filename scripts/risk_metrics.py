@@ -0,0 +1,118 @@
+"""
+Métricas de riesgo para todos los holdings en una pasada vectorizada sobre la matriz alineada:
+volatilidad anualizada, máximo drawdown con fechas, Sharpe, Sortino, CAGR y retornos móviles a 1 año.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, Optional, Union
+
+import numpy as np
+
+from scripts.price_matrix import PriceMatrix
+
+TRADING_DAYS = 252
+# Tasa libre de riesgo anual. Queda en 0 porque los holdings mezclan CLP y USD.
+DEFAULT_RISK_FREE_RATE = 0.0
+ROLLING_WINDOW_DAYS = 365
+
+MetricValue = Union[float, str, None]
+
+
+def compute_risk_metrics(
+    matrix: PriceMatrix,
+    risk_free_rate: float = DEFAULT_RISK_FREE_RATE,
+) -> Dict[str, Dict[str, MetricValue]]:
+    """Devuelve, por clave de la matriz, las métricas extendidas (fracciones redondeadas a 4 decimales)."""
+    size, width = matrix.prices.shape
+    if size < 2:
+        return {key: {} for key in matrix.keys}
+
+    prices, observed, dates = matrix.prices, matrix.observed, matrix.dates
+    rows = np.arange(size)
+    columns = np.arange(width)
+
+    # Retornos sólo en días observados, contra el último cierre anterior (ya arrastrado en `prices`).
+    valid = observed[1:] & ~np.isnan(prices[:-1])
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(valid, prices[1:] / prices[:-1] - 1.0, 0.0)
+    counts = valid.sum(axis=0)
+    safe_counts = np.maximum(counts, 1)
+    mean = returns.sum(axis=0) / safe_counts
+    deviations = np.where(valid, returns - mean, 0.0)
+    variance = (deviations**2).sum(axis=0) / np.maximum(counts - 1, 1)
+    volatility = np.sqrt(variance * TRADING_DAYS)
+
+    daily_free = (1.0 + risk_free_rate) ** (1.0 / TRADING_DAYS) - 1.0
+    excess = (mean - daily_free) * TRADING_DAYS
+    downside = np.where(valid, np.minimum(returns - daily_free, 0.0), 0.0)
+    downside_deviation = np.sqrt((downside**2).sum(axis=0) / safe_counts * TRADING_DAYS)
+
+    first = np.argmax(observed, axis=0)
+    last = size - 1 - np.argmax(observed[::-1], axis=0)
+    years = (dates[last] - dates[first]).astype(np.int64) / 365.25
+    with np.errstate(divide="ignore", invalid="ignore"):
+        growth = prices[last, columns] / prices[first, columns]
+        cagr = np.where(years > 0, np.power(growth, 1.0 / np.where(years > 0, years, 1.0)) - 1.0, np.nan)
+
+    # Máximo drawdown: máximo acumulado y, en paralelo, la fila donde se alcanzó ese máximo.
+    comparable = np.where(np.isnan(prices), -np.inf, prices)
+    running_max = np.maximum.accumulate(comparable, axis=0)
+    peak_rows = np.where((comparable == running_max) & observed, rows[:, None], 0)
+    np.maximum.accumulate(peak_rows, axis=0, out=peak_rows)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        drawdowns = np.where(np.isnan(prices), 0.0, prices / running_max - 1.0)
+    trough = np.argmin(drawdowns, axis=0)
+    max_drawdown = drawdowns[trough, columns]
+    peak = peak_rows[trough, columns]
+    recovered = (rows[:, None] > trough) & observed & (prices >= prices[peak, columns])
+    recovery = np.where(recovered.any(axis=0), np.argmax(recovered, axis=0), -1)
+
+    # Retorno móvil a 1 año: la fila base es la última fecha <= t - 365 días, común a todas las series.
+    base_rows = np.searchsorted(dates, dates - np.timedelta64(ROLLING_WINDOW_DAYS, "D"), side="right") - 1
+    has_base = base_rows >= 0
+    base_prices = prices[np.maximum(base_rows, 0)]
+    rolling_valid = has_base[:, None] & observed & ~np.isnan(base_prices)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        rolling = np.where(rolling_valid, prices / base_prices - 1.0, np.nan)
+    rolling_counts = rolling_valid.sum(axis=0)
+    rolling_min = np.where(rolling_valid, rolling, np.inf).min(axis=0)
+    rolling_max = np.where(rolling_valid, rolling, -np.inf).max(axis=0)
+    rolling_mean = np.where(rolling_valid, rolling, 0.0).sum(axis=0) / np.maximum(rolling_counts, 1)
+    rolling_positive = (rolling_valid & (rolling > 0)).sum(axis=0) / np.maximum(rolling_counts, 1)
+
+    day_labels = np.datetime_as_string(dates, unit="D")
+    results: Dict[str, Dict[str, MetricValue]] = {}
+    for column, key in enumerate(matrix.keys):
+        if counts[column] < 2:
+            results[key] = {}
+            continue
+        has_rolling = rolling_counts[column] > 0
+        has_drawdown = max_drawdown[column] < 0
+        results[key] = {
+            "volatility": _rounded(volatility[column]),
+            "max_drawdown": _rounded(max_drawdown[column]),
+            "max_drawdown_start": str(day_labels[peak[column]]) if has_drawdown else None,
+            "max_drawdown_end": str(day_labels[trough[column]]) if has_drawdown else None,
+            "max_drawdown_recovery": str(day_labels[recovery[column]]) if has_drawdown and recovery[column] >= 0 else None,
+            "sharpe_ratio": _ratio(excess[column], volatility[column]),
+            "sortino_ratio": _ratio(excess[column], downside_deviation[column]),
+            "cagr": _rounded(cagr[column]),
+            "rolling_1y_min": _rounded(rolling_min[column]) if has_rolling else None,
+            "rolling_1y_max": _rounded(rolling_max[column]) if has_rolling else None,
+            "rolling_1y_mean": _rounded(rolling_mean[column]) if has_rolling else None,
+            "rolling_1y_positive_share": _rounded(rolling_positive[column]) if has_rolling else None,
+        }
+    return results
+
+
+def _rounded(value: float) -> Optional[float]:
+    if value is None or not np.isfinite(value):
+        return None
+    return round(float(value), 4)
+
+
+def _ratio(numerator: float, denominator: float) -> Optional[float]:
+    if not denominator or not np.isfinite(denominator):
+        return None
+    return _rounded(numerator / denominator)
@@ -0,0 +1,61 @@
+"""
+Pirámides de resolución para las series de precios: agregados OHLC semanales y mensuales
+más una cola diaria con la ventana reciente. Se calculan una vez por refresh.
+"""
+
+from __future__ import annotations
+
+from typing import Dict, List
+
+import numpy as np
+
+from scripts.price_series import PriceSeries
+
+PYRAMID_LEVELS = ("weekly", "monthly")
+DAILY_TAIL_DAYS = 92
+PYRAMID_SERIES = PYRAMID_LEVELS + ("daily_tail",)
+
+
+def build_series_pyramid(
+    price_history: PriceSeries,
+    tail_days: int = DAILY_TAIL_DAYS,
+) -> Dict[str, List[Dict[str, float]]]:
+    """
+    Recibe `price_history` ordenado y devuelve `weekly`, `monthly` y `daily_tail`.
+
+    Cada punto agregado se etiqueta con el inicio del período (lunes ISO o día 1 del mes),
+    así la fecha de la barra en curso no cambia mientras el período sigue abierto.
+    """
+    if not len(price_history):
+        return {name: [] for name in PYRAMID_SERIES}
+
+    days, closes = price_history.days, price_history.closes
+
+    # 1970-01-01 fue jueves: desplazamos 3 días para que las semanas partan en lunes.
+    week_starts = days - (days.astype(np.int64) + 3) % 7
+    month_starts = days.astype("datetime64[M]").astype("datetime64[D]")
+
+    tail_from = days[-1] - np.timedelta64(tail_days - 1, "D")
+    tail_index = int(np.searchsorted(days, tail_from))
+
+    return {
+        "weekly": _aggregate_ohlc(week_starts, closes),
+        "monthly": _aggregate_ohlc(month_starts, closes),
+        "daily_tail": price_history[tail_index:].to_points(),
+    }
+
+
+def _aggregate_ohlc(period_starts: np.ndarray, closes: np.ndarray) -> List[Dict[str, float]]:
+    starts = np.flatnonzero(np.r_[True, period_starts[1:] != period_starts[:-1]])
+    ends = np.r_[starts[1:], closes.size] - 1
+    columns = zip(
+        np.datetime_as_string(period_starts[starts], unit="D").tolist(),
+        closes[starts].tolist(),
+        np.maximum.reduceat(closes, starts).tolist(),
+        np.minimum.reduceat(closes, starts).tolist(),
+        closes[ends].tolist(),
+    )
+    return [
+        {"date": label, "open": open_, "high": high, "low": low, "close": close}
+        for label, open_, high, low, close in columns
+    ]
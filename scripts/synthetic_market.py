@@ -0,0 +1,144 @@
+"""
+Mercado sintético determinista para el modo offline y las pruebas de carga.
+
+Cada ticker sigue un movimiento browniano geométrico sobre un calendario de transacciones
+configurable. Los retornos comparten un factor de mercado, así que la correlación entre dos
+tickers cualquiera es `correlation`. Cada ticker tiene su propio generador derivado de
+`(seed, índice)`: el resultado no depende de cuántos procesos se usen ni de cómo se repartan.
+"""
+
+from __future__ import annotations
+
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from datetime import date, datetime, timedelta
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+from scripts.portfolio_config import HoldingConfig
+from scripts.price_series import PriceSeries
+
+# Días hábiles por calendario, como máscara lunes→domingo de `numpy.busday`.
+CALENDARS: Dict[str, str] = {
+    "business": "1111100",
+    "daily": "1111111",
+    "sun_thu": "1111001",
+}
+PLATFORM_COLORS = ("#0B57D0", "#FF6F61", "#109618", "#990099", "#0099C6", "#DD4477")
+# Tickers por tarea al repartir entre procesos.
+BLOCK_SIZE = 256
+
+_FACTOR_STREAM = 0
+_TICKER_STREAM = 1
+
+
+@dataclass(frozen=True)
+class MarketSpec:
+    tickers: int = 100
+    years: int = 5
+    seed: int = 7
+    calendar: str = "business"
+    holidays: Tuple[str, ...] = ()
+    end_date: Optional[date] = None
+    # Rangos anuales de donde se sortea el drift y la volatilidad de cada ticker.
+    drift: Tuple[float, float] = (-0.02, 0.15)
+    volatility: Tuple[float, float] = (0.10, 0.40)
+    start_price: Tuple[float, float] = (20.0, 500.0)
+    correlation: float = 0.3
+    ticker_prefix: str = "SYN"
+
+    def validate(self) -> None:
+        if self.tickers < 1 or self.years < 1:
+            raise ValueError("El mercado sintético necesita al menos un ticker y un año.")
+        if self.calendar not in CALENDARS:
+            raise ValueError(f"Calendario desconocido: {self.calendar}. Usa {', '.join(CALENDARS)}.")
+        if not 0.0 <= self.correlation < 1.0:
+            raise ValueError("La correlación debe estar en [0, 1).")
+        for label, (low, high) in (("drift", self.drift), ("volatility", self.volatility), ("start_price", self.start_price)):
+            if low > high:
+                raise ValueError(f"El rango de {label} está invertido.")
+        if self.volatility[0] < 0 or self.start_price[0] <= 0:
+            raise ValueError("La volatilidad no puede ser negativa y los precios iniciales deben ser positivos.")
+
+    @property
+    def ticker_width(self) -> int:
+        return max(4, len(str(self.tickers - 1)))
+
+    def ticker(self, index: int) -> str:
+        return f"{self.ticker_prefix}{index:0{self.ticker_width}d}"
+
+
+def trading_calendar(spec: MarketSpec) -> np.ndarray:
+    """Días de transacción (`datetime64[D]`) de los últimos `years` años hasta `end_date` inclusive."""
+    end = spec.end_date or datetime.utcnow().date()
+    start = end - timedelta(days=365 * spec.years)
+    days = np.arange(np.datetime64(start, "D"), np.datetime64(end, "D") + 1)
+    holidays = np.array(spec.holidays, dtype="datetime64[D]")
+    return days[np.is_busday(days, weekmask=CALENDARS[spec.calendar], holidays=holidays)]
+
+
+def generate_market(spec: MarketSpec, *, workers: int = 1) -> Dict[str, PriceSeries]:
+    """Genera todos los tickers; con `workers > 1` reparte bloques entre procesos."""
+    spec.validate()
+    days = trading_calendar(spec)
+    blocks = [(start, min(start + BLOCK_SIZE, spec.tickers)) for start in range(0, spec.tickers, BLOCK_SIZE)]
+    if workers > 1 and len(blocks) > 1:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(_generate_block, [(spec, days, start, stop) for start, stop in blocks]))
+    else:
+        results = [_generate_block((spec, days, start, stop)) for start, stop in blocks]
+
+    market: Dict[str, PriceSeries] = {}
+    for (start, _), closes in zip(blocks, results):
+        for offset, row in enumerate(closes):
+            market[spec.ticker(start + offset)] = PriceSeries(days, row)
+    return market
+
+
+def build_market_config(spec: MarketSpec, platforms: int = 2) -> Dict[str, Dict]:
+    """Reparte los tickers del mercado en `platforms` plataformas con pesos iguales."""
+    spec.validate()
+    platforms = max(1, min(platforms, spec.tickers))
+    config: Dict[str, Dict] = {}
+    for platform_index in range(platforms):
+        indexes = range(platform_index, spec.tickers, platforms)
+        weight = round(1 / len(indexes), 6)
+        holdings: List[HoldingConfig] = [
+            HoldingConfig(
+                ticker=spec.ticker(index),
+                weight=weight,
+                fetch_symbol=spec.ticker(index),
+                display_name=f"Synthetic Holding {spec.ticker(index)[len(spec.ticker_prefix):]}",
+                currency="USD" if index % 2 else "CLP",
+            )
+            for index in indexes
+        ]
+        config[f"synthetic-{platform_index}"] = {
+            "name": f"Sintética {platform_index + 1}",
+            "color": PLATFORM_COLORS[platform_index % len(PLATFORM_COLORS)],
+            "rebalance": "monthly",
+            "holdings": holdings,
+        }
+    return config
+
+
+def _generate_block(task: Tuple[MarketSpec, np.ndarray, int, int]) -> np.ndarray:
+    spec, days, start, stop = task
+    steps = days.size
+    # Períodos por año según el calendario efectivo (≈252 en días hábiles, 365 en diario).
+    periods = steps / spec.years
+    market = np.random.default_rng([spec.seed, _FACTOR_STREAM]).standard_normal(steps)
+    loading = np.sqrt(spec.correlation)
+    idiosyncratic = np.sqrt(1.0 - spec.correlation)
+
+    closes = np.empty((stop - start, steps))
+    for row, index in enumerate(range(start, stop)):
+        rng = np.random.default_rng([spec.seed, _TICKER_STREAM, index])
+        drift = rng.uniform(*spec.drift) / periods
+        volatility = rng.uniform(*spec.volatility) / np.sqrt(periods)
+        start_price = rng.uniform(*spec.start_price)
+        shocks = loading * market + idiosyncratic * rng.standard_normal(steps)
+        log_returns = (drift - 0.5 * volatility**2) + volatility * shocks
+        closes[row] = start_price * np.exp(np.cumsum(log_returns))
+    return closes.round(4)
@@ -0,0 +1,38 @@
+"""Lectura incremental de JSON con bloques chicos, donde los números quedan cortados entre lecturas."""
+
+from __future__ import annotations
+
+import io
+import json
+import unittest
+
+from scripts.json_stream import JsonStreamReader
+
+
+def _read_array(text: str, chunk_size: int) -> list:
+    reader = JsonStreamReader(io.StringIO(text), chunk_size=chunk_size)
+    values = [reader.read_value() for _ in reader.iter_array()]
+    reader.ensure_finished()
+    return values
+
+
+class JsonStreamReaderTest(unittest.TestCase):
+    def test_numbers_split_at_every_chunk_boundary(self) -> None:
+        values = [1.5, -2.25e-3, 10, 3e5, 0.125, 1234.5678, -0.0, 7]
+        text = json.dumps(values)
+        for chunk_size in range(1, len(text) + 2):
+            with self.subTest(chunk_size=chunk_size):
+                self.assertEqual(_read_array(text, chunk_size), values)
+
+    def test_nested_document_with_small_chunks(self) -> None:
+        document = {"a": [{"date": "2024-01-02", "close": 101.25}, {"date": "2024-01-03", "close": 99.5}], "b": None}
+        text = json.dumps(document, indent=2)
+        for chunk_size in range(1, 40):
+            with self.subTest(chunk_size=chunk_size):
+                reader = JsonStreamReader(io.StringIO(text), chunk_size=chunk_size)
+                self.assertEqual(reader.read_value(), document)
+                reader.ensure_finished()
+
+
+if __name__ == "__main__":
+    unittest.main()